@@ -0,0 +1,126 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+import QuantLib as ql
+
+from Benchmarks.ConventionBenchmark import FIXED_RATE_BOND, SCHEDULE
+from Benchmarks.PricingBenchmark import AS_OF
+from Common.Utils import BondBatchUtils, BondUtils, CurveCache, CurveUtils, PricingContext, VectorCurveUtils
+from Common.Utils.Constants import RoundingConstants
+
+# get_pricing_results figures checked against the batch, with the rounding they are reported to
+CHECKED_RESULTS = {
+    "Yield": RoundingConstants.ROUND_RATE,
+    "Price(Curve)": RoundingConstants.ROUND_PRICE,
+    "Full-Price(Curve)": RoundingConstants.ROUND_PRICE,
+    "DV01": RoundingConstants.ROUND_MONEY,
+    "Modified Duration": RoundingConstants.ROUND_YEARS,
+    "Macaulay Duration": RoundingConstants.ROUND_YEARS,
+    "Convexity": RoundingConstants.ROUND_MONEY,
+    "Accrued Interest": RoundingConstants.ROUND_PRICE,
+}
+
+
+def portfolio(as_of: ql.Date, count: int, seed: int):
+    """Seeded fixed rate bonds: seasoned up to a year, 1 to 30 years left, coupons and prices around the market"""
+    rng = np.random.default_rng(seed)
+
+    bonds = []
+    for _ in range(count):
+        issue_date = as_of - int(rng.integers(0, 365))
+        maturity_date = issue_date + ql.Period(int(rng.integers(1, 31)), ql.Years)
+        schedule = dict(SCHEDULE, issue_date=issue_date.ISO(), maturity_date=maturity_date.ISO())
+        bond_info = dict(FIXED_RATE_BOND, Coupon=[round(float(rng.uniform(0.01, 0.07)), 4)])
+
+        bonds.append(BondUtils.get_fixed_rate_bond(schedule, bond_info))
+
+    clean_prices = rng.uniform(85.0, 115.0, count)
+    return bonds, clean_prices
+
+
+def reference_results(bonds, clean_prices, curve, discount_curve) -> dict:
+    """One get_pricing_results call per bond, as the panels price them"""
+    results = {name: [] for name in CHECKED_RESULTS}
+
+    for bond, clean_price in zip(bonds, clean_prices):
+        pricing = BondUtils.get_pricing_results(curve, discount_curve, bond, float(clean_price),
+                                                FIXED_RATE_BOND["DayCounter"], SCHEDULE["Compounding"],
+                                                SCHEDULE["Frequency"])
+        for name in CHECKED_RESULTS:
+            results[name].append(pricing[name])
+
+    return {name: np.array(values) for name, values in results.items()}
+
+
+def compare(reference: dict, batch: dict) -> list:
+    """Printed worst differences, returns the figures the batch misses by more than their rounding"""
+    failures = []
+
+    print(f"{'result':<20}{'max abs diff':>14}{'tolerance':>12}  status")
+    for name, digits in CHECKED_RESULTS.items():
+        # Reference figures are rounded, so they are only good to half their last digit,
+        # and both yield solvers stop within ~1e-8
+        tolerance = 0.5 * 10.0 ** -digits + 1e-6
+        difference = float(np.max(np.abs(batch[name] - reference[name])))
+
+        status = "ok" if difference <= tolerance else "MISMATCH"
+        if status != "ok":
+            failures.append(name)
+
+        print(f"{name:<20}{difference:>14.2e}{tolerance:>12.1e}  {status}")
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch bond pricer against get_pricing_results, timing and accuracy")
+    parser.add_argument('--as_of', default=AS_OF, help="evaluation date, ISO")
+    parser.add_argument('--curve_setup', default="data/curve_setup.json")
+    parser.add_argument('--discount_curve', default="UST Discount")
+    parser.add_argument('--bonds', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    as_of = ql.DateParser.parseISO(args.as_of)
+
+    with open(args.curve_setup, "r") as f:
+        curve_setup = {curve["Name"]: curve for curve in json.load(f)}[args.discount_curve]
+
+    with PricingContext.evaluation_date(as_of):
+        curve_data = {"Curve": curve_setup, "MarketData": CurveUtils.transform_curve_components(curve_setup, as_of)}
+        curve, discount_curve = CurveCache.get_curve(curve_data)
+
+        bonds, clean_prices = portfolio(as_of, args.bonds, args.seed)
+
+        start = time.perf_counter()
+        reference = reference_results(bonds, clean_prices, curve, discount_curve)
+        reference_seconds = time.perf_counter() - start
+
+        # Cashflows are extracted once, repricing at new prices or on a new curve reuses them
+        start = time.perf_counter()
+        batch_pricer = BondBatchUtils.BondBatch.from_bonds(bonds, FIXED_RATE_BOND["DayCounter"],
+                                                           SCHEDULE["Compounding"], SCHEDULE["Frequency"])
+        extraction_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = batch_pricer.pricing_results(clean_prices, VectorCurveUtils.VectorCurve.from_curve(curve))
+        batch_seconds = time.perf_counter() - start
+
+    print(f"{args.bonds} fixed rate bonds as of {args.as_of}")
+    print(f"get_pricing_results per bond: {reference_seconds * 1e3:10.1f} ms")
+    print(f"BondBatch cashflow extraction: {extraction_seconds * 1e3:9.1f} ms")
+    print(f"BondBatch pricing results:    {batch_seconds * 1e3:10.1f} ms  x{reference_seconds / batch_seconds:.1f}")
+    print()
+
+    failures = compare(reference, batch)
+    if failures:
+        sys.exit(f"Batch pricer differs from get_pricing_results: {', '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import argparse
+import sys
+
+# Pure UI transformations served by assets/clientside.js, must not come back server-side
+CLIENTSIDE = {
+    "rates": {"_format_pricing_results", "on_pricing_results"},
+    "options": {"update_grid_context", "refresh_column_defs", "set_description"},
+}
+
+
+def callback_inventory(app) -> list:
+    """(output key, callback name, kind) of every callback, kind is pricing, server or clientside"""
+    inventory = []
+    for output_key, callback in app.callback_map.items():
+        function = callback.get("callback")
+        if function is None:
+            inventory.append((output_key, "", "clientside"))
+        else:
+            kind = "pricing" if getattr(function, "pricing_job", False) else "server"
+            inventory.append((output_key, function.__name__, kind))
+
+    return inventory
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lists which callbacks still run server-side")
+    parser.add_argument('--apps', nargs="+", default=list(CLIENTSIDE), choices=list(CLIENTSIDE))
+    parser.add_argument('--check', action="store_true", help="fail if a clientside callback is served by Python")
+    args = parser.parse_args()
+
+    failures = []
+    for app_name in args.apps:
+        inventory = callback_inventory(__import__(app_name).app)
+
+        print(f"== {app_name}")
+        for kind in ("pricing", "server", "clientside"):
+            entries = [entry for entry in inventory if entry[2] == kind]
+            print(f"{kind} ({len(entries)})")
+            for output_key, name, _ in entries:
+                print(f"    {name or '-':<36}{output_key[:100]}")
+
+        failures += [f"{app_name}.{name}" for _, name, kind in inventory
+                     if kind != "clientside" and name in CLIENTSIDE[app_name]]
+
+    if args.check and failures:
+        print(f"Server-side, expected clientside: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
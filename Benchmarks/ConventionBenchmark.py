@@ -0,0 +1,135 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import argparse
+import json
+import time
+from contextlib import contextmanager
+
+import QuantLib as ql
+
+from Common.Utils import BondBatchUtils, BondUtils, ConvertUtils, CurveCache, CurveUtils, VectorCurveUtils
+
+# Interned lookups in ConvertUtils, swapped for their uncached versions to get the baseline
+CACHED_CONVENTIONS = ("make_calendar", "_joint_calendar", "_calendars_from_keys", "_day_counter", "enum_from_string")
+
+SCHEDULE = {
+    "Calendars": ["TARGET", "UnitedStates_GovernmentBond"],
+    "BusDayConv": "ModifiedFollowing",
+    "TermBusDayConv": "ModifiedFollowing",
+    "Compounding": "QuantLib.Compounded",
+    "Frequency": "QuantLib.Semiannual",
+    "DateGeneration": "DateGeneration.Backward",
+    "endOfMonth": False,
+}
+
+FIXED_RATE_BOND = {"Coupon": [0.04], "SettlementDays": 1, "DayCounter": "ActualActual_Bond", "FaceAmount": 10000}
+
+ZERO_COUPON_BOND = {"SettlementDays": 1, "FaceAmount": 10000}
+
+
+@contextmanager
+def uncached_conventions():
+    """Resolve every calendar, day counter and enum from scratch, as before the registry"""
+    cached = {name: getattr(ConvertUtils, name) for name in CACHED_CONVENTIONS}
+
+    for name, function in cached.items():
+        setattr(ConvertUtils, name, function.__wrapped__)
+    try:
+        yield
+    finally:
+        for name, function in cached.items():
+            setattr(ConvertUtils, name, function)
+
+
+def time_workload(workload, repeat: int) -> float:
+    workload()  # warm-up: bootstrap curves, populate the registry
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        workload()
+    return (time.perf_counter() - start) / repeat
+
+
+# -----------------------
+# Workloads
+# -----------------------
+
+def convention_lookups():
+    ConvertUtils.calendars_from_strings(SCHEDULE["Calendars"])
+    ConvertUtils.day_counter_from_string(FIXED_RATE_BOND["DayCounter"])
+    ConvertUtils.enum_from_string(SCHEDULE["Compounding"])
+    ConvertUtils.enum_from_string(SCHEDULE["Frequency"])
+    ConvertUtils.enum_from_string(ConvertUtils.BusDayConv[SCHEDULE["BusDayConv"]])
+    ConvertUtils.enum_from_string(SCHEDULE["DateGeneration"])
+
+
+def fixed_rate_reprice(curve_data, schedule):
+    curve, discount_curve = CurveCache.get_curve(curve_data)
+
+    bond = BondUtils.get_fixed_rate_bond(schedule, FIXED_RATE_BOND)
+    BondUtils.get_pricing_results(
+        curve, discount_curve, bond, 100.0,
+        FIXED_RATE_BOND["DayCounter"], schedule["Compounding"], schedule["Frequency"]
+    )
+
+
+def zero_ladder_reprice(curve_data, schedule):
+    # Same steps as ZeroCouponBondPanel.reprice_zero_coupon
+    zero_ladder = BondBatchUtils.ZeroLadder.from_schedule(
+        schedule, ZERO_COUPON_BOND, curve_data["Curve"]["DayCounter"], schedule["Compounding"], schedule["Frequency"]
+    )
+    zero_ladder.pricing_rows(VectorCurveUtils.VectorCurve.from_nodes(CurveCache.get_nodes(curve_data)))
+
+
+def curve_bootstrap(market_data):
+    curve, _ = CurveUtils.bootstrap(CurveUtils.create_rate_helpers(market_data))
+    curve.nodes()  # the bootstrap is lazy, force it
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convention registry benchmark")
+    parser.add_argument('--curve_setup', default="data/curve_setup.json")
+    parser.add_argument('--discount_curve', default="UST Discount", help="curve the bonds are priced off")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    business_date = CurveUtils.business_date()
+    ql.Settings.instance().evaluationDate = business_date
+
+    with open(args.curve_setup, "r") as f:
+        curve_setup = {curve["Name"]: curve for curve in json.load(f)}
+
+    curve = curve_setup[args.discount_curve]
+    curve_data = {"Curve": curve, "MarketData": CurveUtils.transform_curve_components(curve)}
+
+    schedule = dict(
+        SCHEDULE,
+        issue_date=business_date.ISO(),
+        maturity_date=(business_date + ql.Period(10, ql.Years)).ISO(),
+    )
+    zero_schedule = dict(schedule, Frequency="QuantLib.Monthly")
+
+    workloads = {
+        "convention lookups (x1000)": lambda: [convention_lookups() for _ in range(1000)],
+        "fixed rate bond reprice": lambda: fixed_rate_reprice(curve_data, schedule),
+        "zero ladder reprice (10Y monthly)": lambda: zero_ladder_reprice(curve_data, zero_schedule),
+    }
+
+    for name, setup in curve_setup.items():
+        market_data = CurveUtils.transform_curve_components(setup)
+        workloads[f"bootstrap {name}"] = lambda market_data=market_data: curve_bootstrap(market_data)
+
+    print(f"{'workload':<36}{'uncached ms':>14}{'interned ms':>14}{'saved ms':>12}{'speedup':>10}")
+    for name, workload in workloads.items():
+        with uncached_conventions():
+            uncached = time_workload(workload, args.repeat)
+        interned = time_workload(workload, args.repeat)
+
+        print(f"{name:<36}{uncached * 1e3:>14.3f}{interned * 1e3:>14.3f}"
+              f"{(uncached - interned) * 1e3:>12.3f}{uncached / interned:>9.1f}x")
+
+    print(ConvertUtils.conventions_cache_info())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import argparse
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+import QuantLib as ql
+
+from Benchmarks.ConventionBenchmark import FIXED_RATE_BOND, SCHEDULE, ZERO_COUPON_BOND
+from Common.Utils import BondBatchUtils, BondUtils, CurveCache, CurveUtils, PricingContext, VectorCurveUtils, VolUtils
+
+# Every workload prices as of this date, so results are comparable run to run
+AS_OF = "2025-06-30"
+
+BASELINE_FILE = "Benchmarks/pricing_baseline.json"
+
+# Grid of the mid-curve panel, see OISMidCurvePanel
+SWAP_TENORS = ['6M', '1Y', '2Y', '3Y', '5Y', '7Y', '10Y', '15Y', '20Y', '25Y', '30Y', '40Y', '50Y']
+FORWARD_START_TENORS = ['0D', '1M', '2M', '3M', '6M', '9M', '1Y', '18M', '2Y', '3Y', '5Y', '10Y', '15Y', '30Y']
+
+OVERNIGHT_LEG = {"nominals": [10000], "spreads": [0.0], "paymentLag": 2}
+
+FLOATING_RATE_BOND = {"SettlementDays": 1}
+
+# Synthetic option chain: strikes around the spot, monthly expirations, a smile on both sides
+SPOT = 100.0
+CHAIN_STRIKES = np.arange(50.0, 150.0 + 2.5, 2.5)
+CHAIN_EXPIRATIONS = 12
+
+
+def time_workload(workload, repeat: int) -> tuple:
+    """(per-run seconds, checksum of the last run)"""
+    workload()  # warm-up: conventions, cached curves
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        checksum = workload()
+        timings.append(time.perf_counter() - start)
+
+    return timings, checksum
+
+
+# -----------------------
+# Workloads
+# -----------------------
+
+def curve_bootstrap(market_data):
+    curve, _ = CurveUtils.bootstrap(CurveUtils.create_rate_helpers(market_data))
+    return float(np.sum(curve.data()))  # the bootstrap is lazy, data() forces it
+
+
+def ois_curve(index, nodes):
+    _, rates = CurveUtils.price_ois_curve(index, nodes, CurveUtils.CURVE_TENORS)
+    return float(np.sum(rates))
+
+
+def mid_curve(index, nodes):
+    _, surface = CurveUtils.price_mid_curve(index, nodes, SWAP_TENORS, FORWARD_START_TENORS)
+    return float(np.sum(surface))
+
+
+def fixed_rate_pricing(curve_data, schedule):
+    curve, discount_curve = CurveCache.get_curve(curve_data)
+
+    bond = BondUtils.get_fixed_rate_bond(schedule, FIXED_RATE_BOND)
+    results = BondUtils.get_pricing_results(
+        curve, discount_curve, bond, 100.0,
+        FIXED_RATE_BOND["DayCounter"], schedule["Compounding"], schedule["Frequency"]
+    )
+    return results["NPV"] + results["Yield"] + results["Z-Spread(BPS)"]
+
+
+def floating_rate_pricing(forecast_curve_data, discount_curve_data, index_fixings, schedule):
+    # Same steps as FloatingRateBondPanel.on_reprice at par
+    bond = BondUtils.get_floating_rate_bond(forecast_curve_data, index_fixings, schedule, OVERNIGHT_LEG,
+                                            FLOATING_RATE_BOND)
+    curve, discount_curve = CurveCache.get_curve(discount_curve_data)
+
+    results = BondUtils.get_pricing_results(
+        curve, discount_curve, bond, 100.0,
+        forecast_curve_data["Curve"]["DayCounter"], schedule["Compounding"], schedule["Frequency"]
+    )
+    return results["NPV"] + results["Yield"] + results["Z-Spread(BPS)"]
+
+
+def zero_ladder_pricing(curve_data, schedule):
+    # Same steps as ZeroCouponBondPanel.reprice_zero_coupon
+    zero_ladder = BondBatchUtils.ZeroLadder.from_schedule(
+        schedule, ZERO_COUPON_BOND, curve_data["Curve"]["DayCounter"], schedule["Compounding"], schedule["Frequency"]
+    )
+    vector_curve = VectorCurveUtils.VectorCurve.from_nodes(CurveCache.get_nodes(curve_data))
+
+    return sum(results["NPV"] + results["Yield"] for results in zero_ladder.pricing_rows(vector_curve))
+
+
+def option_chain(as_of):
+    chain = []
+    for month in range(1, CHAIN_EXPIRATIONS + 1):
+        expiration_date = as_of + ql.Period(month, ql.Months)
+        for strike in CHAIN_STRIKES:
+            moneyness = np.log(strike / SPOT)
+            chain.append((float(strike), expiration_date,
+                          0.20 - 0.10 * moneyness + 0.30 * moneyness ** 2,
+                          0.21 - 0.12 * moneyness + 0.32 * moneyness ** 2))
+
+    return chain
+
+
+def option_chain_pricing(chain, as_of):
+    # Same steps as OptionsPanel.price_options, calls and puts on every strike and expiration
+    checksum = 0.0
+    for strike, expiration_date, call_vol, put_vol in chain:
+        for option_type, vol in ((ql.Option.Call, call_vol), (ql.Option.Put, put_vol)):
+            greeks = VolUtils.price_european_option(SPOT, strike, expiration_date, option_type, 0.04, 0.01, vol,
+                                                    valuation_date=as_of)
+            checksum += greeks["npv"] + greeks["delta"]
+
+    return checksum
+
+
+def workloads(as_of, curve_setup: dict, index_fixings: dict, discount_curve: str, forecast_curve: str) -> dict:
+    curves = {}
+    for name, setup in curve_setup.items():
+        curve_data = {"Curve": setup, "MarketData": CurveUtils.transform_curve_components(setup, as_of)}
+        curve_data["Nodes"] = CurveCache.get_nodes(curve_data)
+        curves[name] = curve_data
+
+    schedule = dict(SCHEDULE, issue_date=as_of.ISO(), maturity_date=(as_of + ql.Period(10, ql.Years)).ISO())
+    floating_schedule = dict(
+        SCHEDULE, Calendars=["UnitedStates_GovernmentBond"], Frequency="QuantLib.Quarterly",
+        # Issued a month ago, so the past coupons pick up fixings
+        issue_date=(as_of - ql.Period(1, ql.Months)).ISO(), maturity_date=(as_of + ql.Period(5, ql.Years)).ISO(),
+    )
+    zero_schedule = dict(schedule, Frequency="QuantLib.Monthly")
+    chain = option_chain(as_of)
+
+    results = {}
+    for name, curve_data in curves.items():
+        results[f"bootstrap {name}"] = lambda market_data=curve_data["MarketData"]: curve_bootstrap(market_data)
+
+    for name, curve_data in curves.items():
+        index = curve_data["Curve"].get("Index")
+        if index:
+            results[f"ois curve {name}"] = lambda index=index, nodes=curve_data["Nodes"]: ois_curve(index, nodes)
+            results[f"mid curve {name}"] = lambda index=index, nodes=curve_data["Nodes"]: mid_curve(index, nodes)
+
+    results["fixed rate bond pricing"] = lambda: fixed_rate_pricing(curves[discount_curve], schedule)
+    results["floating rate bond pricing"] = lambda: floating_rate_pricing(
+        curves[forecast_curve], curves[discount_curve], index_fixings, floating_schedule)
+    results["zero ladder pricing (10Y monthly)"] = lambda: zero_ladder_pricing(curves[discount_curve], zero_schedule)
+    results[f"option chain ({len(chain)} strikes x 2)"] = lambda: option_chain_pricing(chain, as_of)
+
+    return results
+
+
+# -----------------------
+# Baseline
+# -----------------------
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Printed comparison against the baseline, returns the failing workloads"""
+    failures = []
+
+    # Best of the runs is compared, the median moves too much with whatever else the machine is doing
+    print(f"{'workload':<40}{'median ms':>12}{'min ms':>10}{'baseline ms':>14}{'ratio':>8}  status")
+    for name, result in results["workloads"].items():
+        expected = baseline["workloads"].get(name)
+        if expected is None:
+            print(f"{name:<40}{result['median_ms']:>12.3f}{result['min_ms']:>10.3f}{'-':>14}{'-':>8}  new")
+            continue
+
+        ratio = result["min_ms"] / expected["min_ms"]
+        status = "ok"
+        if not np.isclose(result["checksum"], expected["checksum"], rtol=1e-9, atol=1e-9):
+            status = f"changed result {expected['checksum']:.10g} -> {result['checksum']:.10g}"
+        elif ratio > 1.0 + threshold:
+            status = "REGRESSION"
+
+        if status != "ok":
+            failures.append(name)
+
+        print(f"{name:<40}{result['median_ms']:>12.3f}{result['min_ms']:>10.3f}{expected['min_ms']:>14.3f}"
+              f"{ratio:>8.2f}  {status}")
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pricing kernel benchmarks against a stored baseline")
+    parser.add_argument('--as_of', default=AS_OF, help="evaluation date, ISO")
+    parser.add_argument('--curve_setup', default="data/curve_setup.json")
+    parser.add_argument('--index_fixings', default="data/index_fixings.json")
+    parser.add_argument('--discount_curve', default="UST Discount")
+    parser.add_argument('--forecast_curve', default="OIS-SOFR")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--threshold', type=float, default=0.5, help="allowed slowdown of the best run, 0.5 = 50%%")
+    parser.add_argument('--update_baseline', action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args()
+
+    as_of = ql.DateParser.parseISO(args.as_of)
+
+    with open(args.curve_setup, "r") as f:
+        curve_setup = {curve["Name"]: curve for curve in json.load(f)}
+
+    with open(args.index_fixings, "r") as f:
+        index_fixings_data = json.load(f)
+
+    with PricingContext.evaluation_date(as_of):
+        index_fixings = CurveUtils.transform_index_fixings(index_fixings_data, as_of)
+
+        results = {
+            "as_of": args.as_of,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "quantlib": ql.__version__,
+            "machine": platform.machine(),
+            "workloads": {},
+        }
+        for name, workload in workloads(as_of, curve_setup, index_fixings,
+                                        args.discount_curve, args.forecast_curve).items():
+            timings, checksum = time_workload(workload, args.repeat)
+            timings_ms = np.array(timings) * 1e3
+            results["workloads"][name] = {
+                "median_ms": round(float(np.median(timings_ms)), 4),
+                "min_ms": round(float(timings_ms.min()), 4),
+                "checksum": checksum,
+            }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+
+    if baseline["as_of"] != results["as_of"]:
+        sys.exit(f"Baseline is as of {baseline['as_of']}, results as of {results['as_of']}")
+
+    failures = compare(results, baseline, args.threshold)
+    if failures:
+        sys.exit(f"{len(failures)} workload(s) regressed or changed: {', '.join(failures)}")
+
+
+if __name__ == "__main__":
+    main()
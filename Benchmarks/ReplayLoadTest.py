@@ -0,0 +1,146 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import argparse
+import http.client
+import json
+import subprocess
+import threading
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from Benchmarks.ServingBenchmark import SERVERS, post_callback, wait_for_server
+
+
+def load_sessions(log_file: str, app_outputs: set = None) -> list:
+    """Recorded sessions, each the list of (seconds since the previous request, request body) in order"""
+    sessions = defaultdict(list)
+    with open(log_file, "r") as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry.get("status") != 200 or (app_outputs is not None and entry["output"] not in app_outputs):
+                continue
+            sessions[entry["session"]].append(entry)
+
+    replay = []
+    for entries in sessions.values():
+        entries.sort(key=lambda entry: entry["time"])
+        gaps = np.diff([entry["time"] for entry in entries], prepend=entries[0]["time"])
+        replay.append([(float(gap), json.dumps(entry["request"]).encode("utf-8"))
+                       for gap, entry in zip(gaps, entries)])
+
+    return replay
+
+
+def virtual_user(port: int, session: list, think_scale: float, deadline: float, results: list):
+    """Replays one recorded session over and over until the deadline, one request at a time"""
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+
+    while time.monotonic() < deadline:
+        for gap, body in session:
+            if think_scale:
+                time.sleep(min(gap * think_scale, max(deadline - time.monotonic(), 0.0)))
+            if time.monotonic() >= deadline:
+                return
+
+            output = json.loads(body)["output"]
+            start = time.perf_counter()
+            try:
+                # 204 is a PreventUpdate, as good an answer as any
+                ok = post_callback(connection, body) in (200, 204)
+            except (OSError, http.client.HTTPException):
+                ok = False
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+
+            results.append((output, time.perf_counter() - start, ok))
+
+
+def run_users(port: int, sessions: list, users: int, think_scale: float, duration: float) -> list:
+    deadline = time.monotonic() + duration
+    results = []
+
+    # Virtual users take the recorded sessions round robin
+    threads = [threading.Thread(target=virtual_user,
+                                args=(port, sessions[user % len(sessions)], think_scale, deadline, results))
+               for user in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return results
+
+
+def report(users: int, results: list, duration: float) -> float:
+    latencies_ms = np.array([latency for _, latency, ok in results if ok]) * 1e3
+    if not len(latencies_ms):
+        latencies_ms = np.zeros(1)
+    errors = sum(1 for _, _, ok in results if not ok)
+
+    p50, p95, p99 = np.percentile(latencies_ms, (50, 95, 99))
+    print(f"{users:>6}{len(results) / duration:>10.1f}{p50:>10.1f}{p95:>10.1f}{p99:>10.1f}"
+          f"{latencies_ms.max():>10.1f}{errors:>8}")
+
+    return p95
+
+
+def slowest_callbacks(results: list, top: int = 5):
+    by_output = defaultdict(list)
+    for output, latency, ok in results:
+        if ok:
+            by_output[output].append(latency * 1e3)
+
+    ranked = sorted(by_output.items(), key=lambda item: -np.percentile(item[1], 95))[:top]
+    for output, latencies in ranked:
+        print(f"    p95 {np.percentile(latencies, 95):>9.1f} ms  n={len(latencies):<6}{output[:90]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replays recorded callback traffic with N virtual users")
+    parser.add_argument('--log', required=True, help="JSONL recorded with DASHQL_TRAFFIC_LOG")
+    parser.add_argument('--app', default="rates", choices=["rates", "options"])
+    parser.add_argument('--mode', default="sync", choices=list(SERVERS))
+    parser.add_argument('--workers', type=int, default=2, help="server worker processes")
+    parser.add_argument('--users', type=int, nargs="+", default=[1, 2, 4, 8, 16], help="virtual user counts to try")
+    parser.add_argument('--think_scale', type=float, default=1.0,
+                        help="scale of the recorded gaps between requests, 0 replays back to back")
+    parser.add_argument('--duration', type=float, default=30.0, help="seconds of load per user count")
+    parser.add_argument('--slo_ms', type=float, default=1000.0, help="p95 a user count must stay under")
+    parser.add_argument('--port', type=int, default=8098)
+    parser.add_argument('--external', action="store_true", help="replay against a server already on --port")
+    args = parser.parse_args()
+
+    app = __import__(args.app).app
+    sessions = load_sessions(args.log, set(app.callback_map))
+    if not sessions:
+        raise SystemExit(f"No {args.app} callbacks recorded in {args.log}")
+
+    server = None
+    if not args.external:
+        server = subprocess.Popen(SERVERS[args.mode](args.app, args.port, args.workers),
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    supported = 0
+    try:
+        wait_for_server(args.port)
+
+        print(f"{len(sessions)} recorded sessions, {sum(map(len, sessions))} requests")
+        print(f"{'users':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'errors':>8}")
+        for users in args.users:
+            results = run_users(args.port, sessions, users, args.think_scale, args.duration)
+            p95 = report(users, results, args.duration)
+            slowest_callbacks(results)
+
+            if p95 <= args.slo_ms and all(ok for _, _, ok in results):
+                supported = users
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(f"Concurrent users within a {args.slo_ms:.0f} ms p95: {supported or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import argparse
+import copy
+import http.client
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+from Common.Utils import PortalSnapshot
+
+# Sync gunicorn workers (the current setup) against the ASGI entry point under uvicorn workers
+SERVERS = {
+    "sync": lambda app, port, workers: [
+        sys.executable, "-m", "gunicorn", f"{app}:server", "--bind", f"127.0.0.1:{port}",
+        "--workers", str(workers), "--worker-class", "sync",
+    ],
+    "asgi": lambda app, port, workers: [
+        sys.executable, "-m", "gunicorn", f"{app}:asgi", "--bind", f"127.0.0.1:{port}",
+        "--workers", str(workers), "--worker-class", "uvicorn.workers.UvicornWorker",
+    ],
+}
+
+
+def callback_payload(app, output_key: str, input_values: list, state_values: list = ()) -> dict:
+    """Body of a /_dash-update-component request, as the Dash renderer sends it"""
+    callback = app.callback_map[output_key]
+    outputs = callback["output"]
+    multi = isinstance(outputs, list)
+
+    outputs_json = [{"id": output.component_id, "property": output.component_property}
+                    for output in (outputs if multi else [outputs])]
+
+    return {
+        "output": output_key,
+        "outputs": outputs_json if multi else outputs_json[0],
+        "inputs": [dict(callback_input, value=value) for callback_input, value in zip(callback["inputs"], input_values)],
+        "state": [dict(callback_state, value=value) for callback_state, value in zip(callback["state"], state_values)],
+        "changedPropIds": [f"{callback_input['id']}.{callback_input['property']}" for callback_input in callback["inputs"]],
+    }
+
+
+def output_key(app, prefix: str) -> str:
+    return next(key for key in app.callback_map if key.startswith(prefix))
+
+
+def heavy_payload(app, curve_data: dict) -> bytes:
+    # Mid-curve surface on a freshly edited curve: a cache miss, so a full bootstrap every request
+    curve_data = copy.deepcopy(curve_data)
+    curve_data.pop("Nodes", None)
+    row = random.choice([row for row in curve_data["MarketData"] if row["instrument_type"] == "Swap"])
+    row["quote"] = round(row["quote"] + random.uniform(-0.05, 0.05), 4)
+
+    return json.dumps(callback_payload(app, output_key(app, "..mid-curve-grid.rowTransaction"), [curve_data])).encode("utf-8")
+
+
+def light_payload(app) -> bytes:
+    # Error banner: no QuantLib at all
+    key = output_key(app, "..error-banner.children")
+    return json.dumps(callback_payload(app, key, [None] * len(app.callback_map[key]["inputs"]))).encode("utf-8")
+
+
+def wait_for_server(port: int, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            connection.request("GET", "/")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.25)
+
+    raise TimeoutError(f"Server on port {port} did not come up")
+
+
+def post_callback(connection: http.client.HTTPConnection, body: bytes, poll_interval: float = 0.05) -> int:
+    """
+    POST a callback request the way the renderer does, status of the final response.
+    Background callbacks answer with a job, polled until its result (or cancellation) comes back.
+    """
+    headers = {"Content-Type": "application/json"}
+
+    connection.request("POST", "/_dash-update-component", body=body, headers=headers)
+    response = connection.getresponse()
+    data = response.read()
+    if response.status != 200 or b'"cacheKey"' not in data[:64]:
+        return response.status
+
+    job = json.loads(data)
+    path = f"/_dash-update-component?cacheKey={job['cacheKey']}&job={job['job']}"
+    while True:
+        time.sleep(poll_interval)
+        connection.request("POST", path, body=body, headers=headers)
+        response = connection.getresponse()
+        data = response.read()
+        if response.status != 200 or b'"response"' in data:
+            return response.status
+
+
+def client(port: int, payloads, deadline: float, latencies: list, errors: list):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+
+    while time.monotonic() < deadline:
+        body = payloads()
+        start = time.perf_counter()
+        try:
+            status = post_callback(connection, body)
+            if status != 200:
+                errors.append(status)
+                continue
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(str(e))
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+            continue
+
+        latencies.append(time.perf_counter() - start)
+
+
+def run_load(port: int, app, curve_data: dict, heavy_clients: int, light_clients: int, duration: float) -> dict:
+    deadline = time.monotonic() + duration
+    results = {"heavy": ([], []), "light": ([], [])}
+
+    light_body = light_payload(app)
+    threads = [
+        threading.Thread(target=client, args=(port, lambda: heavy_payload(app, curve_data), deadline, *results["heavy"]))
+        for _ in range(heavy_clients)
+    ] + [
+        threading.Thread(target=client, args=(port, lambda: light_body, deadline, *results["light"]))
+        for _ in range(light_clients)
+    ]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync WSGI vs ASGI serving benchmark")
+    parser.add_argument('--app', default="rates", choices=["rates"])
+    parser.add_argument('--modes', nargs="+", default=list(SERVERS), choices=list(SERVERS))
+    parser.add_argument('--workers', type=int, default=2, help="server worker processes")
+    parser.add_argument('--heavy_clients', type=int, default=4, help="clients repricing the mid-curve surface")
+    parser.add_argument('--light_clients', type=int, default=4, help="clients refreshing the error banner")
+    parser.add_argument('--duration', type=float, default=15.0, help="seconds of load per mode")
+    parser.add_argument('--port', type=int, default=8097)
+    args = parser.parse_args()
+
+    app = __import__(args.app).app
+    curve_data = PortalSnapshot.get_snapshot().curves["OIS-SOFR"]
+
+    print(f"{'mode':<8}{'class':<8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'errors':>8}")
+    for mode in args.modes:
+        server = subprocess.Popen(SERVERS[mode](args.app, args.port, args.workers),
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_for_server(args.port)
+            results = run_load(args.port, app, curve_data, args.heavy_clients, args.light_clients, args.duration)
+        finally:
+            server.terminate()
+            server.wait()
+
+        for request_class, (latencies, errors) in results.items():
+            latencies_ms = np.array(latencies) * 1e3 if latencies else np.zeros(1)
+            print(f"{mode:<8}{request_class:<8}{len(latencies) / args.duration:>10.1f}"
+                  f"{np.percentile(latencies_ms, 50):>10.1f}{np.percentile(latencies_ms, 95):>10.1f}"
+                  f"{latencies_ms.max():>10.1f}{len(errors):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,11 +12,13 @@ class CurveChartPanel(object):
         self.app = app
         self.curve_chart_id = f"{prefix}-curve-chart"
         self.curve_chart_data_id = f"{prefix}-curve-chart-data"
+        self.curve_chart_overlay_data_id = f"{prefix}-curve-chart-overlay-data"
         self._register_callbacks()
 
     def layout(self):
         return html.Div([
                 dcc.Store(id=self.curve_chart_data_id),
+                dcc.Store(id=self.curve_chart_overlay_data_id),
                 dcc.Graph(
                 id=self.curve_chart_id,
                 style={"width": "100%", "height": "400px",
@@ -27,9 +29,10 @@ class CurveChartPanel(object):
         @self.app.callback(
             Output(self.curve_chart_id, "figure"),
             Input(self.curve_chart_data_id, "data"),
+            Input(self.curve_chart_overlay_data_id, "data"),
             prevent_initial_call=True
         )
-        def on_data_ready(pricer_results):
+        def on_data_ready(pricer_results, overlay_results):
             if pricer_results:
 
                 figure = go.Figure(
@@ -83,4 +86,21 @@ class CurveChartPanel(object):
                     )
                 )
 
+                # Historical curve, dashed over the live one
+                if overlay_results:
+                    figure.add_trace(
+                        go.Scatter(
+                            x=overlay_results['tenors'],
+                            y=overlay_results['rates'],
+                            mode="lines",
+                            name=overlay_results['name'],
+                            line=dict(
+                                color="rgba(241,196,101,1)",
+                                width=1.25,
+                                dash="dash",
+                                shape="spline"
+                            ),
+                        )
+                    )
+
                 return figure
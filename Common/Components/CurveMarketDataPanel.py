@@ -1,14 +1,16 @@
 # Copyright (c) Mike Kipnis - DashQL
 
-import copy
+import uuid
 
 import dash
 import dash_ag_grid as dag
-from dash import Input, Output, State
+from dash import Input, Output, State, ctx
 import QuantLib as ql
 import plotly.graph_objs as go
 from dash import dcc, html
 
+from Common.Utils import CurveCache, CurveGraph, LiveCurve, PricingContext, SessionStore
+
 
 class CurveMarketDataPanel(object):
 
@@ -18,6 +20,7 @@ class CurveMarketDataPanel(object):
         self.market_data_grid_id = f"{prefix}-market-data-grid"
         self.index_dropdown_id = f"{prefix}-index-dropdown"
         self.user_market_data_id = f"{prefix}-user-market-data"
+        self.session_id = f"{prefix}-session-id"
 
         self.grid = dag.AgGrid(
             id=self.market_data_grid_id,
@@ -97,6 +100,7 @@ class CurveMarketDataPanel(object):
             ),
             self.grid,
             dcc.Store(id=self.user_market_data_id),
+            dcc.Store(id=self.session_id, storage_type="session"),
     ])
 
 
@@ -115,43 +119,72 @@ class CurveMarketDataPanel(object):
 
             return options, next(iter(swap_curves))
 
+        @self.app.callback(
+            Output(self.session_id, "data"),
+            Input("portal-curves", "data"),
+            State(self.session_id, "data"),
+        )
+        def on_session_start(_, session_id):
+            return session_id or uuid.uuid4().hex
+
         @self.app.callback(
             Output(self.market_data_grid_id, "rowData"),
             Input(self.index_dropdown_id, "value"),
-            State("portal-curves", "data"),
             State(self.user_market_data_id, "data"),
+            State(self.session_id, "data"),
             prevent_initial_call=True
         )
-        def on_data_ready(curve_name, swap_data, user_market_data):
+        def on_data_ready(curve_name, user_market_data, session_id):
             if not curve_name:
                 return [], None
 
-            if user_market_data is not None and curve_name in user_market_data:
-                curve = user_market_data[curve_name]
-            else:
-                curve = swap_data[curve_name]
+            # After a reload the session's edits are still on the server
+            if not user_market_data and session_id:
+                user_market_data = SessionStore.session_ref(session_id, 0)
 
-            curve['MarketData'].sort(
+            curve = SessionStore.session_curves(user_market_data)[curve_name]
+
+            # Sorted copy, the curves are shared with the other sessions
+            return sorted(
+                curve['MarketData'],
                 key=lambda x: (x['days_to_maturity'] if x['days_to_maturity'] is not None else float('inf'))
             )
 
-            return curve['MarketData']
-
         @self.app.callback(
             Output(self.user_market_data_id, "data"),
             State(self.index_dropdown_id, "value"),
-            State("portal-curves", "data"),
             State(self.user_market_data_id, "data"),
             Input(self.market_data_grid_id, "rowData"),
-            Input(self.market_data_grid_id, "cellValueChanged")
+            Input(self.market_data_grid_id, "cellValueChanged"),
+            Input(self.session_id, "data"),
         )
-        def on_market_data_update(curve_name, portal_market_data, user_market_data, row_data, _):
-            if row_data:
-                pass
+        @PricingContext.pricing_job
+        def on_market_data_update(curve_name, user_market_data, row_data, _, session_id):
+            if not session_id:
+                return dash.no_update
+
+            # The browser only holds a reference, the session's edits live in the server-side session store
+            if not user_market_data or user_market_data["SessionId"] != session_id:
+                session_ref = SessionStore.session_ref(session_id, 0)
+            else:
+                session_ref = user_market_data
+
+            unchanged = dash.no_update if session_ref is user_market_data else session_ref
+            if not curve_name or not row_data:
+                return unchanged
+
+            curve_data = SessionStore.session_curves(session_ref)[curve_name]
+            if CurveGraph.curve_version(dict(curve_data, MarketData=row_data)) == CurveGraph.curve_version(curve_data):
+                return unchanged
 
-            if user_market_data is None:
-                user_market_data = copy.deepcopy(portal_market_data)
+            # Quote edit: re-bootstrap the session's live curve in place and share it with the other panels
+            if f"{self.market_data_grid_id}.cellValueChanged" in ctx.triggered_prop_ids:
+                LiveCurve.apply_market_data_edit(session_id, curve_name, row_data)
 
-            user_market_data[curve_name]['MarketData'] = row_data
+            # Keep the bootstrapped nodes with the quotes, so downstream panels rebuild the curve without the solver
+            try:
+                nodes = CurveCache.get_nodes(dict(curve_data, MarketData=row_data, Nodes=None))
+            except Exception:
+                nodes = None
 
-            return user_market_data
\ No newline at end of file
+            return SessionStore.put_curve(session_id, curve_name, row_data, nodes)
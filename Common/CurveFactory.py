@@ -2,19 +2,169 @@
 
 import json
 import argparse
-from datetime import date
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 
+import numpy as np
 import QuantLib as ql
-from Common.Utils import CurveUtils
+from Common.Utils import CurveHistory, CurveUtils
 
+# Snapshot files carry their business date in the name, e.g. curve_setup_2025-06-30.json
+SNAPSHOT_DATE = re.compile(r"(\d{4})-?(\d{2})-?(\d{2})")
 
-def main():
-    parser = argparse.ArgumentParser(description="Curve Factory")
-    parser.add_argument('--json_file', required=True)
-    args = parser.parse_args()
 
+def parse_date(iso_date: str) -> ql.Date:
+    return ql.DateParser.parseISO(iso_date)
+
+
+def business_dates(start: ql.Date, end: ql.Date) -> list:
+    # Same calendar as CurveUtils.business_date
+    return list(ql.TARGET().businessDayList(start, end))
+
+
+def snapshot_files(snapshot_dir: str, start: ql.Date = None, end: ql.Date = None) -> list:
+    """(business date, file) of every dated curve setup snapshot in snapshot_dir, in date order"""
+    snapshots = []
+    for file_name in sorted(os.listdir(snapshot_dir)):
+        match = SNAPSHOT_DATE.search(file_name)
+        if not file_name.endswith(".json") or not match:
+            continue
+
+        year, month, day = (int(part) for part in match.groups())
+        as_of = ql.Date(day, month, year)
+        if (start and as_of < start) or (end and as_of > end):
+            continue
+
+        snapshots.append((as_of, os.path.join(snapshot_dir, file_name)))
+
+    return sorted(snapshots)
+
+
+# -----------------------
+# Bootstrap
+# -----------------------
+
+def bootstrap_date(as_of_serial: int, curve_setup_file: str, curve_tenors: list) -> list:
+    """
+    Bootstrap every curve of a curve setup as of one business date.
+
+    Returns (curve name, node serials, node discounts, tenor grid rates, error) per curve,
+    error set and the arrays None when the curve failed to bootstrap.
+    """
+    as_of = ql.Date(as_of_serial)
+    ql.Settings.instance().evaluationDate = as_of
+
+    with open(curve_setup_file, "r") as f:
+        curve_setup = json.load(f)
+
+    results = []
+    for curve in curve_setup:
+        try:
+            market_data = CurveUtils.transform_curve_components(curve, as_of)
+            ql_curve, _ = CurveUtils.bootstrap(CurveUtils.create_rate_helpers(market_data))
+
+            nodes = CurveUtils.curve_nodes(ql_curve)
+            node_serials = np.array([node_date.serialNumber() for node_date in ql_curve.dates()], dtype=np.int64)
+            rates = CurveUtils.curve_rates(curve, nodes, curve_tenors)
+
+            results.append((curve["Name"], node_serials, np.array(nodes["Discounts"]), rates, None))
+        except RuntimeError as e:
+            results.append((curve["Name"], None, None, None, str(e)))
+
+    return results
+
+
+def bootstrap_batch(jobs: list, curve_tenors: list, workers: int = None) -> list:
+    """Bootstrap (business date, curve setup file) jobs across a process pool, results in job order"""
+    as_of_serials = [as_of.serialNumber() for as_of, _ in jobs]
+    curve_setup_files = [curve_setup_file for _, curve_setup_file in jobs]
+
+    if workers == 1:
+        return [bootstrap_date(serial, curve_setup_file, curve_tenors)
+                for serial, curve_setup_file in zip(as_of_serials, curve_setup_files)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(bootstrap_date, as_of_serials, curve_setup_files,
+                                 [curve_tenors] * len(jobs), chunksize=max(len(jobs) // (4 * (workers or os.cpu_count() or 1)), 1)))
+
+
+# -----------------------
+# Columnar output
+# -----------------------
+
+def save_curves(output_file: str, jobs: list, results: list, curve_tenors: list) -> int:
+    """
+    One row per (business date, curve), written with np.savez_compressed:
+
+    as_of, curve         row business date serial and index into curve_names
+    node_offsets         row i owns node_dates/node_discounts[node_offsets[i]:node_offsets[i + 1]]
+    node_dates           node date serials
+    node_discounts       node discount factors
+    rates                rows x tenors grid, percent
+    """
+    curve_names = []
+    as_of_serials, curve_ids, node_offsets = [], [], [0]
+    node_dates, node_discounts, rates = [], [], []
+
+    for (as_of, _), date_results in zip(jobs, results):
+        for curve_name, serials, discounts, curve_rates, error in date_results:
+            if error:
+                print(f"Skipping {curve_name} as of {as_of.ISO()}: {error}")
+                continue
+
+            if curve_name not in curve_names:
+                curve_names.append(curve_name)
+
+            as_of_serials.append(as_of.serialNumber())
+            curve_ids.append(curve_names.index(curve_name))
+            node_dates.append(serials)
+            node_discounts.append(discounts)
+            node_offsets.append(node_offsets[-1] + len(serials))
+            rates.append(curve_rates)
+
+    np.savez_compressed(
+        output_file,
+        curve_names=np.array(curve_names),
+        tenors=np.array(curve_tenors),
+        day_counter=np.array(CurveUtils.CURVE_DAY_COUNTER),
+        as_of=np.array(as_of_serials, dtype=np.int64),
+        curve=np.array(curve_ids, dtype=np.int32),
+        node_offsets=np.array(node_offsets, dtype=np.int64),
+        node_dates=np.concatenate(node_dates) if node_dates else np.empty(0, dtype=np.int64),
+        node_discounts=np.concatenate(node_discounts) if node_discounts else np.empty(0),
+        rates=np.array(rates).reshape(len(rates), len(curve_tenors)),
+    )
+
+    return len(as_of_serials)
+
+
+def load_curves(curves_file: str) -> dict:
+    """Bulk-load a curve factory file: {(as of ISO date, curve name): nodes}, nodes as in CurveUtils.curve_nodes"""
+    with np.load(curves_file) as data:
+        curve_names = data["curve_names"].tolist()
+        day_counter = str(data["day_counter"])
+        node_offsets = data["node_offsets"]
+        node_dates = data["node_dates"]
+        node_discounts = data["node_discounts"]
+
+        curves = {}
+        for row, (as_of_serial, curve_id) in enumerate(zip(data["as_of"].tolist(), data["curve"].tolist())):
+            begin, end = node_offsets[row], node_offsets[row + 1]
+            curves[(ql.Date(as_of_serial).ISO(), curve_names[curve_id])] = {
+                "Key": None,
+                "Dates": [ql.Date(int(serial)).ISO() for serial in node_dates[begin:end]],
+                "Discounts": node_discounts[begin:end].tolist(),
+                "DayCounter": day_counter,
+            }
+
+    return curves
+
+
+def transform_curves(json_file: str):
     # Read JSON file
-    with open(args.json_file, "r") as f:
+    with open(json_file, "r") as f:
         data = json.load(f)
 
     curve_dict = {}
@@ -26,5 +176,53 @@ def main():
 
     print(curve_dict)
 
+
+def main():
+    parser = argparse.ArgumentParser(description="Curve Factory")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--json_file', help="curve setup bootstrapped on every business date in the range")
+    source.add_argument('--snapshot_dir', help="directory of curve setups dated in their file names")
+    parser.add_argument('--start', help="first business date (ISO), defaults to the current business date")
+    parser.add_argument('--end', help="last business date (ISO), defaults to --start")
+    parser.add_argument('--output', help=".npz file of curve nodes and tenor grids, prints the transformed curves when omitted")
+    parser.add_argument('--store', help="curve history store directory the batch is merged into")
+    parser.add_argument('--workers', type=int, default=None, help="bootstrap processes, defaults to the CPU count")
+    args = parser.parse_args()
+
+    if not args.output and not args.store:
+        if not args.json_file:
+            parser.error("--output or --store is required with --snapshot_dir")
+        transform_curves(args.json_file)
+        return
+
+    start = parse_date(args.start) if args.start else None
+    end = parse_date(args.end) if args.end else start
+
+    if args.json_file:
+        start = start or CurveUtils.business_date()
+        jobs = [(as_of, args.json_file) for as_of in business_dates(start, end or start)]
+    else:
+        jobs = snapshot_files(args.snapshot_dir, start, end)
+
+    if not jobs:
+        parser.error("no business dates to bootstrap")
+
+    curve_tenors = list(CurveUtils.CURVE_TENORS)
+    results = bootstrap_batch(jobs, curve_tenors, args.workers)
+
+    if args.output:
+        rows = save_curves(args.output, jobs, results, curve_tenors)
+        print(f"Wrote {rows} curves over {len(jobs)} business dates to {args.output}")
+
+    if args.store:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            batch_file = args.output or os.path.join(temp_dir, "curves.npz")
+            if not args.output:
+                save_curves(batch_file, jobs, results, curve_tenors)
+
+            curve_names = CurveHistory.write_curve_batch(args.store, batch_file)
+        print(f"Merged {', '.join(curve_names)} into {args.store}")
+
+
 if __name__ == "__main__":
     main()
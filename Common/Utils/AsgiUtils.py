@@ -0,0 +1,151 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import asyncio
+import io
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import dash
+
+UPDATE_COMPONENT_PATH = "/_dash-update-component"
+
+
+def pricing_outputs(app: dash.Dash) -> set:
+    """Output keys of the callbacks decorated with PricingContext.pricing_job"""
+    return {output_key for output_key, callback in app.callback_map.items()
+            if getattr(callback.get("callback"), "pricing_job", False)}
+
+
+def wsgi_environ(scope: dict, body: bytes) -> dict:
+    """PEP 3333 environ of an ASGI HTTP request whose body has been read"""
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+    client_host, client_port = scope.get("client") or ("", 0)
+
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server_name,
+        "SERVER_PORT": str(server_port),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "REMOTE_ADDR": client_host,
+        "REMOTE_PORT": str(client_port),
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+
+    for name, value in scope["headers"]:
+        name = name.decode("latin-1")
+        value = value.decode("latin-1")
+
+        if name == "content-type":
+            environ["CONTENT_TYPE"] = value
+        elif name != "content-length":
+            key = "HTTP_" + name.upper().replace("-", "_")
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+
+    return environ
+
+
+def run_wsgi(wsgi_app, environ: dict):
+    """Run the Flask server on one request, (status, headers, body) once the response is complete"""
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response["status"] = int(status.split(" ", 1)[0])
+        response["headers"] = [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers]
+
+    chunks = wsgi_app(environ, start_response)
+    try:
+        body = b"".join(chunks)
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+
+    return response["status"], response["headers"], body
+
+
+class DashAsgi(object):
+    """
+    ASGI entry point for a Dash app.
+
+    The Flask server keeps handling every request, the event loop only reads bodies and
+    dispatches: pricing callbacks (PricingContext.pricing_job) run on their own executor,
+    everything else (layout, assets, dropdowns, error banners) on a separate one, so a slow
+    bootstrap never queues a cheap callback behind it.
+    """
+
+    def __init__(self, app: dash.Dash, threads: int = 8, pricing_threads: int = 4):
+        self.app = app
+        self.executor = ThreadPoolExecutor(threads, thread_name_prefix="dashql-asgi")
+        self.pricing_executor = ThreadPoolExecutor(pricing_threads, thread_name_prefix="dashql-pricing")
+        self._pricing_outputs = None
+
+    def _request_executor(self, scope: dict, body: bytes) -> ThreadPoolExecutor:
+        if scope["method"] != "POST" or not scope["path"].endswith(UPDATE_COMPONENT_PATH):
+            return self.executor
+
+        # Callbacks are all registered by the time requests come in
+        if self._pricing_outputs is None:
+            self._pricing_outputs = pricing_outputs(self.app)
+
+        try:
+            output_key = json.loads(body).get("output")
+        except ValueError:
+            return self.executor
+
+        return self.pricing_executor if output_key in self._pricing_outputs else self.executor
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.pricing_executor.shutdown(wait=False, cancel_futures=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+
+        if scope["type"] != "http":
+            raise NotImplementedError(f"Unsupported ASGI scope: {scope['type']}")
+
+        body = bytearray()
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            body.extend(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+
+        body = bytes(body)
+        executor = self._request_executor(scope, body)
+
+        status, headers, response_body = await asyncio.get_running_loop().run_in_executor(
+            executor, run_wsgi, self.app.server, wsgi_environ(scope, body)
+        )
+
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": response_body})
+
+
+def asgi_app(app: dash.Dash) -> DashAsgi:
+    return DashAsgi(
+        app,
+        threads=int(os.getenv("DASHQL_ASGI_THREADS", "8")),
+        pricing_threads=int(os.getenv("DASHQL_ASGI_PRICING_THREADS", "4")),
+    )
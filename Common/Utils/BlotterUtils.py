@@ -0,0 +1,370 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import base64
+import csv
+import datetime
+import io
+import json
+import os
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict, defaultdict
+
+import diskcache
+import numpy as np
+import QuantLib as ql
+
+from Common.Utils import BondBatchUtils, BondUtils, ConvertUtils, CurveCache, VectorCurveUtils
+from Common.Utils.Constants import PricingConstants, RoundingConstants
+
+BLOTTER_CACHE_DIR = os.path.join(tempfile.gettempdir(), "dashql_blotters")
+
+# Positions valued per pricing job, and pricing processes per valuation
+BLOTTER_CHUNK = int(os.getenv("DASHQL_BLOTTER_CHUNK", "250"))
+BLOTTER_WORKERS = int(os.getenv("DASHQL_BLOTTER_WORKERS", str(os.cpu_count() or 1)))
+
+REQUIRED_FIELDS = ("Coupon", "Maturity", "Notional")
+
+# Conventions of a position that leaves them out, keys of the ConvertUtils dropdown dicts
+POSITION_DEFAULTS = {
+    "Frequency": "Semiannual",
+    "DayCounter": "ActualActual_Bond",
+    "Calendars": ["UnitedStates_GovernmentBond"],
+    "BusDayConv": "ModifiedFollowing",
+    "DateGeneration": "Backward",
+    "SettlementDays": 1,
+    "EndOfMonth": False,
+}
+
+# Valuation figures per position, with the rounding they are shown to
+RESULT_FIELDS = {
+    "PV": RoundingConstants.ROUND_MONEY,
+    "Price(Curve)": RoundingConstants.ROUND_PRICE,
+    "Yield": RoundingConstants.ROUND_RATE,
+    "DV01": RoundingConstants.ROUND_MONEY,
+    "Modified Duration": RoundingConstants.ROUND_YEARS,
+    "Convexity": RoundingConstants.ROUND_MONEY,
+}
+
+
+# -----------------------
+# Upload
+# -----------------------
+
+def _iso_date(value) -> str:
+    return datetime.date.fromisoformat(str(value).strip()).isoformat()
+
+
+def _choice(options: dict, value, name: str) -> str:
+    value = str(value).strip()
+    if value not in options:
+        raise ValueError(f"unknown {name} {value}")
+    return value
+
+
+def _calendars(value) -> list:
+    calendars = value if isinstance(value, list) else str(value).replace("|", ";").split(";")
+    return [_choice(ConvertUtils.Calendars, calendar, "calendar") for calendar in calendars if str(calendar).strip()]
+
+
+def _flag(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y")
+
+
+def normalize_position(row: dict, row_number: int) -> dict:
+    """Position with every field typed and every convention filled in, ValueError naming the row otherwise"""
+    row = {str(key).strip(): value for key, value in row.items() if key is not None and value not in (None, "")}
+
+    missing = [field for field in REQUIRED_FIELDS if field not in row]
+    if missing:
+        raise ValueError(f"Position {row_number}: missing {', '.join(missing)}")
+
+    row = dict(POSITION_DEFAULTS, **row)
+    try:
+        return {
+            "Id": str(row.get("Id", row_number)),
+            "Coupon": float(row["Coupon"]),
+            "Maturity": _iso_date(row["Maturity"]),
+            "Notional": float(row["Notional"]),
+            "Price": float(row["Price"]) if "Price" in row else None,
+            "IssueDate": _iso_date(row["IssueDate"]) if "IssueDate" in row else None,
+            "Frequency": _choice(ConvertUtils.Frequencies, row["Frequency"], "frequency"),
+            "DayCounter": _choice(ConvertUtils.DayCounterNames, row["DayCounter"], "day counter"),
+            "Calendars": _calendars(row["Calendars"]),
+            "BusDayConv": _choice(ConvertUtils.BusDayConv, row["BusDayConv"], "business day convention"),
+            "DateGeneration": _choice(ConvertUtils.DateGeneration, row["DateGeneration"], "date generation"),
+            "SettlementDays": int(float(row["SettlementDays"])),
+            "EndOfMonth": _flag(row["EndOfMonth"]),
+        }
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Position {row_number}: {e}") from None
+
+
+def parse_upload(contents: str, filename: str) -> list:
+    """
+    Positions of a dcc.Upload file: CSV with a header row, or JSON holding a list of positions.
+    Calendars are ';' separated in a CSV.
+    """
+    _, encoded = contents.split(",", 1)
+    text = base64.b64decode(encoded).decode("utf-8-sig")
+
+    if filename and filename.lower().endswith(".json"):
+        rows = json.loads(text)
+        if not isinstance(rows, list):
+            raise ValueError(f"{filename}: expected a list of positions")
+    else:
+        rows = list(csv.DictReader(io.StringIO(text)))
+
+    if not rows:
+        raise ValueError(f"No positions in {filename}")
+
+    return [normalize_position(row, row_number) for row_number, row in enumerate(rows, 1)]
+
+
+# -----------------------
+# Valuation
+# -----------------------
+
+def last_coupon_date(maturity_date: ql.Date, frequency, as_of: ql.Date) -> ql.Date:
+    """Maturity stepped back by whole coupon periods to on or before as_of"""
+    period = ql.Period(frequency)
+    if period.length() <= 0:
+        return as_of
+
+    periods = 1
+    issue_date = maturity_date
+    while issue_date > as_of:
+        issue_date = maturity_date - ql.Period(periods * period.length(), period.units())
+        periods += 1
+
+    return issue_date
+
+
+def bond_terms(position: dict, as_of: ql.Date) -> tuple:
+    """
+    (schedule, bond info) of a position, as SchedulePanel and FixedRateBondPanel hand them to
+    BondUtils. Without an issue date the bond is taken as paying regular coupons up to maturity.
+    """
+    frequency = ConvertUtils.Frequencies[position["Frequency"]]
+    maturity_date = ql.DateParser.parseISO(position["Maturity"])
+
+    issue_date = position["IssueDate"]
+    if issue_date is None:
+        issue_date = last_coupon_date(maturity_date, ConvertUtils.enum_from_string(frequency), as_of).ISO()
+
+    schedule = {
+        "Calendars": position["Calendars"],
+        "BusDayConv": position["BusDayConv"],
+        "TermBusDayConv": position["BusDayConv"],
+        "Compounding": "QuantLib.Compounded",
+        "Frequency": frequency,
+        "DateGeneration": ConvertUtils.DateGeneration[position["DateGeneration"]],
+        "issue_date": issue_date,
+        "maturity_date": position["Maturity"],
+        "endOfMonth": position["EndOfMonth"],
+    }
+    bond_info = {
+        "Coupon": [position["Coupon"] / PricingConstants.RATE_FACTOR],
+        "SettlementDays": position["SettlementDays"],
+        "DayCounter": position["DayCounter"],
+        "FaceAmount": position["Notional"],
+    }
+
+    return schedule, bond_info
+
+
+def value_positions(curve_data: dict, positions: list) -> dict:
+    """
+    Pricing job: RESULT_FIELDS arrays of the positions, discounted on the curve, yield figures
+    at the position price (at the curve price when it has none). NaN for a position that does
+    not price, e.g. matured or with a schedule QuantLib rejects.
+    """
+    as_of = ql.Settings.instance().evaluationDate
+    vector_curve = VectorCurveUtils.VectorCurve.from_nodes(CurveCache.get_nodes(curve_data))
+
+    results = {field: np.full(len(positions), np.nan) for field in RESULT_FIELDS}
+
+    # A batch shares its yield conventions
+    groups = defaultdict(list)
+    for index, position in enumerate(positions):
+        groups[(position["DayCounter"], position["Frequency"])].append(index)
+
+    for (day_counter, frequency), indices in groups.items():
+        priced, bonds = [], []
+        for index in indices:
+            try:
+                bond = BondUtils.get_fixed_rate_bond(*bond_terms(positions[index], as_of))
+            except RuntimeError:
+                continue
+            if bond.isExpired() or bond.settlementDate() > bond.maturityDate():
+                continue
+            priced.append(index)
+            bonds.append(bond)
+
+        if not bonds:
+            continue
+
+        batch = BondBatchUtils.BondBatch.from_bonds(bonds, day_counter, "QuantLib.Compounded",
+                                                    ConvertUtils.Frequencies[frequency])
+
+        curve_prices = batch.curve_clean_prices(vector_curve)
+        prices = np.array([positions[index]["Price"] for index in priced], dtype=float)
+        prices = np.where(np.isnan(prices), curve_prices, prices)
+        yields = batch.yields(prices)
+
+        results["PV"][priced] = batch.curve_dirty_prices(vector_curve) * batch.notionals / PricingConstants.RATE_FACTOR
+        results["Price(Curve)"][priced] = curve_prices
+        results["Yield"][priced] = yields * PricingConstants.RATE_FACTOR
+        results["DV01"][priced] = batch.basis_point_values(yields)
+        results["Modified Duration"][priced] = batch.modified_durations(yields)
+        results["Convexity"][priced] = batch.convexities(yields)
+
+    return results
+
+
+def add_totals(totals: dict, results: dict) -> dict:
+    """Running totals of a valuation with one more chunk of results"""
+    valued = ~np.isnan(results["PV"])
+    return dict(
+        totals,
+        Valued=totals["Valued"] + int(valued.sum()),
+        PV=totals["PV"] + float(np.sum(results["PV"][valued])),
+        DV01=totals["DV01"] + float(np.sum(results["DV01"][valued])),
+    )
+
+
+# -----------------------
+# Store
+# -----------------------
+
+class BlotterStore(object):
+    """
+    Uploaded positions and their valuations, in a disk cache shared by the gunicorn workers
+    and the job processes valuing them. Entries expire after expire seconds.
+
+    Positions never change once stored, the last few read are memoized per process.
+    """
+
+    def __init__(self, cache_dir: str = BLOTTER_CACHE_DIR, expire: float = 3600.0, cache_size: int = 8):
+        self.cache_dir = cache_dir
+        self.expire = expire
+        self.cache_size = cache_size
+
+        self._disk = None
+        self._pid = None
+        self._positions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cache(self) -> diskcache.Cache:
+        # Opened per process: SQLite connections do not survive a fork
+        with self._lock:
+            if self._disk is None or self._pid != os.getpid():
+                self._disk = diskcache.Cache(self.cache_dir)
+                self._pid = os.getpid()
+            return self._disk
+
+    def put_positions(self, positions: list) -> str:
+        blotter_id = uuid.uuid4().hex
+        self._cache().set(("positions", blotter_id), positions, expire=self.expire)
+        return blotter_id
+
+    def positions(self, blotter_id: str) -> list:
+        with self._lock:
+            positions = self._positions.get(blotter_id)
+            if positions is not None:
+                self._positions.move_to_end(blotter_id)
+                return positions
+
+        positions = self._cache().get(("positions", blotter_id))
+        if positions is None:
+            raise KeyError(f"Blotter {blotter_id} has expired, upload it again")
+
+        with self._lock:
+            self._positions[blotter_id] = positions
+            while len(self._positions) > self.cache_size:
+                self._positions.popitem(last=False)
+
+        return positions
+
+    def put_results(self, valuation_id: str, chunk_index: int, results: dict):
+        self._cache().set(("results", valuation_id, chunk_index), results, expire=self.expire)
+
+    def results(self, valuation_id: str, chunks: int, chunk_size: int, count: int) -> dict:
+        """RESULT_FIELDS arrays of the whole blotter, NaN for the chunks not valued yet"""
+        results = {field: np.full(count, np.nan) for field in RESULT_FIELDS}
+
+        cache = self._cache()
+        for chunk_index in range(chunks):
+            chunk = cache.get(("results", valuation_id, chunk_index))
+            if chunk is None:
+                continue
+
+            start = chunk_index * chunk_size
+            for field in RESULT_FIELDS:
+                results[field][start:start + len(chunk[field])] = chunk[field]
+
+        return results
+
+
+blotter_store = BlotterStore(
+    os.getenv("DASHQL_BLOTTER_CACHE", BLOTTER_CACHE_DIR),
+    expire=float(os.getenv("DASHQL_BLOTTER_EXPIRE_SECONDS", "3600")),
+)
+
+os.register_at_fork(after_in_child=lambda: setattr(blotter_store, "_lock", threading.Lock()))
+
+
+def put_positions(positions: list) -> str:
+    return blotter_store.put_positions(positions)
+
+
+def positions(blotter_id: str) -> list:
+    return blotter_store.positions(blotter_id)
+
+
+def put_results(valuation_id: str, chunk_index: int, results: dict):
+    blotter_store.put_results(valuation_id, chunk_index, results)
+
+
+def valuation_id(blotter_id: str, curve_data: dict) -> str:
+    """A blotter valued on one market state, see CurveCache.key"""
+    curve_key = CurveCache.curve_cache.key(curve_data["Curve"]["Name"], curve_data["MarketData"])
+    return f"{blotter_id}-{curve_key[:16]}"
+
+
+# -----------------------
+# Grid
+# -----------------------
+
+def blotter_rows(blotter_id: str, valuation: dict, start_row: int, end_row: int, sort_model: list = None) -> tuple:
+    """(rows start_row to end_row, row count) of the blotter with its valuation so far, for the infinite row model"""
+    blotter_positions = positions(blotter_id)
+    count = len(blotter_positions)
+
+    results = None
+    if valuation:
+        results = blotter_store.results(valuation["ValuationId"], valuation["Chunks"], valuation["ChunkSize"], count)
+
+    def row(index: int) -> dict:
+        position = blotter_positions[index]
+        row = {field: position[field] for field in ("Id", "Coupon", "Maturity", "Notional", "Price")}
+        for field, digits in RESULT_FIELDS.items():
+            value = results[field][index] if results is not None else np.nan
+            row[field] = None if np.isnan(value) else round(float(value), digits)
+        return row
+
+    if not sort_model:
+        return [row(index) for index in range(start_row, min(end_row, count))], count
+
+    # Stable sorts from the last sort column to the first, rows not valued yet go last either way
+    rows = [row(index) for index in range(count)]
+    for sort in reversed(sort_model):
+        field = sort["colId"]
+        valued = [r for r in rows if r.get(field) is not None]
+        missing = [r for r in rows if r.get(field) is None]
+        rows = sorted(valued, key=lambda r: r[field], reverse=sort["sort"] == "desc") + missing
+
+    return rows[start_row:end_row], count
@@ -0,0 +1,554 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import numpy as np
+import QuantLib as ql
+
+from Common.Utils import BondUtils, VectorCurveUtils
+from Common.Utils.Constants import PricingConstants, RoundingConstants
+
+BASIS_POINT = 0.0001
+
+# Same defaults as QuantLib's BondFunctions::yield
+YIELD_GUESS = 0.05
+YIELD_ACCURACY = 1.0e-10
+YIELD_MAX_ITERATIONS = 100
+
+
+# -----------------------
+# Cashflow extraction
+# -----------------------
+
+def _stepwise_time(cashflow, cashflow_date: ql.Date, day_counter, settlement_date: ql.Date, last_date: ql.Date) -> float:
+    """Year fraction from the previous cashflow, as QuantLib's CashFlows functions discount under a yield"""
+    coupon = ql.as_coupon(cashflow)
+
+    if coupon is None:
+        # No coupon period to refer to, QuantLib fakes a year when there is no previous cashflow either
+        reference_start = cashflow_date - ql.Period(1, ql.Years) if last_date == settlement_date else last_date
+        return day_counter.yearFraction(last_date, cashflow_date, reference_start, cashflow_date)
+
+    reference_start = coupon.referencePeriodStart()
+    reference_end = coupon.referencePeriodEnd()
+    accrual_start = coupon.accrualStartDate()
+
+    if last_date != accrual_start:
+        return (day_counter.yearFraction(accrual_start, cashflow_date, reference_start, reference_end)
+                - day_counter.yearFraction(accrual_start, last_date, reference_start, reference_end))
+
+    return day_counter.yearFraction(last_date, cashflow_date, reference_start, reference_end)
+
+
+class BondBatch(object):
+    """
+    Fixed cashflow bonds (fixed rate, zero coupon) priced together off padded NumPy matrices.
+
+    The cashflows still to be paid after each bond's settlement date are extracted from
+    bond.cashflows() once, one row per bond. Yields, yield risk and curve prices then come out
+    of a few array passes instead of a dozen QuantLib calls per bond, with QuantLib's conventions:
+    stepwise discounting between cashflows, prices per 100 of the notional at settlement,
+    DV01 in currency.
+
+    All bonds share the yield day counter, compounding and frequency.
+    """
+
+    def __init__(self, amounts, pay_serials, step_times, settlement_serials, notionals, accrued,
+                 compounding, frequency):
+        self.amounts = np.asarray(amounts, dtype=float)
+        self.pay_serials = np.asarray(pay_serials, dtype=np.int64)
+        self.step_times = np.asarray(step_times, dtype=float)
+        self.settlement_serials = np.asarray(settlement_serials, dtype=np.int64)
+        self.notionals = np.asarray(notionals, dtype=float)
+        self.accrued = np.asarray(accrued, dtype=float)
+
+        self.compounding = VectorCurveUtils.to_enum(compounding)
+        self.frequency = float(VectorCurveUtils.to_enum(frequency))
+
+        # Time from settlement to each cashflow, duration and convexity discount on it directly
+        self.times = np.cumsum(self.step_times, axis=1)
+
+    @classmethod
+    def from_bonds(cls, bonds: list, day_counter, compounding, frequency):
+        day_counter = VectorCurveUtils.to_day_counter(day_counter)
+
+        rows = []
+        for bond in bonds:
+            settlement_date = bond.settlementDate()
+
+            settlement_serial = settlement_date.serialNumber()
+
+            last_date = settlement_date
+            row = []
+            for cashflow in bond.cashflows():
+                cashflow_date = cashflow.date()
+                cashflow_serial = cashflow_date.serialNumber()
+                if cashflow_serial <= settlement_serial:
+                    continue
+
+                step_time = _stepwise_time(cashflow, cashflow_date, day_counter, settlement_date, last_date)
+                row.append((cashflow.amount(), cashflow_serial, step_time))
+                last_date = cashflow_date
+
+            rows.append((row, settlement_date, bond.notional(settlement_date), bond.accruedAmount(settlement_date)))
+
+        # Padding pays nothing on the settlement date, it adds nothing to any sum
+        width = max((len(row) for row, _, _, _ in rows), default=0)
+        amounts = np.zeros((len(rows), width))
+        pay_serials = np.zeros((len(rows), width), dtype=np.int64)
+        step_times = np.zeros((len(rows), width))
+
+        for bond_id, (row, settlement_date, _, _) in enumerate(rows):
+            pay_serials[bond_id, :] = settlement_date.serialNumber()
+            if row:
+                amounts[bond_id, :len(row)], pay_serials[bond_id, :len(row)], step_times[bond_id, :len(row)] = zip(*row)
+
+        return cls(
+            amounts, pay_serials, step_times,
+            [settlement_date.serialNumber() for _, settlement_date, _, _ in rows],
+            [notional for _, _, notional, _ in rows],
+            [accrued for _, _, _, accrued in rows],
+            compounding, frequency,
+        )
+
+    def __len__(self):
+        return len(self.amounts)
+
+    # -----------------------
+    # Yield
+    # -----------------------
+
+    def _step_discounts(self, yields) -> np.ndarray:
+        return VectorCurveUtils.discount_factors_from_rates(
+            np.asarray(yields, dtype=float)[:, np.newaxis], self.step_times, self.compounding, self.frequency)
+
+    def _step_log_discount_slopes(self, yields, step_times) -> np.ndarray:
+        """d ln(step discount factor) / d yield"""
+        rates = np.asarray(yields, dtype=float)[:, np.newaxis]
+        times = step_times
+        frequency = self.frequency
+
+        simple = -times / (1.0 + rates * times)
+        continuous = -times
+        compounded = -times / (1.0 + rates / frequency) if frequency > 0 else continuous
+
+        if self.compounding == ql.Simple:
+            return simple
+        if self.compounding == ql.Continuous:
+            return continuous
+        if self.compounding == ql.Compounded:
+            return compounded
+        if self.compounding == ql.SimpleThenCompounded:
+            return np.where(times <= 1.0 / frequency, simple, compounded)
+        if self.compounding == ql.CompoundedThenSimple:
+            return np.where(times <= 1.0 / frequency, compounded, simple)
+
+        raise ValueError(f"Unknown compounding: {self.compounding}")
+
+    def npvs(self, yields) -> np.ndarray:
+        """Settlement value of every bond in currency, cashflows discounted step by step at its yield"""
+        return np.sum(self.amounts * np.cumprod(self._step_discounts(yields), axis=1), axis=1)
+
+    def dirty_prices(self, yields) -> np.ndarray:
+        return self.npvs(yields) * PricingConstants.RATE_FACTOR / self.notionals
+
+    def clean_prices(self, yields) -> np.ndarray:
+        return self.dirty_prices(yields) - self.accrued
+
+    def yields(self, clean_prices, guess: float = YIELD_GUESS, accuracy: float = YIELD_ACCURACY,
+               max_iterations: int = YIELD_MAX_ITERATIONS) -> np.ndarray:
+        """
+        Yields implied by clean prices, one Newton iteration for every bond at once.
+        Bonds that do not converge come back as NaN.
+        """
+        targets = (np.asarray(clean_prices, dtype=float) + self.accrued) * self.notionals / PricingConstants.RATE_FACTOR
+
+        yields = np.full(len(self), guess)
+        active = np.ones(len(self), dtype=bool)
+
+        for _ in range(max_iterations):
+            if not active.any():
+                break
+
+            step_times = self.step_times[active]
+            step_discounts = VectorCurveUtils.discount_factors_from_rates(
+                yields[active, np.newaxis], step_times, self.compounding, self.frequency)
+            present_values = self.amounts[active] * np.cumprod(step_discounts, axis=1)
+            slopes = np.cumsum(self._step_log_discount_slopes(yields[active], step_times), axis=1)
+
+            steps = (present_values.sum(axis=1) - targets[active]) / np.sum(present_values * slopes, axis=1)
+
+            updated = yields[active] - steps
+            if self.compounding in (ql.Compounded, ql.SimpleThenCompounded, ql.CompoundedThenSimple):
+                # (1 + y / f) has to stay positive, halve the way to the bound instead of crossing it
+                bound = -self.frequency
+                updated = np.where(updated <= bound, (yields[active] + bound) / 2.0, updated)
+
+            yields[active] = updated
+            active[active] = np.abs(steps) > accuracy
+
+        yields[active] = np.nan
+        return yields
+
+    # -----------------------
+    # Yield risk
+    # -----------------------
+
+    def _time_discounts(self, yields) -> np.ndarray:
+        return VectorCurveUtils.discount_factors_from_rates(
+            np.asarray(yields, dtype=float)[:, np.newaxis], self.times, self.compounding, self.frequency)
+
+    def modified_durations(self, yields) -> np.ndarray:
+        """QuantLib's CashFlows::duration, Duration.Modified"""
+        rates = np.asarray(yields, dtype=float)[:, np.newaxis]
+        times = self.times
+        frequency = self.frequency
+
+        discounts = self._time_discounts(yields)
+        present_values = self.amounts * discounts
+
+        simple = present_values * discounts * times
+        compounded = present_values * times / (1.0 + rates / frequency) if frequency > 0 else present_values * times
+        continuous = present_values * times
+
+        if self.compounding == ql.Simple:
+            minus_slopes = simple
+        elif self.compounding == ql.Continuous:
+            minus_slopes = continuous
+        elif self.compounding == ql.Compounded:
+            minus_slopes = compounded
+        elif self.compounding == ql.SimpleThenCompounded:
+            minus_slopes = np.where(times <= 1.0 / frequency, simple, compounded)
+        elif self.compounding == ql.CompoundedThenSimple:
+            minus_slopes = np.where(times > 1.0 / frequency, simple, compounded)
+        else:
+            raise ValueError(f"Unknown compounding: {self.compounding}")
+
+        prices = present_values.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(prices != 0.0, minus_slopes.sum(axis=1) / prices, 0.0)
+
+    def macaulay_durations(self, yields) -> np.ndarray:
+        """QuantLib's CashFlows::duration, Duration.Macaulay, only defined for compounded yields"""
+        if self.compounding != ql.Compounded:
+            raise ValueError("Macaulay duration needs compounded yields")
+
+        return (1.0 + np.asarray(yields, dtype=float) / self.frequency) * self.modified_durations(yields)
+
+    def convexities(self, yields) -> np.ndarray:
+        """QuantLib's CashFlows::convexity"""
+        rates = np.asarray(yields, dtype=float)[:, np.newaxis]
+        times = self.times
+        frequency = self.frequency
+
+        discounts = self._time_discounts(yields)
+        present_values = self.amounts * discounts
+
+        simple = present_values * 2.0 * discounts * discounts * times * times
+        compounded = (present_values * times * (frequency * times + 1.0) / (frequency * (1.0 + rates / frequency) ** 2)
+                      if frequency > 0 else present_values * times * times)
+        continuous = present_values * times * times
+
+        if self.compounding == ql.Simple:
+            second_derivatives = simple
+        elif self.compounding == ql.Continuous:
+            second_derivatives = continuous
+        elif self.compounding == ql.Compounded:
+            second_derivatives = compounded
+        elif self.compounding == ql.SimpleThenCompounded:
+            second_derivatives = np.where(times <= 1.0 / frequency, simple, compounded)
+        elif self.compounding == ql.CompoundedThenSimple:
+            second_derivatives = np.where(times > 1.0 / frequency, simple, compounded)
+        else:
+            raise ValueError(f"Unknown compounding: {self.compounding}")
+
+        prices = present_values.sum(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(prices != 0.0, second_derivatives.sum(axis=1) / prices, 0.0)
+
+    def basis_point_values(self, yields) -> np.ndarray:
+        """QuantLib's CashFlows::basisPointValue: change of the settlement value for +1bp of yield, in currency"""
+        npvs = self.npvs(yields)
+
+        delta = -self.modified_durations(yields) * npvs * BASIS_POINT
+        gamma = self.convexities(yields) / PricingConstants.RATE_FACTOR * npvs * BASIS_POINT * BASIS_POINT
+
+        return delta + 0.5 * gamma
+
+    # -----------------------
+    # Curve
+    # -----------------------
+
+    def curve_dirty_prices(self, vector_curve: VectorCurveUtils.VectorCurve) -> np.ndarray:
+        """Dirty prices discounted on the curve to each bond's settlement date, as DiscountingBondEngine"""
+        discounts = vector_curve.discount(self.pay_serials.ravel()).reshape(self.pay_serials.shape)
+        settlement_values = np.sum(self.amounts * discounts, axis=1) / vector_curve.discount(self.settlement_serials)
+
+        return settlement_values * PricingConstants.RATE_FACTOR / self.notionals
+
+    def curve_clean_prices(self, vector_curve: VectorCurveUtils.VectorCurve) -> np.ndarray:
+        return self.curve_dirty_prices(vector_curve) - self.accrued
+
+    # -----------------------
+    # Pricing results
+    # -----------------------
+
+    def pricing_results(self, clean_prices, vector_curve: VectorCurveUtils.VectorCurve = None) -> dict:
+        """
+        Unrounded arrays of the get_pricing_results figures, from the clean prices.
+        Yields in percent, the curve prices only when a curve is given.
+        """
+        yields = self.yields(clean_prices)
+
+        results = {
+            "Yield": yields * PricingConstants.RATE_FACTOR,
+            "DV01": self.basis_point_values(yields),
+            "Modified Duration": self.modified_durations(yields),
+            "Convexity": self.convexities(yields),
+            "Accrued Interest": self.accrued,
+        }
+        if self.compounding == ql.Compounded:
+            results["Macaulay Duration"] = self.macaulay_durations(yields)
+
+        if vector_curve is not None:
+            results["Price(Curve)"] = self.curve_clean_prices(vector_curve)
+            results["Full-Price(Curve)"] = self.curve_dirty_prices(vector_curve)
+
+        return results
+
+
+# -----------------------
+# Zero coupon ladder
+# -----------------------
+
+def _select_compounding(compounding, frequency: float, times, simple, compounded, continuous) -> np.ndarray:
+    """The closed form of the compounding convention, chosen per time for the mixed ones"""
+    if compounding == ql.Simple:
+        return simple
+    if compounding == ql.Continuous:
+        return continuous
+    if compounding == ql.Compounded:
+        return compounded
+    if compounding == ql.SimpleThenCompounded:
+        return np.where(times <= 1.0 / frequency, simple, compounded)
+    if compounding == ql.CompoundedThenSimple:
+        return np.where(times > 1.0 / frequency, simple, compounded)
+
+    raise ValueError(f"Unknown compounding: {compounding}")
+
+
+class ZeroLadder(object):
+    """
+    Zero coupon bonds on a ladder of maturities, priced in closed form.
+
+    A zero pays its face amount once, so its yield is the rate implied by its price over the
+    time to payment, and duration, convexity, DV01 and z-spread follow from that rate without
+    a solver. The curve is evaluated once, at every payment date and the settlement date.
+    Conventions are those of ql.ZeroCouponBond under DiscountingBondEngine and BondFunctions.
+    """
+
+    def __init__(self, maturity_serials, pay_serials, settlement_serial: int, face_amount: float, times,
+                 compounding, frequency):
+        self.maturity_serials = np.asarray(maturity_serials, dtype=np.int64)
+        self.pay_serials = np.asarray(pay_serials, dtype=np.int64)
+        self.settlement_serial = int(settlement_serial)
+        self.face_amount = float(face_amount)
+
+        # Yield day counter time from settlement to each payment
+        self.times = np.asarray(times, dtype=float)
+
+        self.compounding = VectorCurveUtils.to_enum(compounding)
+        self.frequency = float(VectorCurveUtils.to_enum(frequency))
+
+    @classmethod
+    def from_schedule(cls, schedule: dict, bond_info: dict, day_counter, compounding, frequency):
+        """
+        The zeros of BondUtils.get_zeros still alive at the evaluation date,
+        leaving out those settling after their maturity, as ZeroCouponBondPanel does.
+        """
+        ql_schedule, calendar = BondUtils.get_zero_schedule(schedule)
+        day_counter = VectorCurveUtils.to_day_counter(day_counter)
+
+        settlement_date = calendar.advance(ql.Settings.instance().evaluationDate, bond_info["SettlementDays"], ql.Days)
+
+        rows = []
+        for maturity_date in ql_schedule:
+            # ZeroCouponBond pays on the next business day, Following
+            pay_date = calendar.adjust(maturity_date, ql.Following)
+            if maturity_date < settlement_date or pay_date <= settlement_date:
+                continue
+
+            # A single cashflow, QuantLib refers its year fraction to the year before the payment
+            time = day_counter.yearFraction(settlement_date, pay_date, pay_date - ql.Period(1, ql.Years), pay_date)
+            rows.append((maturity_date.serialNumber(), pay_date.serialNumber(), time))
+
+        maturity_serials, pay_serials, times = zip(*rows) if rows else ((), (), ())
+
+        return cls(maturity_serials, pay_serials, settlement_date.serialNumber(), bond_info["FaceAmount"], times,
+                   compounding, frequency)
+
+    def __len__(self):
+        return len(self.pay_serials)
+
+    # -----------------------
+    # Curve
+    # -----------------------
+
+    def curve_discounts(self, vector_curve: VectorCurveUtils.VectorCurve) -> tuple:
+        """(discount factors at the payment dates, discount factor at settlement), one curve pass"""
+        discounts = vector_curve.discount(np.append(self.pay_serials, self.settlement_serial))
+        return discounts[:-1], discounts[-1]
+
+    def curve_clean_prices(self, vector_curve: VectorCurveUtils.VectorCurve) -> np.ndarray:
+        """Prices per 100 discounted on the curve to settlement, no accrued interest on a zero"""
+        pay_discounts, settlement_discount = self.curve_discounts(vector_curve)
+        return pay_discounts / settlement_discount * PricingConstants.RATE_FACTOR
+
+    def z_spreads(self, clean_prices, vector_curve: VectorCurveUtils.VectorCurve) -> np.ndarray:
+        """
+        QuantLib's zSpread: the spread over the curve zero rates, in the yield compounding,
+        that reprices the zeros.
+
+        Taken first over the curve forward rates from settlement, exact when the curve starts
+        on the settlement date. The spread also moves the discount factor at settlement, a few
+        days past the curve reference date, one correction from there accounts for it.
+        """
+        pay_discounts, settlement_discount = self.curve_discounts(vector_curve)
+        pay_times = vector_curve.times(self.pay_serials)
+        settlement_time = float(vector_curve.times([self.settlement_serial])[0])
+
+        compounding, frequency = self.compounding, self.frequency
+        targets = np.asarray(clean_prices, dtype=float) / PricingConstants.RATE_FACTOR
+
+        forward_times = pay_times - settlement_time
+        spreads = (VectorCurveUtils.implied_rates(1.0 / targets, forward_times, compounding, frequency)
+                   - VectorCurveUtils.implied_rates(settlement_discount / pay_discounts, forward_times,
+                                                    compounding, frequency))
+
+        if settlement_time > 0.0:
+            settlement_rate = VectorCurveUtils.implied_rates(
+                1.0 / settlement_discount, settlement_time, compounding, frequency)
+            spreaded_settlement_discounts = VectorCurveUtils.discount_factors_from_rates(
+                settlement_rate + spreads, settlement_time, compounding, frequency)
+
+            spreads = (VectorCurveUtils.implied_rates(1.0 / (targets * spreaded_settlement_discounts), pay_times,
+                                                      compounding, frequency)
+                       - VectorCurveUtils.implied_rates(1.0 / pay_discounts, pay_times, compounding, frequency))
+
+        return spreads
+
+    # -----------------------
+    # Yield
+    # -----------------------
+
+    def yields(self, clean_prices) -> np.ndarray:
+        return VectorCurveUtils.implied_rates(
+            PricingConstants.RATE_FACTOR / np.asarray(clean_prices, dtype=float), self.times,
+            self.compounding, self.frequency)
+
+    def discounts(self, yields) -> np.ndarray:
+        return VectorCurveUtils.discount_factors_from_rates(yields, self.times, self.compounding, self.frequency)
+
+    def modified_durations(self, yields) -> np.ndarray:
+        """QuantLib's CashFlows::duration, Duration.Modified, of a single payment"""
+        yields = np.asarray(yields, dtype=float)
+        times = self.times
+        frequency = self.frequency
+
+        return _select_compounding(
+            self.compounding, frequency, times,
+            simple=times * self.discounts(yields),
+            compounded=times / (1.0 + yields / frequency) if frequency > 0 else times,
+            continuous=times,
+        )
+
+    def macaulay_durations(self, yields) -> np.ndarray:
+        """QuantLib's CashFlows::duration, Duration.Macaulay: the time to payment, for compounded yields only"""
+        if self.compounding != ql.Compounded:
+            raise ValueError("Macaulay duration needs compounded yields")
+
+        return (1.0 + np.asarray(yields, dtype=float) / self.frequency) * self.modified_durations(yields)
+
+    def convexities(self, yields) -> np.ndarray:
+        """QuantLib's CashFlows::convexity of a single payment"""
+        yields = np.asarray(yields, dtype=float)
+        times = self.times
+        frequency = self.frequency
+
+        return _select_compounding(
+            self.compounding, frequency, times,
+            simple=2.0 * (times * self.discounts(yields)) ** 2,
+            compounded=(times * (frequency * times + 1.0) / (frequency * (1.0 + yields / frequency) ** 2)
+                        if frequency > 0 else times * times),
+            continuous=times * times,
+        )
+
+    def basis_point_values(self, yields) -> np.ndarray:
+        """QuantLib's CashFlows::basisPointValue, in currency"""
+        npvs = self.face_amount * self.discounts(yields)
+
+        delta = -self.modified_durations(yields) * npvs * BASIS_POINT
+        gamma = self.convexities(yields) / PricingConstants.RATE_FACTOR * npvs * BASIS_POINT * BASIS_POINT
+
+        return delta + 0.5 * gamma
+
+    # -----------------------
+    # Pricing results
+    # -----------------------
+
+    def pricing_results(self, vector_curve: VectorCurveUtils.VectorCurve, clean_prices=None) -> dict:
+        """
+        Unrounded arrays of the get_pricing_results figures, at the curve prices unless
+        clean prices are given. Yields in percent, z-spreads in basis points.
+        """
+        pay_discounts, _ = self.curve_discounts(vector_curve)
+        curve_prices = self.curve_clean_prices(vector_curve)
+        clean_prices = curve_prices if clean_prices is None else np.asarray(clean_prices, dtype=float)
+
+        yields = self.yields(clean_prices)
+
+        results = {
+            "Yield": yields * PricingConstants.RATE_FACTOR,
+            "Price(Curve)": curve_prices,
+            "Full-Price(Curve)": curve_prices,
+            "Z-Spread(BPS)": self.z_spreads(clean_prices, vector_curve) * PricingConstants.BPS_FACTOR,
+            "DV01": self.basis_point_values(yields),
+            # Discounted to the curve reference date, whose discount factor is 1
+            "NPV": self.face_amount * pay_discounts,
+            "Modified Duration": self.modified_durations(yields),
+        }
+        if self.compounding == ql.Compounded:
+            results["Macaulay Duration"] = self.macaulay_durations(yields)
+        results["Convexity"] = self.convexities(yields)
+
+        return results
+
+    def pricing_rows(self, vector_curve: VectorCurveUtils.VectorCurve, clean_prices=None) -> list:
+        """One get_pricing_results dict per zero, rounded the same way"""
+        results = self.pricing_results(vector_curve, clean_prices)
+
+        rounding = {
+            "Yield": RoundingConstants.ROUND_RATE,
+            "Price(Curve)": RoundingConstants.ROUND_PRICE,
+            "Full-Price(Curve)": RoundingConstants.ROUND_PRICE,
+            "Z-Spread(BPS)": RoundingConstants.ROUND_SPREAD,
+            "DV01": RoundingConstants.ROUND_MONEY,
+            "NPV": RoundingConstants.ROUND_MONEY,
+            "Modified Duration": RoundingConstants.ROUND_YEARS,
+            "Macaulay Duration": RoundingConstants.ROUND_YEARS,
+            "Convexity": RoundingConstants.ROUND_MONEY,
+        }
+        rounded = {name: [round(value, rounding[name]) for value in values.tolist()] for name, values in results.items()}
+
+        settlement_date = ql.Date(self.settlement_serial).ISO()
+        rows = []
+        for zero_id, maturity_serial in enumerate(self.maturity_serials):
+            row = {"Maturity Date": ql.Date(int(maturity_serial)).ISO()}
+            row.update({name: values[zero_id] for name, values in rounded.items()})
+            row.update({
+                "Accrued Interest": 0.0,
+                "Settlement Date": settlement_date,
+                "Notional": round(self.face_amount),
+                "Accrued Days": 0,
+            })
+            rows.append(row)
+
+        return rows
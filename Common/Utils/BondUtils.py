@@ -2,10 +2,12 @@
 
 import QuantLib as ql
 import Common.Utils.ConvertUtils as ConvertUtils
-import Common.Utils.CurveUtils as CurveUtils
+import Common.Utils.CurveCache as CurveCache
+import Common.Utils.Metrics as Metrics
 from Common.Utils.Constants import PricingConstants, RoundingConstants
 
 
+@Metrics.timed("bond", "fixed_rate_bond")
 def get_fixed_rate_bond(schedule, bond_info):
 
     calendar = ConvertUtils.calendars_from_strings(schedule["Calendars"])
@@ -33,6 +35,7 @@ def get_fixed_rate_bond(schedule, bond_info):
     return bond
 
 
+@Metrics.timed("bond", "floating_rate_bond")
 def get_floating_rate_bond(market_data, index_fixings, schedule, overnight_leg, bond_info):
 
     calendar = ConvertUtils.calendars_from_strings(schedule["Calendars"])
@@ -48,9 +51,7 @@ def get_floating_rate_bond(market_data, index_fixings, schedule, overnight_leg,
         schedule["endOfMonth"]
     )
 
-    curve_market_data = market_data["MarketData"]
-    rate_helpers = CurveUtils.create_rate_helpers(curve_market_data)
-    curve, forecast_curve = CurveUtils.bootstrap(rate_helpers)
+    curve, forecast_curve = CurveCache.get_curve(market_data)
 
     index_name = market_data['Curve']['Index']
     index_class = getattr(ql, index_name)
@@ -79,7 +80,8 @@ def get_floating_rate_bond(market_data, index_fixings, schedule, overnight_leg,
 
     return bond
 
-def get_zeros(schedule, bond_info):
+def get_zero_schedule(schedule):
+    """Maturity dates of the zero coupon ladder and its calendar"""
 
     calendar = ConvertUtils.calendars_from_strings(schedule["Calendars"])
     # Build schedule
@@ -94,6 +96,14 @@ def get_zeros(schedule, bond_info):
         schedule["endOfMonth"]
     )
 
+    return ql_schedule, calendar
+
+
+@Metrics.timed("bond", "zeros")
+def get_zeros(schedule, bond_info):
+
+    ql_schedule, calendar = get_zero_schedule(schedule)
+
     zero_coupon_bonds = []
     for cash_flow_date in ql_schedule:
         zero_coupon_bonds.append(
@@ -127,33 +137,35 @@ def get_pricing_results(
                         clean_price,
                         day_counter,
                         compounding,
-                        frequency
+                        frequency,
+                        attach_engine=True
     ):
+    """attach_engine=False prices a bond already discounted on discount_curve, see InstrumentCache"""
     results = {}
 
     ql_clean_price = ql.BondPrice(clean_price, ql.BondPrice.Clean)
 
-    engine = ql.DiscountingBondEngine(discount_curve)
-    bond.setPricingEngine(engine)
-
-    zspread = ql.BondFunctions.zSpread(
-        bond,
-        ql_clean_price,
-        forecast_curve,
-        ConvertUtils.day_counter_from_string(day_counter),
-        ConvertUtils.enum_from_string(compounding), ConvertUtils.enum_from_string(frequency)
-    )
+    ql_day_counter = ConvertUtils.day_counter_from_string(day_counter)
+    ql_compounding = ConvertUtils.enum_from_string(compounding)
+    ql_frequency = ConvertUtils.enum_from_string(frequency)
+
+    if attach_engine:
+        engine = ql.DiscountingBondEngine(discount_curve)
+        bond.setPricingEngine(engine)
+
+    with Metrics.stage("bond", "z_spread"):
+        zspread = ql.BondFunctions.zSpread(
+            bond,
+            ql_clean_price,
+            forecast_curve,
+            ql_day_counter,
+            ql_compounding, ql_frequency
+        )
 
-    yield_value = bond.bondYield(ql_clean_price,
-                                 ConvertUtils.day_counter_from_string(day_counter),
-                                 ConvertUtils.enum_from_string(compounding),ConvertUtils.enum_from_string(frequency))
+    with Metrics.stage("bond", "yield"):
+        yield_value = bond.bondYield(ql_clean_price, ql_day_counter, ql_compounding, ql_frequency)
 
-    yield_rate = ql.InterestRate(
-        yield_value,
-        ConvertUtils.day_counter_from_string(day_counter),
-        ConvertUtils.enum_from_string(compounding),
-        ConvertUtils.enum_from_string(frequency)
-    )
+    yield_rate = ql.InterestRate(yield_value, ql_day_counter, ql_compounding, ql_frequency)
 
     results['Maturity Date'] = bond.maturityDate().ISO()
     results['Yield'] = round(yield_rate.rate()*PricingConstants.RATE_FACTOR, RoundingConstants.ROUND_RATE)
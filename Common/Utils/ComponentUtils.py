@@ -211,6 +211,17 @@ def panel_section(label, children, bordered=True):
     )
 
 
+def job_progress(progress_id):
+    """Thin progress bar of a background job, see JobManager.background_job"""
+    return html.Progress(
+        id=progress_id,
+        value=0,
+        max=1,
+        className="job-progress",
+        style={"visibility": "hidden"},
+    )
+
+
 # -----------------------
 # QuantLib helpers
 # -----------------------
@@ -1,6 +1,7 @@
 # Copyright (c) Mike Kipnis - DashQL
 
 from datetime import datetime
+from functools import lru_cache
 
 import QuantLib as ql
 
@@ -110,6 +111,13 @@ DayCounterConstructors = {
 }
 
 
+# -----------------------
+# Convention registry
+# -----------------------
+# Calendars, day counters and enums are immutable once built, so every distinct spec
+# is resolved once and the same QuantLib object is handed out on later lookups
+
+@lru_cache(maxsize=None)
 def make_calendar(spec: str):
     """
     Convert strings like:
@@ -145,6 +153,11 @@ def merge_calendars_from_strings(spec_list):
     """
     Merge a list of QuantLib calendar spec strings into a single calendar.
     """
+    return _joint_calendar(tuple(spec_list))
+
+
+@lru_cache(maxsize=None)
+def _joint_calendar(spec_list: tuple):
     # Make sure every item is a real calendar object
     calendars = [make_calendar(s) for s in spec_list]
 
@@ -155,23 +168,52 @@ def calendars_from_strings(calendars):
     if isinstance(calendars, str):
         calendars = [calendars]
 
+    return _calendars_from_keys(tuple(calendars))
+
+
+@lru_cache(maxsize=None)
+def _calendars_from_keys(calendars: tuple):
     ql_calendar_strs = []
     for s in calendars:
-        #print(s)  # debug: see each calendar string
         ql_calendar_strs.append(Calendars[s])
 
-    ql_calendars = merge_calendars_from_strings(ql_calendar_strs)
+    return merge_calendars_from_strings(ql_calendar_strs)
 
-    return ql_calendars
 
 def day_counter_from_string(daycounter_value, calendar = "TARGET"):
+    if isinstance(calendar, str):
+        return _day_counter(daycounter_value, calendar)
+
+    # Calendar objects are not hashable, build the day counter directly
+    return _day_counter.__wrapped__(daycounter_value, calendar)
+
+
+@lru_cache(maxsize=None)
+def _day_counter(daycounter_value, calendar):
     if daycounter_value == "Business252":
+        if isinstance(calendar, str):
+            calendar = calendars_from_strings(calendar)
         dc = DayCounterConstructors["Business252"](calendar)
     else:
         dc = DayCounterConstructors[daycounter_value]()
 
     return  dc
 
+
+def conventions_cache_info() -> dict:
+    return {
+        "calendars": _calendars_from_keys.cache_info()._asdict(),
+        "day_counters": _day_counter.cache_info()._asdict(),
+        "enums": enum_from_string.cache_info()._asdict(),
+    }
+
+
+def clear_conventions():
+    for cached in (make_calendar, _joint_calendar, _calendars_from_keys, _day_counter, enum_from_string):
+        cached.cache_clear()
+
+
+@lru_cache(maxsize=None)
 def enum_from_string(path: str):
     """Resolve string like 'QuantLib.Following' to the actual QuantLib enum"""
     obj = ql
@@ -0,0 +1,117 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import QuantLib as ql
+
+from Common.Utils import CurveUtils, Metrics
+
+
+class CurveCache(object):
+    """
+    Process-wide LRU cache of bootstrapped curves.
+
+    Curves are keyed by a canonical hash of (curve name, market data rows, evaluation date),
+    so every panel pricing off the same market state shares one bootstrapped curve.
+    """
+
+    def __init__(self, max_size: int = 32):
+        self.max_size = max_size
+        self._curves = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(curve_name: str, market_data: list) -> str:
+        # Row order differs between the portal data and the (sorted) grid data,
+        # so rows are canonicalized individually and sorted before hashing
+        rows = sorted(json.dumps(row, sort_keys=True, default=str) for row in market_data)
+        evaluation_date = ql.Settings.instance().evaluationDate.ISO()
+
+        payload = json.dumps([curve_name, evaluation_date, rows])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._curves.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._curves.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, curve):
+        # Force the bootstrap before the curve is shared between callbacks
+        curve.enableExtrapolation()
+        with Metrics.stage("curve", "bootstrap"):
+            curve.nodes()
+
+        entry = (curve, ql.YieldTermStructureHandle(curve))
+
+        with self._lock:
+            self._curves[key] = entry
+            self._curves.move_to_end(key)
+
+            while len(self._curves) > self.max_size:
+                self._curves.popitem(last=False)
+                self.evictions += 1
+
+        return entry
+
+    def get_curve(self, curve_name: str, market_data: list, nodes: dict = None):
+        key = self.key(curve_name, market_data)
+
+        entry = self.get(key)
+        if entry is None:
+            if nodes and nodes.get("Key") == key:
+                # Nodes bootstrapped from the same market state: skip the solver
+                curve, _ = CurveUtils.curve_from_nodes(nodes)
+            else:
+                curve, _ = CurveUtils.bootstrap(CurveUtils.create_rate_helpers(market_data))
+            entry = self.put(key, curve)
+
+        return entry
+
+    def get_nodes(self, curve_name: str, market_data: list, nodes: dict = None) -> dict:
+        curve, _ = self.get_curve(curve_name, market_data, nodes)
+        return CurveUtils.curve_nodes(curve, self.key(curve_name, market_data))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._curves),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._curves.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+curve_cache = CurveCache(int(os.getenv("DASHQL_CURVE_CACHE_SIZE", "32")))
+
+# Forked job processes keep the parent's curves, but not a lock another thread was holding
+os.register_at_fork(after_in_child=lambda: setattr(curve_cache, "_lock", threading.Lock()))
+
+
+def get_curve(curve_data: dict):
+    """Bootstrapped (curve, handle) for a portal curve entry {"Curve": ..., "MarketData": ..., "Nodes": ...}"""
+    return curve_cache.get_curve(curve_data["Curve"]["Name"], curve_data["MarketData"], curve_data.get("Nodes"))
+
+
+def get_nodes(curve_data: dict) -> dict:
+    """Serialized nodes for a portal curve entry, tagged with the market state they belong to"""
+    return curve_cache.get_nodes(curve_data["Curve"]["Name"], curve_data["MarketData"], curve_data.get("Nodes"))
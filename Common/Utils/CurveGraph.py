@@ -0,0 +1,37 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import dash
+
+from Common.Utils import CurveCache, SessionStore
+
+# Dataflow: quotes (session store) -> curve versions -> selected-curve stores -> views
+#
+# The user market data store only holds the session id and version, see SessionStore.
+# A curve's version is the curve cache key of its own quotes and the evaluation date, so editing
+# one OIS-ESTR quote moves the ESTR version only. Selected-curve stores are written only when the
+# version of their curve moves, so views priced off UST or SOFR are not triggered at all.
+
+
+def curve_version(curve_data: dict) -> str:
+    return CurveCache.curve_cache.key(curve_data["Curve"]["Name"], curve_data["MarketData"])
+
+
+def select_curve(user_market_data: dict, curve_name: str, current_curve_data: dict):
+    """
+    Entry of curve_name for a selected-curve store, or dash.no_update when the store
+    already holds that curve at the same version.
+    """
+    if not user_market_data:
+        return dash.no_update
+
+    curves = SessionStore.session_curves(user_market_data)
+    if not curve_name or curve_name not in curves:
+        return dash.no_update
+
+    curve_data = curves[curve_name]
+
+    if (current_curve_data and current_curve_data["Curve"]["Name"] == curve_name
+            and curve_version(current_curve_data) == curve_version(curve_data)):
+        return dash.no_update
+
+    return curve_data
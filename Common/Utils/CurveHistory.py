@@ -0,0 +1,187 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import os
+import re
+import threading
+
+import numpy as np
+import QuantLib as ql
+
+CURVE_HISTORY_DIR = "data/curve_history"
+
+# Per curve, one .npy per column, opened memory-mapped so every gunicorn worker shares the page cache:
+#   {curve}.dates.npy      [D]     business date serials, sorted
+#   {curve}.counts.npy     [D]     node count of each date
+#   {curve}.nodes.npy      [D, N]  node date serials, padded past count
+#   {curve}.discounts.npy  [D, N]  node discount factors, padded past count
+#   {curve}.rates.npy      [D, T]  standard tenor grid, percent
+#   tenors.npy, day_counter.npy    shared by every curve of the store
+COLUMNS = ("dates", "counts", "nodes", "discounts", "rates")
+
+
+def curve_file_name(curve_name: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", curve_name)
+
+
+def column_path(store_dir: str, curve_name: str, column: str) -> str:
+    return os.path.join(store_dir, f"{curve_file_name(curve_name)}.{column}.npy")
+
+
+def _save(path: str, array: np.ndarray):
+    # Write aside and rename, readers holding the old map keep reading the old file
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(temp_path, path)
+
+
+# -----------------------
+# Writer
+# -----------------------
+
+def write_curve(store_dir: str, curve_name: str, dates, nodes: list, discounts: list, rates, tenors: list, day_counter: str):
+    """Merge one curve's history into the store, dates already in the store are overwritten"""
+    os.makedirs(store_dir, exist_ok=True)
+
+    history = {}
+    if os.path.exists(column_path(store_dir, curve_name, "dates")):
+        columns = {column: np.load(column_path(store_dir, curve_name, column)) for column in COLUMNS}
+        for i, as_of in enumerate(columns["dates"].tolist()):
+            count = columns["counts"][i]
+            history[as_of] = (columns["nodes"][i, :count], columns["discounts"][i, :count], columns["rates"][i])
+
+    for as_of, node_serials, node_discounts, tenor_rates in zip(dates, nodes, discounts, rates):
+        history[int(as_of)] = (np.asarray(node_serials), np.asarray(node_discounts), np.asarray(tenor_rates))
+
+    sorted_dates = sorted(history)
+    counts = np.array([len(history[as_of][0]) for as_of in sorted_dates], dtype=np.int64)
+    width = counts.max()
+
+    # Pad with the last node so padded entries stay valid dates and discounts
+    padded_nodes = np.empty((len(sorted_dates), width), dtype=np.int64)
+    padded_discounts = np.empty((len(sorted_dates), width))
+    for i, as_of in enumerate(sorted_dates):
+        node_serials, node_discounts, _ = history[as_of]
+        padded_nodes[i, :len(node_serials)] = node_serials
+        padded_nodes[i, len(node_serials):] = node_serials[-1]
+        padded_discounts[i, :len(node_discounts)] = node_discounts
+        padded_discounts[i, len(node_discounts):] = node_discounts[-1]
+
+    _save(os.path.join(store_dir, "tenors.npy"), np.array(tenors))
+    _save(os.path.join(store_dir, "day_counter.npy"), np.array(day_counter))
+
+    _save(column_path(store_dir, curve_name, "nodes"), padded_nodes)
+    _save(column_path(store_dir, curve_name, "discounts"), padded_discounts)
+    _save(column_path(store_dir, curve_name, "rates"), np.array([history[as_of][2] for as_of in sorted_dates]))
+    _save(column_path(store_dir, curve_name, "counts"), counts)
+    # Dates last: a reader seeing the new dates also sees the new columns
+    _save(column_path(store_dir, curve_name, "dates"), np.array(sorted_dates, dtype=np.int64))
+
+
+def write_curve_batch(store_dir: str, curves_file: str) -> list:
+    """Merge a CurveFactory .npz batch into the store, returns the curves written"""
+    with np.load(curves_file) as data:
+        curve_names = data["curve_names"].tolist()
+        tenors = data["tenors"].tolist()
+        day_counter = str(data["day_counter"])
+        node_offsets = data["node_offsets"]
+
+        for curve_id, curve_name in enumerate(curve_names):
+            rows = np.flatnonzero(data["curve"] == curve_id)
+            write_curve(
+                store_dir, curve_name,
+                data["as_of"][rows],
+                [data["node_dates"][node_offsets[row]:node_offsets[row + 1]] for row in rows],
+                [data["node_discounts"][node_offsets[row]:node_offsets[row + 1]] for row in rows],
+                data["rates"][rows],
+                tenors, day_counter,
+            )
+
+    return curve_names
+
+
+# -----------------------
+# Reader
+# -----------------------
+
+class CurveHistory(object):
+    """
+    Read side of the historical curve store.
+
+    Columns are memory-mapped read-only on first use and re-mapped when the dates file
+    is replaced, lookups are a binary search of the date index.
+    """
+
+    def __init__(self, store_dir: str = CURVE_HISTORY_DIR):
+        self.store_dir = store_dir
+        self._curves = {}
+        self._lock = threading.Lock()
+
+    def _columns(self, curve_name: str):
+        dates_path = column_path(self.store_dir, curve_name, "dates")
+        try:
+            modified = os.stat(dates_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            cached = self._curves.get(curve_name)
+            if cached is not None and cached[0] == modified:
+                return cached[1]
+
+            columns = {column: np.load(column_path(self.store_dir, curve_name, column), mmap_mode="r") for column in COLUMNS}
+            columns["tenors"] = np.load(os.path.join(self.store_dir, "tenors.npy")).tolist()
+            columns["day_counter"] = str(np.load(os.path.join(self.store_dir, "day_counter.npy")))
+
+            self._curves[curve_name] = (modified, columns)
+            return columns
+
+    def _row(self, columns, as_of: ql.Date):
+        """Row of the latest stored date on or before as_of"""
+        row = int(np.searchsorted(columns["dates"], as_of.serialNumber(), side="right")) - 1
+        return row if row >= 0 else None
+
+    def dates(self, curve_name: str) -> list:
+        columns = self._columns(curve_name)
+        if columns is None:
+            return []
+
+        return [ql.Date(int(serial)) for serial in columns["dates"]]
+
+    def nodes_as_of(self, curve_name: str, as_of: ql.Date):
+        """Stored curve nodes, as in CurveUtils.curve_nodes, of the latest date on or before as_of"""
+        columns = self._columns(curve_name)
+        row = self._row(columns, as_of) if columns is not None else None
+        if row is None:
+            return None
+
+        count = columns["counts"][row]
+        stored_as_of = ql.Date(int(columns["dates"][row]))
+
+        return {
+            "Key": f"{curve_name}|{stored_as_of.ISO()}",
+            "AsOf": stored_as_of.ISO(),
+            "Dates": [ql.Date(int(serial)).ISO() for serial in columns["nodes"][row, :count]],
+            "Discounts": columns["discounts"][row, :count].tolist(),
+            "DayCounter": columns["day_counter"],
+        }
+
+    def rates_as_of(self, curve_name: str, as_of: ql.Date):
+        """(stored date, tenors, tenor grid rates) of the latest date on or before as_of"""
+        columns = self._columns(curve_name)
+        row = self._row(columns, as_of) if columns is not None else None
+        if row is None:
+            return None
+
+        return ql.Date(int(columns["dates"][row])), columns["tenors"], columns["rates"][row].tolist()
+
+
+curve_history = CurveHistory(os.getenv("DASHQL_CURVE_HISTORY", CURVE_HISTORY_DIR))
+
+
+def nodes_as_of(curve_name: str, as_of: ql.Date):
+    return curve_history.nodes_as_of(curve_name, as_of)
+
+
+def rates_as_of(curve_name: str, as_of: ql.Date):
+    return curve_history.rates_as_of(curve_name, as_of)
@@ -1,15 +1,27 @@
 # Copyright (c) Mike Kipnis - DashQL
 
-from concurrent.futures import ThreadPoolExecutor
-
+import numpy as np
 import QuantLib as ql
-from Common.Utils import ConvertUtils
+from Common.Utils import ConvertUtils, CurveHistory, Metrics, SwapUtils, VectorCurveUtils
 from Common.Utils.Constants import PricingConstants, RoundingConstants
 from datetime import date
 
 from Common.Utils import BondUtils
 from enum import Enum
 
+CURVE_DAY_COUNTER = "Actual360"
+
+# Standard tenor grid of the curve chart and the curve factory output
+CURVE_TENORS = ["1M", "3M", "6M"] + [f"{curve_tenor}Y" for curve_tenor in range(1, 31)]
+
+
+def pricer_quote_value(instrument_type: str, quote):
+    # Deposit and swap quotes are entered in percent, futures and bonds as prices
+    if instrument_type == 'Deposit' or instrument_type == 'Swap':
+        return quote / PricingConstants.RATE_FACTOR
+
+    return quote
+
 
 def create_rate_helpers( market_data: list):
     deposit_quotes = {}
@@ -22,40 +34,46 @@ def create_rate_helpers( market_data: list):
         quote = instrument_quote['quote']
         tenor = instrument_quote['tenor']
 
+        pricer_quote = {'pricer_quote': ql.SimpleQuote(pricer_quote_value(instrument_type, quote)),
+                        'quote_details': instrument_quote['curve_component'],
+                        'ticker': instrument_quote['ticker']}
+
         if instrument_type == 'Deposit':
-            deposit_quotes[ql.Period(tenor[0], tenor[1])] = {'pricer_quote':ql.SimpleQuote(quote / PricingConstants.RATE_FACTOR), 'quote_details':instrument_quote['curve_component']}
+            deposit_quotes[ql.Period(tenor[0], tenor[1])] = pricer_quote
         elif instrument_type == 'Future':
             py_date = date.fromisoformat(tenor)
             ql_date = ql.Date(py_date.day, py_date.month, py_date.year)
-            future_quotes[ql_date] = {'pricer_quote':ql.SimpleQuote(quote), 'quote_details':instrument_quote['curve_component']}
+            future_quotes[ql_date] = pricer_quote
         elif instrument_type == 'Swap':
-            swap_quotes[ql.Period(tenor[0], tenor[1])] = {'pricer_quote': ql.SimpleQuote(quote / PricingConstants.RATE_FACTOR), 'quote_details':instrument_quote['curve_component']}
+            swap_quotes[ql.Period(tenor[0], tenor[1])] = pricer_quote
         elif instrument_type == 'Bond':
-            bond_quotes[ql.Period(tenor[0], tenor[1])] = {'pricer_quote': ql.SimpleQuote(quote),
-                                                          'quote_details': instrument_quote['curve_component']}
+            bond_quotes[ql.Period(tenor[0], tenor[1])] = pricer_quote
 
 
     return { "Deposits" : deposit_quotes, "Futures" : future_quotes, "Swaps" : swap_quotes, "Bonds": bond_quotes }
 
 
-def transform_curve_components(curve):
+def transform_curve_components(curve, as_of=None):
 
     curve_components = curve['CurveComponents']
     calendar = ConvertUtils.calendars_from_strings(curve["Calendars"])
 
+    # Quote dates are laid out from as_of, today unless a historical curve is being built
+    as_of = as_of or ql.Date.todaysDate()
+
     target_list = []
-    latest_maturity_date = ql.Date.todaysDate()
+    latest_maturity_date = as_of
     for curve_component in curve_components:
         instrument_type = curve_component['Type']
         tenor = curve_component['Tenor']
         quote = curve_component['Quote']
         if instrument_type == 'Deposit' or instrument_type == 'Swap' or instrument_type == 'Bond':
             period = ql.Period(tenor)
-            latest_maturity_date = calendar.advance(ql.Date.todaysDate(), period)
-            days_to_maturity = latest_maturity_date - ql.Date.todaysDate()
+            latest_maturity_date = calendar.advance(as_of, period)
+            days_to_maturity = latest_maturity_date - as_of
             target_list.append(
                 {'instrument_type': instrument_type, 'days_to_maturity': days_to_maturity, 'ticker': tenor,
-                 'issue_date': ql.Date.todaysDate().to_date().isoformat(), 'maturity_date': latest_maturity_date.to_date().isoformat(),
+                 'issue_date': as_of.to_date().isoformat(), 'maturity_date': latest_maturity_date.to_date().isoformat(),
                  'tenor': (period.length(), period.units()),
                  'quote': quote, "curve_component": curve_component})
         elif instrument_type == 'Future':
@@ -65,7 +83,7 @@ def transform_curve_components(curve):
                 if key == tenor:
                     target_list.append({
                         'instrument_type': instrument_type,
-                        'days_to_maturity': imm_date - ql.Date.todaysDate(),
+                        'days_to_maturity': imm_date - as_of,
                         'ticker': ql.IMM.code(imm_date),
                         'tenor': imm_date.to_date().isoformat(),
                         'quote': quote, "curve_component": curve_component
@@ -75,125 +93,168 @@ def transform_curve_components(curve):
 
     return target_list
 
+def helper_bond(tenor, quote_details, today):
+    """Par bond behind a bond quote, issued today and maturing after tenor"""
+    sched = quote_details["Schedule"]
+    bond_info = quote_details["FixedRateBond"]
+
+    # Calendar, maturity, issue
+    calendar = ConvertUtils.calendars_from_strings(sched["Calendars"])
+    maturity = calendar.advance(today, tenor)
+    issue_date = today
+
+    # Build schedule
+    ql_schedule = ql.Schedule(
+        issue_date,
+        maturity,
+        ql.Period(ConvertUtils.enum_from_string(sched["Frequency"])),
+        calendar,
+        ConvertUtils.enum_from_string(ConvertUtils.BusDayConv[sched["BusDayConv"]]),
+        ConvertUtils.enum_from_string(ConvertUtils.BusDayConv[sched["TermBusDayConv"]]),
+        ConvertUtils.enum_from_string(ConvertUtils.DateGeneration[sched["DateGeneration"]]),
+        sched["endOfMonth"]
+    )
+
+    # Build bond object
+    return ql.FixedRateBond(
+        bond_info["SettlementDays"],
+        PricingConstants.PAR,
+        ql_schedule,
+        [bond_info["Coupon"]/PricingConstants.RATE_FACTOR],
+        ConvertUtils.day_counter_from_string(bond_info["DayCounter"])
+    )
+
+
 def bootstrap(quotes):
 
     today = ql.Settings.instance().evaluationDate
 
-    rate_helpers = []
+    with Metrics.stage("curve", "helpers"):
+        rate_helpers = []
 
-    # -----------------------------
-    # 1) Deposits
-    # -----------------------------
-    for tenor, quote in quotes.get("Deposits", {}).items():
-        qd = quote["quote_details"]
-
-        rate_helpers.append(
-            ql.DepositRateHelper(
-                ql.QuoteHandle(quote["pricer_quote"]),
-                tenor,
-                qd["SettlementDays"],
-                ConvertUtils.calendars_from_strings(qd["Calendars"]),
-                ConvertUtils.enum_from_string(ConvertUtils.BusDayConv[qd["BusDayConv"]]),
-                qd["endOfMonth"],
-                ConvertUtils.day_counter_from_string(qd["DayCounter"]),
-            )
-        )
+        # -----------------------------
+        # 1) Deposits
+        # -----------------------------
+        for tenor, quote in quotes.get("Deposits", {}).items():
+            qd = quote["quote_details"]
 
-    # -----------------------------
-    # 2) Futures
-    # -----------------------------
-    for tenor, quote in quotes.get("Futures", {}).items():
-        qd = quote["quote_details"]
-
-        rate_helpers.append(
-            ql.FuturesRateHelper(
-                ql.QuoteHandle(quote["pricer_quote"]),
-                tenor,
-                qd["Months"],
-                ConvertUtils.calendars_from_strings(qd["Calendars"]),
-                ConvertUtils.enum_from_string(ConvertUtils.BusDayConv[qd["BusDayConv"]]),
-                qd["endOfMonth"],
-                ConvertUtils.day_counter_from_string(qd["DayCounter"]),
-                ql.makeQuoteHandle(0.0),
+            rate_helpers.append(
+                ql.DepositRateHelper(
+                    ql.QuoteHandle(quote["pricer_quote"]),
+                    tenor,
+                    qd["SettlementDays"],
+                    ConvertUtils.calendars_from_strings(qd["Calendars"]),
+                    ConvertUtils.enum_from_string(ConvertUtils.BusDayConv[qd["BusDayConv"]]),
+                    qd["endOfMonth"],
+                    ConvertUtils.day_counter_from_string(qd["DayCounter"]),
+                )
             )
-        )
 
-    # -----------------------------
-    # 3) Bonds
-    # -----------------------------
-    for tenor, quote in quotes.get("Bonds", {}).items():
-
-        qd = quote["quote_details"]
-        sched = qd["Schedule"]
-        bond_info = qd["FixedRateBond"]
-
-        # Calendar, maturity, issue
-        calendar = ConvertUtils.calendars_from_strings(sched["Calendars"])
-        maturity = calendar.advance(today, tenor)
-        issue_date = today
-
-        # Build schedule
-        ql_schedule = ql.Schedule(
-            issue_date,
-            maturity,
-            ql.Period(ConvertUtils.enum_from_string(sched["Frequency"])),
-            calendar,
-            ConvertUtils.enum_from_string(ConvertUtils.BusDayConv[sched["BusDayConv"]]),
-            ConvertUtils.enum_from_string(ConvertUtils.BusDayConv[sched["TermBusDayConv"]]),
-            ConvertUtils.enum_from_string(ConvertUtils.DateGeneration[sched["DateGeneration"]]),
-            sched["endOfMonth"]
-        )
-
-        # Build bond object
-        bond = ql.FixedRateBond(
-            bond_info["SettlementDays"],
-            PricingConstants.PAR,
-            ql_schedule,
-            [bond_info["Coupon"]/PricingConstants.RATE_FACTOR],
-            ConvertUtils.day_counter_from_string(bond_info["DayCounter"])
-        )
-
-        # Bond helper
-        rate_helpers.append(
-            ql.BondHelper(
-                ql.QuoteHandle(quote["pricer_quote"]),
-                bond
+        # -----------------------------
+        # 2) Futures
+        # -----------------------------
+        for tenor, quote in quotes.get("Futures", {}).items():
+            qd = quote["quote_details"]
+
+            rate_helpers.append(
+                ql.FuturesRateHelper(
+                    ql.QuoteHandle(quote["pricer_quote"]),
+                    tenor,
+                    qd["Months"],
+                    ConvertUtils.calendars_from_strings(qd["Calendars"]),
+                    ConvertUtils.enum_from_string(ConvertUtils.BusDayConv[qd["BusDayConv"]]),
+                    qd["endOfMonth"],
+                    ConvertUtils.day_counter_from_string(qd["DayCounter"]),
+                    ql.makeQuoteHandle(0.0),
+                )
             )
-        )
 
-    # -----------------------------
-    # 4) OIS / Swap Helpers
-    # -----------------------------
-    swap_quotes = quotes.get("Swaps")
-    if swap_quotes:
-        index_name = quotes.get("Index", "Sofr")
-        index_class = getattr(ql, index_name)
-        swap_index = index_class()
+        # -----------------------------
+        # 3) Bonds
+        # -----------------------------
+        for tenor, quote in quotes.get("Bonds", {}).items():
 
-        for tenor, quote in swap_quotes.items():
-            qd = quote["quote_details"]
+            # Bond helper
             rate_helpers.append(
-                ql.OISRateHelper(
-                    qd["SettlementDays"],
-                    tenor,
+                ql.BondHelper(
                     ql.QuoteHandle(quote["pricer_quote"]),
-                    swap_index
+                    helper_bond(tenor, quote["quote_details"], today)
                 )
             )
 
+        # -----------------------------
+        # 4) OIS / Swap Helpers
+        # -----------------------------
+        swap_quotes = quotes.get("Swaps")
+        if swap_quotes:
+            index_name = quotes.get("Index", "Sofr")
+            index_class = getattr(ql, index_name)
+            swap_index = index_class()
+
+            for tenor, quote in swap_quotes.items():
+                qd = quote["quote_details"]
+                rate_helpers.append(
+                    ql.OISRateHelper(
+                        qd["SettlementDays"],
+                        tenor,
+                        ql.QuoteHandle(quote["pricer_quote"]),
+                        swap_index
+                    )
+                )
+
     # -----------------------------
     # 5) Build Curve
     # -----------------------------
     curve = ql.PiecewiseLogLinearDiscount(
         today,
         rate_helpers,
-        ql.Actual360()
+        ConvertUtils.day_counter_from_string(CURVE_DAY_COUNTER)
     )
     curve.enableExtrapolation()
 
     return curve, ql.YieldTermStructureHandle(curve)
 
-def transform_index_fixings(fixings):
+def curve_nodes(curve, key=None):
+    """
+    Node dates and discount factors of a bootstrapped curve, JSON-serializable so they can
+    travel in the market data stores next to the quotes they were bootstrapped from.
+    """
+    dates = curve.dates()
+
+    return {
+        "Key": key,
+        "Dates": [node_date.ISO() for node_date in dates],
+        "Discounts": [curve.discount(node_date) for node_date in dates],
+        "DayCounter": CURVE_DAY_COUNTER,
+    }
+
+def curve_from_nodes(nodes):
+    """
+    Rebuild a bootstrapped curve from its nodes without running the solver.
+    ql.DiscountCurve interpolates log-linearly, same as PiecewiseLogLinearDiscount.
+    """
+    dates = [ql.DateParser.parseISO(node_date) for node_date in nodes["Dates"]]
+
+    curve = ql.DiscountCurve(dates, nodes["Discounts"], ConvertUtils.day_counter_from_string(nodes["DayCounter"]))
+    curve.enableExtrapolation()
+
+    return curve, ql.YieldTermStructureHandle(curve)
+
+def curve_as_of(curve_name, as_of):
+    """
+    Historical curve from the curve history store: the latest stored date on or before as_of,
+    None when the store has nothing that old.
+    """
+    nodes = CurveHistory.nodes_as_of(curve_name, as_of)
+    if nodes is None:
+        return None
+
+    return curve_from_nodes(nodes)
+
+def transform_index_fixings(fixings, as_of=None):
+
+    # Fixing dates are laid out from as_of, today unless pricing under a fixed date
+    as_of = as_of or ql.Date.todaysDate()
 
     transformed_index_fixings = {}
 
@@ -203,37 +264,30 @@ def transform_index_fixings(fixings):
 
         transformed_index_fixings[index['Index']] = []
         for fixing in index_fixings:
-            fixing_date = calendar.advance(ql.Date.todaysDate(), ql.Period(fixing['date_index'], ql.Days))
+            fixing_date = calendar.advance(as_of, ql.Period(fixing['date_index'], ql.Days))
             transformed_index_fixings[index['Index']].append({'fixing_date': fixing_date.to_date().isoformat(),
                                                               'rate':fixing['rate']/PricingConstants.RATE_FACTOR})
 
     return transformed_index_fixings
 
 
-def price_ois_curve(index: str, discount_curve, curve_tenors):
-    index_class = getattr(ql, index)
-    index_obj = index_class(discount_curve)
+def business_date():
+    calendar = ql.TARGET()
+    business_date = calendar.adjust(ql.Date.todaysDate(), ql.ModifiedFollowing)
+    return calendar.advance(business_date, 0, ql.Days)
 
-    ois_swaps = {}
-    for curve_tenor in curve_tenors:
-        ois = ql.MakeOIS(ql.Period(curve_tenor), index_obj)
-        ois.setPricingEngine(ql.DiscountingSwapEngine(discount_curve))
-        ois_swaps[curve_tenor] = ois
 
-    # Run computations in parallel
-    with ThreadPoolExecutor() as executor:
-        results = executor.map(lambda item: (item[0], item[1].fairRate() * PricingConstants.RATE_FACTOR), ois_swaps.items())
+def ois_curve_rates(index: str, nodes, curve_tenors) -> np.ndarray:
+    # Spot-starting OIS par rates, with a single curve the telescopic kernel matches ql.MakeOIS
+    rates = SwapUtils.forward_par_rates(index, nodes, curve_tenors, ["0D"])[:, 0]
+    return rates * PricingConstants.RATE_FACTOR
 
-    tenors = []
-    rates = []
-    for tenor, rate in results:
-        tenors.append(tenor)
-        rates.append(rate)
 
-    return index_obj, tenors, rates
+def price_ois_curve(index: str, nodes, curve_tenors):
+    return list(curve_tenors), ois_curve_rates(index, nodes, curve_tenors).tolist()
 
 
-def price_yield_curve(default_bond_setup, discount_curve, curve_tenors):
+def yield_curve_rates(default_bond_setup, nodes, curve_tenors) -> np.ndarray:
 
     sched = default_bond_setup["Schedule"]
     bond_info = default_bond_setup["FixedRateBond"]
@@ -246,61 +300,50 @@ def price_yield_curve(default_bond_setup, discount_curve, curve_tenors):
     ql_compounding = ConvertUtils.enum_from_string(sched["Compounding"])
     ql_day_counter = ConvertUtils.day_counter_from_string(bond_info["DayCounter"])
 
-    # Run computations in parallel
-    with ThreadPoolExecutor() as executor:
-        results = executor.map(
-            lambda item: (
-                item,
-                discount_curve
-                .zeroRate(
-                    calendar.advance(today, ql.Period(item)),
-                    ql_day_counter,
-                    ql_compounding,
-                    ql_frequency,
-                )
-                .rate() * PricingConstants.RATE_FACTOR
-            ),
-            curve_tenors,
-        )
+    # Evaluate all tenors in one NumPy pass off the bootstrapped nodes
+    vector_curve = VectorCurveUtils.VectorCurve.from_nodes(nodes)
+    tenor_dates = VectorCurveUtils.tenor_dates(today, calendar, curve_tenors)
 
-    tenors = []
-    rates = []
-    for tenor, rate in results:
-        tenors.append(tenor)
-        rates.append(rate)
+    return vector_curve.zero_rates(tenor_dates, ql_day_counter, ql_compounding, ql_frequency) * PricingConstants.RATE_FACTOR
 
-    return tenors, rates
 
+@Metrics.timed("curve", "curve_rates")
+def curve_rates(curve, nodes, curve_tenors) -> np.ndarray:
+    """OIS par rates for index curves, zero rates off the default bond setup otherwise"""
+    if 'Index' in curve:
+        return ois_curve_rates(curve['Index'], nodes, curve_tenors)
 
-def price_mid_curve(index, forecast_curve, swap_tenors, forward_start_tenors):
+    return yield_curve_rates(curve['DefaultBondSetup'], nodes, curve_tenors)
 
-    ois_midcurves = {}
-    ois_midcurves_results = []
-    ois_midcurve_surface_results = []
-
-    index_class = getattr(ql, index)
-    index_obj = index_class(forecast_curve)
-
-    for curve_tenor in swap_tenors:
-        ois_midcurves[curve_tenor] = {}
-        for forward_start in forward_start_tenors:
-            ois = ql.MakeOIS(ql.Period(curve_tenor), index_obj,
-                             fwdStart=ql.Period(forward_start),
-                             telescopicValueDates=True)
-            ois.setPricingEngine(ql.DiscountingSwapEngine(forecast_curve))
-            ois_midcurves[curve_tenor][forward_start] = ois
-
-        with ThreadPoolExecutor() as executor:
-            midcurve_results = dict(
-                executor.map(
-                    lambda item: (item[0], round(item[1].fairRate() * PricingConstants.RATE_FACTOR, RoundingConstants.ROUND_RATE)),
-                    ois_midcurves[curve_tenor].items()
-                )
-            )
 
-        ois_midcurve_surface_results.append(list(midcurve_results.values()))
+def price_yield_curve(default_bond_setup, nodes, curve_tenors):
+    return list(curve_tenors), yield_curve_rates(default_bond_setup, nodes, curve_tenors).tolist()
+
+
+@Metrics.timed("curve", "mid_curve")
+def mid_curve_rates(index, nodes, swap_tenors, forward_start_tenors, validate=False) -> np.ndarray:
+
+    if validate:
+        rates = SwapUtils.validate_forward_par_rates(index, nodes, swap_tenors, forward_start_tenors)
+    else:
+        rates = SwapUtils.forward_par_rates(index, nodes, swap_tenors, forward_start_tenors)
 
+    return np.round(rates * PricingConstants.RATE_FACTOR, RoundingConstants.ROUND_RATE)
+
+
+def mid_curve_results(swap_tenors, forward_start_tenors, rates):
+
+    ois_midcurves_results = []
+    ois_midcurve_surface_results = np.asarray(rates).tolist()
+
+    for curve_tenor, midcurve_rates in zip(swap_tenors, ois_midcurve_surface_results):
+        midcurve_results = dict(zip(forward_start_tenors, midcurve_rates))
         midcurve_results['Tenor'] = curve_tenor
         ois_midcurves_results.append(midcurve_results)
 
-    return ois_midcurves, ois_midcurves_results, ois_midcurve_surface_results
\ No newline at end of file
+    return ois_midcurves_results, ois_midcurve_surface_results
+
+
+def price_mid_curve(index, nodes, swap_tenors, forward_start_tenors, validate=False):
+    rates = mid_curve_rates(index, nodes, swap_tenors, forward_start_tenors, validate)
+    return mid_curve_results(swap_tenors, forward_start_tenors, rates)
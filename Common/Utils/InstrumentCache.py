@@ -0,0 +1,110 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import QuantLib as ql
+
+from Common.Utils import BondUtils, CurveCache
+
+
+class InstrumentCache(object):
+    """
+    Process-wide LRU cache of built instruments, pricing engine attached.
+
+    Instruments are keyed by a canonical hash of (kind, schedule, terms, discount curve key,
+    evaluation date), so editing a price or a yield only runs the solvers on the live
+    instrument instead of rebuilding its calendar, schedule and cashflows.
+
+    QuantLib instruments cache their results and are not thread safe: an instrument is
+    only ever used inside instrument(), which holds its own lock.
+    """
+
+    def __init__(self, max_size: int = 64):
+        self.max_size = max_size
+        self.reset()
+
+    def reset(self):
+        # Also run in forked job processes, which must not inherit a lock held by another thread
+        self._instruments = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(kind: str, schedule: dict, terms: dict, curve_key: str) -> str:
+        evaluation_date = ql.Settings.instance().evaluationDate.ISO()
+
+        payload = json.dumps([kind, evaluation_date, curve_key, schedule, terms], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @contextmanager
+    def instrument(self, key: str, build):
+        """The cached instrument for key, built with build() on a miss, held exclusively for the block"""
+        with self._lock:
+            entry = self._instruments.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self._instruments.move_to_end(key)
+                self.hits += 1
+
+        if entry is None:
+            entry = (build(), threading.Lock())
+
+            with self._lock:
+                # Another thread may have built the same instrument meanwhile, one copy is kept
+                entry = self._instruments.setdefault(key, entry)
+                self._instruments.move_to_end(key)
+
+                while len(self._instruments) > self.max_size:
+                    self._instruments.popitem(last=False)
+                    self.evictions += 1
+
+        instrument, lock = entry
+        with lock:
+            yield instrument
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._instruments),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._instruments.clear()
+            self.hits = self.misses = self.evictions = 0
+
+
+instrument_cache = InstrumentCache(int(os.getenv("DASHQL_INSTRUMENT_CACHE_SIZE", "64")))
+
+os.register_at_fork(after_in_child=instrument_cache.reset)
+
+
+@contextmanager
+def fixed_rate_bond(schedule: dict, bond_info: dict, curve_data: dict):
+    """
+    Fixed rate bond of the SchedulePanel schedule and the bond terms, discounted on the
+    portal curve entry, held exclusively for the block.
+    """
+    curve_key = CurveCache.curve_cache.key(curve_data["Curve"]["Name"], curve_data["MarketData"])
+
+    def build():
+        bond = BondUtils.get_fixed_rate_bond(schedule, bond_info)
+        _, discount_curve = CurveCache.get_curve(curve_data)
+        bond.setPricingEngine(ql.DiscountingBondEngine(discount_curve))
+        return bond
+
+    with instrument_cache.instrument(instrument_cache.key("FixedRateBond", schedule, bond_info, curve_key), build) as bond:
+        yield bond
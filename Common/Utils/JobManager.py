@@ -0,0 +1,92 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import os
+import tempfile
+
+import dash
+import diskcache
+import multiprocess
+import psutil
+
+JOB_CACHE_DIR = os.path.join(tempfile.gettempdir(), "dashql_jobs")
+
+# Shown while a job runs, hidden once it is done
+RUNNING_STYLE = {"visibility": "visible"}
+IDLE_STYLE = {"visibility": "hidden"}
+
+
+class LocalJobManager(dash.DiskcacheManager):
+    """
+    DiskcacheManager for several gunicorn workers sharing one disk cache.
+
+    The worker collecting a result is often not the one that forked the job, and waiting on
+    another worker's child only ends with the timeout, since its parent is the only one able
+    to reap it. Jobs are killed by whichever worker sees them done, reaped by their own.
+    """
+
+    def terminate_job(self, job):
+        if job is None:
+            return
+
+        job = int(job)
+        with self.handle.transact():
+            if not psutil.pid_exists(job):
+                return
+
+            try:
+                process = psutil.Process(job)
+                own_job = process.ppid() == os.getpid()
+
+                for child in process.children(recursive=True):
+                    try:
+                        child.kill()
+                    except psutil.NoSuchProcess:
+                        pass
+                process.kill()
+
+                if own_job:
+                    process.wait(1)
+            except (psutil.NoSuchProcess, psutil.TimeoutExpired):
+                pass
+
+    def call_job_fn(self, key, job_fn, args, context):
+        # Reap this worker's finished jobs, including those another worker killed
+        multiprocess.active_children()
+        return super().call_job_fn(key, job_fn, args, context)
+
+
+def create_job_manager(cache_dir: str = JOB_CACHE_DIR, expire: float = 600.0) -> LocalJobManager:
+    """
+    Local background callback manager: every job runs in its own forked process and reports
+    progress and results through a disk cache, so any gunicorn worker can answer the polls
+    and no broker is needed. Results nobody collected expire after expire seconds.
+    """
+    return LocalJobManager(diskcache.Cache(cache_dir), expire=expire)
+
+
+job_manager = create_job_manager(
+    os.getenv("DASHQL_JOB_CACHE", JOB_CACHE_DIR),
+    expire=float(os.getenv("DASHQL_JOB_EXPIRE_SECONDS", "600")),
+)
+
+
+def background_job(progress_id: str, cancel: list = None, interval: int = None, progress: list = None) -> dict:
+    """
+    Callback arguments that run it as a background job with progress on progress_id.
+
+    Dash terminates a job still running when its callback fires again, cancel lists the
+    further inputs that should stop it. The callback receives set_progress((done, total))
+    as its first argument, or set_progress((done, total, *values)) with values for the
+    further progress outputs, which are reset to None once the job is over.
+    """
+    progress = progress or []
+
+    return {
+        "background": True,
+        "manager": job_manager,
+        "interval": interval or int(os.getenv("DASHQL_JOB_POLL_MS", "250")),
+        "progress": [dash.Output(progress_id, "value"), dash.Output(progress_id, "max"), *progress],
+        "progress_default": [0, 1, *([None] * len(progress))],
+        "running": [(dash.Output(progress_id, "style"), RUNNING_STYLE, IDLE_STYLE)],
+        "cancel": cancel or [],
+    }
@@ -0,0 +1,112 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import os
+import threading
+from collections import OrderedDict
+
+from Common.Utils import CurveUtils, CurveCache
+
+
+class LiveCurve(object):
+    """
+    Bootstrapped curve that keeps its rate helpers and SimpleQuotes alive between edits.
+
+    Re-syncing with edited market data only calls setValue on the quotes that changed,
+    QuantLib's observers then re-bootstrap the curve lazily on the next access.
+    """
+
+    def __init__(self, market_data: list):
+        self.lock = threading.Lock()
+        self.quotes = CurveUtils.create_rate_helpers(market_data)
+        self.curve, self.handle = CurveUtils.bootstrap(self.quotes)
+
+        self._pricer_quotes = {}
+        for instrument_quotes in self.quotes.values():
+            for quote in instrument_quotes.values():
+                key = (quote['quote_details']['Type'], quote['ticker'])
+                self._pricer_quotes[key] = quote['pricer_quote']
+
+    def pricer_quote(self, instrument_type: str, ticker: str):
+        return self._pricer_quotes[(instrument_type, ticker)]
+
+    def sync(self, market_data: list) -> bool:
+        """
+        Push edited quotes into the live SimpleQuotes.
+        Returns False when the instrument set differs and the curve has to be rebuilt.
+        """
+        if len(market_data) != len(self._pricer_quotes):
+            return False
+
+        updates = []
+        for row in market_data:
+            pricer_quote = self._pricer_quotes.get((row['instrument_type'], row['ticker']))
+            if pricer_quote is None:
+                return False
+
+            value = CurveUtils.pricer_quote_value(row['instrument_type'], row['quote'])
+            if pricer_quote.value() != value:
+                updates.append((pricer_quote, value))
+
+        for pricer_quote, value in updates:
+            pricer_quote.setValue(value)
+
+        return True
+
+    def snapshot(self):
+        """Immutable copy of the current curve, interpolated log-linearly on the bootstrapped nodes"""
+        frozen_curve, _ = CurveUtils.curve_from_nodes(CurveUtils.curve_nodes(self.curve))
+        return frozen_curve
+
+
+class LiveCurves(object):
+    """Live curves keyed by (session, curve name) with LRU eviction"""
+
+    def __init__(self, max_size: int = 64):
+        self.max_size = max_size
+        self._curves = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str, curve_name: str):
+        with self._lock:
+            live_curve = self._curves.get((session_id, curve_name))
+            if live_curve is not None:
+                self._curves.move_to_end((session_id, curve_name))
+            return live_curve
+
+    def put(self, session_id: str, curve_name: str, live_curve: LiveCurve):
+        with self._lock:
+            self._curves[(session_id, curve_name)] = live_curve
+            self._curves.move_to_end((session_id, curve_name))
+
+            while len(self._curves) > self.max_size:
+                self._curves.popitem(last=False)
+
+    def update(self, session_id: str, curve_name: str, market_data: list) -> LiveCurve:
+        live_curve = self.get(session_id, curve_name)
+
+        if live_curve is not None:
+            with live_curve.lock:
+                if live_curve.sync(market_data):
+                    return live_curve
+
+        live_curve = LiveCurve(market_data)
+        self.put(session_id, curve_name, live_curve)
+
+        return live_curve
+
+
+live_curves = LiveCurves(int(os.getenv("DASHQL_LIVE_CURVES_SIZE", "64")))
+
+
+def apply_market_data_edit(session_id: str, curve_name: str, market_data: list):
+    """
+    Re-bootstrap the session's live curve after a quote edit and publish a frozen copy
+    to the curve cache, so downstream panels pick it up without bootstrapping again.
+    """
+    live_curve = live_curves.update(session_id, curve_name, market_data)
+
+    with live_curve.lock:
+        frozen_curve = live_curve.snapshot()
+
+    key = CurveCache.curve_cache.key(curve_name, market_data)
+    return CurveCache.curve_cache.put(key, frozen_curve)
@@ -0,0 +1,170 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import functools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import dash
+import numpy as np
+
+METRICS_PATH = "/metrics"
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LatencySummary(object):
+    """Count and sum of every observation, quantiles over the most recent window of them"""
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.total = 0.0
+        self.samples = deque(maxlen=window)
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+
+
+class Metrics(object):
+    """
+    Process-wide latency summaries, labelled by (panel, callback) for Dash callbacks and by
+    (module, stage) for the pricing stages inside the utils.
+
+    Exposed in the Prometheus text format. Every gunicorn worker keeps its own summaries,
+    so scrape each worker (or run one worker per container) for a complete picture.
+    """
+
+    def __init__(self, window: int = 1024):
+        self.window = window
+        self._summaries = {}
+        self._lock = threading.Lock()
+
+    def observe(self, metric: str, labels: tuple, seconds: float):
+        with self._lock:
+            summary = self._summaries.get((metric, labels))
+            if summary is None:
+                summary = self._summaries[(metric, labels)] = LatencySummary(self.window)
+            summary.observe(seconds)
+
+    def snapshot(self) -> dict:
+        """{(metric, labels): (count, sum, quantiles)}"""
+        with self._lock:
+            summaries = {key: (summary.count, summary.total, np.array(summary.samples))
+                         for key, summary in self._summaries.items()}
+
+        return {key: (count, total, np.quantile(samples, QUANTILES) if len(samples) else np.zeros(len(QUANTILES)))
+                for key, (count, total, samples) in summaries.items()}
+
+    def prometheus_text(self) -> str:
+        lines = []
+        snapshot = self.snapshot()
+
+        for metric, help_text in METRICS.items():
+            entries = sorted((labels, values) for (name, labels), values in snapshot.items() if name == metric)
+            if not entries:
+                continue
+
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} summary")
+            for labels, (count, total, quantiles) in entries:
+                label_text = ",".join(f'{name}="{value}"' for name, value in labels)
+                for quantile, value in zip(QUANTILES, quantiles):
+                    lines.append(f'{metric}{{{label_text},quantile="{quantile}"}} {value:.6f}')
+                lines.append(f"{metric}_sum{{{label_text}}} {total:.6f}")
+                lines.append(f"{metric}_count{{{label_text}}} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        with self._lock:
+            self._summaries.clear()
+
+
+CALLBACK_METRIC = "dashql_callback_seconds"
+STAGE_METRIC = "dashql_stage_seconds"
+
+METRICS = {
+    CALLBACK_METRIC: "Dash callback latency by panel and callback",
+    STAGE_METRIC: "Pricing stage latency by module and stage",
+}
+
+metrics = Metrics(window=int(os.getenv("DASHQL_METRICS_WINDOW", "1024")))
+
+os.register_at_fork(after_in_child=lambda: setattr(metrics, "_lock", threading.Lock()))
+
+
+# -----------------------
+# Stage timers
+# -----------------------
+@contextmanager
+def stage(module: str, name: str):
+    """Time the block as one pricing stage, observed even when the block raises"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.observe(STAGE_METRIC, (("module", module), ("stage", name)), time.perf_counter() - start)
+
+
+def timed(module: str, name: str):
+    """Decorator form of stage for functions that are a stage on their own"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with stage(module, name):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+# -----------------------
+# Dash callbacks
+# -----------------------
+def callback_labels(function) -> tuple:
+    # Panel callbacks are closures of _register_callbacks, app-level ones module functions
+    qualname = function.__qualname__
+    panel = qualname.split(".")[0] if ".<locals>." in qualname else function.__module__
+
+    return ("panel", panel), ("callback", function.__name__)
+
+
+def instrument_callbacks(app: dash.Dash):
+    """Time every server-side callback registered on the app, clientside ones never reach Python"""
+    for callback in app.callback_map.values():
+        function = callback.get("callback")
+        if function is None or getattr(function, "instrumented", False):
+            continue
+
+        callback["callback"] = _timed_callback(function, callback_labels(function))
+
+
+def _timed_callback(function, labels: tuple):
+    # functools.wraps carries pricing_job over, see AsgiUtils.pricing_outputs
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            metrics.observe(CALLBACK_METRIC, labels, time.perf_counter() - start)
+
+    wrapper.instrumented = True
+    return wrapper
+
+
+def mount(app: dash.Dash):
+    """Instrument the app's callbacks and serve the metrics on the Flask server"""
+    instrument_callbacks(app)
+
+    if METRICS_PATH.strip("/") not in app.server.view_functions:
+        app.server.add_url_rule(METRICS_PATH, METRICS_PATH.strip("/"), _metrics_view)
+
+
+def _metrics_view():
+    return metrics.prometheus_text(), 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
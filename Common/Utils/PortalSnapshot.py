@@ -0,0 +1,103 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import json
+import os
+import threading
+import time
+from datetime import date
+
+import QuantLib as ql
+
+from Common.Utils import CurveCache, CurveUtils, PricingContext
+
+CURVE_SETUP_FILE = "data/curve_setup.json"
+INDEX_FIXINGS_FILE = "data/index_fixings.json"
+
+
+class PortalSnapshot(object):
+    """Portal curves (with their bootstrapped nodes) and index fixings as of one business date"""
+
+    def __init__(self, key: tuple, business_date: ql.Date, curves: dict, index_fixings: dict):
+        self.key = key
+        self.business_date = business_date
+        self.curves = curves
+        self.index_fixings = index_fixings
+
+
+class PortalSnapshotCache(object):
+    """
+    Process-wide start-up snapshot, built once per business date.
+
+    The snapshot is rebuilt when the calendar date rolls or either input file changes,
+    otherwise every page load is served the same snapshot by reference. File changes are
+    checked at most once per check_interval seconds.
+    """
+
+    def __init__(self, curve_setup_file: str = CURVE_SETUP_FILE, index_fixings_file: str = INDEX_FIXINGS_FILE,
+                 check_interval: float = 5.0):
+        self.curve_setup_file = curve_setup_file
+        self.index_fixings_file = index_fixings_file
+        self.check_interval = check_interval
+
+        self._snapshot = None
+        self._file_versions = None
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+        self.builds = 0
+
+    def _file_version(self) -> tuple:
+        return tuple(os.stat(file_name).st_mtime_ns for file_name in (self.curve_setup_file, self.index_fixings_file))
+
+    def _build(self, key: tuple) -> PortalSnapshot:
+        with open(self.curve_setup_file, "r") as f:
+            curve_setup = json.load(f)
+
+        with open(self.index_fixings_file, "r") as f:
+            index_fixings_data = json.load(f)
+
+        with PricingContext.evaluation_date() as business_date:
+            index_fixings = CurveUtils.transform_index_fixings(index_fixings_data)
+
+            curves = {}
+            for curve in curve_setup:
+                curve_data = {"Curve": curve, "MarketData": CurveUtils.transform_curve_components(curve)}
+                curve_data["Nodes"] = CurveCache.get_nodes(curve_data)
+                curves[curve["Name"]] = curve_data
+
+        self.builds += 1
+        return PortalSnapshot(key, business_date, curves, index_fixings)
+
+    def get(self) -> PortalSnapshot:
+        today = date.today()
+        now = time.monotonic()
+
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.key[0] == today and now - self._checked < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            if now - self._checked >= self.check_interval or self._file_versions is None:
+                self._file_versions = self._file_version()
+                self._checked = now
+
+            key = (today, self._file_versions)
+            if self._snapshot is None or self._snapshot.key != key:
+                self._snapshot = self._build(key)
+
+            return self._snapshot
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
+            self._file_versions = None
+            self._checked = 0.0
+
+
+portal_snapshot_cache = PortalSnapshotCache(
+    check_interval=float(os.getenv("DASHQL_SNAPSHOT_CHECK_SECONDS", "5"))
+)
+
+
+def get_snapshot() -> PortalSnapshot:
+    return portal_snapshot_cache.get()
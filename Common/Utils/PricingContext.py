@@ -0,0 +1,119 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import functools
+import os
+import threading
+from contextlib import contextmanager
+from datetime import date
+
+import QuantLib as ql
+
+from Common.Utils import CurveUtils
+
+
+class EvaluationDateLock(object):
+    """
+    QuantLib's evaluation date is one global per process, shared by every request thread.
+
+    Pricing jobs lease it: any number of threads may price concurrently on the date currently
+    set, a job on another date waits for them to finish before the date is switched, and jobs
+    arriving for the current date queue behind it so it is not starved. Leases are re-entrant
+    on the same thread and date.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._condition = threading.Condition()
+        self._serial = None
+        self._holders = 0
+        self._waiting = 0
+        self._depth = {}
+
+    def acquire(self, as_of: ql.Date):
+        serial = as_of.serialNumber()
+        thread_id = threading.get_ident()
+
+        with self._condition:
+            depth = self._depth.get(thread_id, 0)
+            if depth:
+                if serial != self._serial:
+                    raise ValueError(f"Pricing job on {as_of.ISO()} nested in a job on {ql.Date(self._serial).ISO()}")
+                self._depth[thread_id] = depth + 1
+                return
+
+            waiting = False
+            while self._holders and (self._serial != serial or self._waiting):
+                if self._serial != serial and not waiting:
+                    self._waiting += 1
+                    waiting = True
+                self._condition.wait()
+
+            if waiting:
+                self._waiting -= 1
+
+            if ql.Settings.instance().evaluationDate.serialNumber() != serial:
+                ql.Settings.instance().evaluationDate = ql.Date(serial)
+
+            self._serial = serial
+            self._holders += 1
+            self._depth[thread_id] = 1
+
+    def release(self):
+        thread_id = threading.get_ident()
+
+        with self._condition:
+            depth = self._depth[thread_id] - 1
+            if depth:
+                self._depth[thread_id] = depth
+                return
+
+            del self._depth[thread_id]
+            self._holders -= 1
+            if not self._holders:
+                self._condition.notify_all()
+
+
+evaluation_date_lock = EvaluationDateLock()
+
+# A forked job process (see JobManager) starts without the leases of its parent's threads
+os.register_at_fork(after_in_child=evaluation_date_lock.reset)
+
+
+_business_date = (None, None)
+
+
+def current_business_date() -> ql.Date:
+    """Business date of the running process, recomputed when the calendar date rolls"""
+    global _business_date
+
+    today = date.today()
+    if _business_date[0] != today:
+        _business_date = (today, CurveUtils.business_date())
+
+    return _business_date[1]
+
+
+@contextmanager
+def evaluation_date(as_of: ql.Date = None):
+    """Pin the QuantLib evaluation date for the block, the current business date by default"""
+    as_of = as_of or current_business_date()
+
+    evaluation_date_lock.acquire(as_of)
+    try:
+        yield as_of
+    finally:
+        evaluation_date_lock.release()
+
+
+def pricing_job(function):
+    """Run a callback with the evaluation date pinned to the current business date"""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        with evaluation_date():
+            return function(*args, **kwargs)
+
+    # Carried through Dash's own functools.wraps, lets the ASGI entry point spot pricing callbacks
+    wrapper.pricing_job = True
+    return wrapper
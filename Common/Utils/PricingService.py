@@ -0,0 +1,226 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import atexit
+import json
+import multiprocessing
+import os
+import threading
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import QuantLib as ql
+
+from Common.Utils import CurveUtils, CurveCache
+
+CURVE_SETUP_FILE = "data/curve_setup.json"
+
+
+def curve_routes(curve_setup_file: str, worker_count: int) -> dict:
+    """Portal curves dealt round-robin across the workers, in curve setup order"""
+    with open(curve_setup_file, "r") as f:
+        curve_setup = json.load(f)
+
+    return {curve["Name"]: i % worker_count for i, curve in enumerate(curve_setup)}
+
+
+def route(curve_name: str, worker_count: int, routes: dict = None) -> int:
+    if routes and curve_name in routes:
+        return routes[curve_name]
+
+    # crc32 rather than hash(): string hashes are salted per process
+    return zlib.crc32(curve_name.encode("utf-8")) % worker_count
+
+
+# -----------------------
+# Worker side
+# -----------------------
+
+def _set_evaluation_date(evaluation_serial: int):
+    if ql.Settings.instance().evaluationDate.serialNumber() != evaluation_serial:
+        ql.Settings.instance().evaluationDate = ql.Date(evaluation_serial)
+
+
+def _initialize_worker(curve_names: list, evaluation_serial: int, curve_setup_file: str):
+    """Bootstrap the portal curves routed to this worker, so its first jobs hit a warm curve cache"""
+    _set_evaluation_date(evaluation_serial)
+
+    with open(curve_setup_file, "r") as f:
+        curve_setup = json.load(f)
+
+    for curve in curve_setup:
+        if curve["Name"] in curve_names:
+            CurveCache.curve_cache.get_curve(curve["Name"], CurveUtils.transform_curve_components(curve))
+
+
+def _run_job(evaluation_serial: int, function, curve_data: dict, args: tuple):
+    _set_evaluation_date(evaluation_serial)
+    return function(curve_data, *args)
+
+
+# -----------------------
+# Jobs
+# -----------------------
+
+def price_curve(curve_data: dict, curve_tenors) -> np.ndarray:
+    nodes = CurveCache.get_nodes(curve_data)
+    return CurveUtils.curve_rates(curve_data['Curve'], nodes, curve_tenors)
+
+
+def price_mid_curve(curve_data: dict, swap_tenors, forward_start_tenors) -> np.ndarray:
+    nodes = CurveCache.get_nodes(curve_data)
+    return CurveUtils.mid_curve_rates(curve_data['Curve']['Index'], nodes, swap_tenors, forward_start_tenors)
+
+
+# -----------------------
+# Service
+# -----------------------
+
+class PricingService(object):
+    """
+    Persistent pool of pricing processes.
+
+    Each worker is a single-process executor that bootstraps its share of the portal curves
+    at start-up, jobs are routed by curve name so they land on the worker already holding
+    the curve. With no workers configured, jobs run inline in the calling thread.
+    """
+
+    def __init__(self, workers: int = 0, curve_setup_file: str = CURVE_SETUP_FILE, start_method: str = None):
+        self.workers = workers
+        self.curve_setup_file = curve_setup_file
+        self.start_method = start_method or ("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+
+        self._executors = []
+        self._routes = {}
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _create_executor(self, worker_id: int, evaluation_serial: int) -> ProcessPoolExecutor:
+        curve_names = [name for name, route_id in self._routes.items() if route_id == worker_id]
+
+        executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_initialize_worker,
+            initargs=(curve_names, evaluation_serial, self.curve_setup_file),
+        )
+
+        # Fork the process and run the bootstrap now rather than on the first job
+        executor.submit(int)
+        return executor
+
+    def start(self):
+        if self.workers <= 0 or multiprocessing.parent_process() is not None:
+            return
+
+        with self._lock:
+            # Executors inherited through a fork (e.g. gunicorn --preload) belong to the parent
+            if self._pid == os.getpid():
+                return
+
+            evaluation_serial = CurveUtils.business_date().serialNumber()
+            self._routes = curve_routes(self.curve_setup_file, self.workers)
+            self._executors = [self._create_executor(worker_id, evaluation_serial) for worker_id in range(self.workers)]
+            self._pid = os.getpid()
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            if self._pid == os.getpid():
+                for executor in self._executors:
+                    executor.shutdown(wait=wait, cancel_futures=True)
+
+            self._executors = []
+            self._pid = None
+
+    def submit(self, function, curve_data: dict, *args) -> Future:
+        """Submit function(curve_data, *args) to the worker owning the curve"""
+        evaluation_serial = ql.Settings.instance().evaluationDate.serialNumber()
+
+        if self.workers > 0:
+            self.start()
+
+        if self._pid != os.getpid():
+            future = Future()
+            try:
+                future.set_result(function(curve_data, *args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        worker_id = route(curve_data["Curve"]["Name"], self.workers, self._routes)
+        return self._executors[worker_id].submit(_run_job, evaluation_serial, function, curve_data, args)
+
+    def map(self, function, curve_data: dict, chunks: list) -> list:
+        """
+        Run function(curve_data, chunk) for every chunk, dealt across all workers
+        regardless of curve affinity, results in chunk order.
+        """
+        if self.workers > 0:
+            self.start()
+
+        if self._pid != os.getpid():
+            return [function(curve_data, chunk) for chunk in chunks]
+
+        evaluation_serial = ql.Settings.instance().evaluationDate.serialNumber()
+        futures = [
+            self._executors[i % self.workers].submit(_run_job, evaluation_serial, function, curve_data, (chunk,))
+            for i, chunk in enumerate(chunks)
+        ]
+
+        try:
+            return [future.result() for future in futures]
+        except BrokenProcessPool:
+            self.shutdown(wait=False)
+            return [function(curve_data, chunk) for chunk in chunks]
+
+    def map_completed(self, function, curve_data: dict, chunks: list, workers: int):
+        """
+        Run function(curve_data, chunk) for every chunk on a pool of its own, yielding
+        (chunk index, result) as each chunk completes.
+
+        For long batches in a job process (see JobManager): the service's executors belong to
+        the server worker that forked the job. Forked pool processes start with the caller's
+        curve cache, so bootstrap the curve before calling. With one worker, chunks run inline.
+        """
+        if workers <= 1 or len(chunks) <= 1:
+            for chunk_index, chunk in enumerate(chunks):
+                yield chunk_index, function(curve_data, chunk)
+            return
+
+        evaluation_serial = ql.Settings.instance().evaluationDate.serialNumber()
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks)),
+                                 mp_context=multiprocessing.get_context(self.start_method)) as executor:
+            futures = {executor.submit(_run_job, evaluation_serial, function, curve_data, (chunk,)): chunk_index
+                       for chunk_index, chunk in enumerate(chunks)}
+
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def run(self, function, curve_data: dict, *args):
+        try:
+            return self.submit(function, curve_data, *args).result()
+        except BrokenProcessPool:
+            # A worker died, restart the pool on the next job and price this one inline
+            self.shutdown(wait=False)
+            return function(curve_data, *args)
+
+
+pricing_service = PricingService(int(os.getenv("DASHQL_PRICING_WORKERS", "0")))
+atexit.register(pricing_service.shutdown)
+
+
+def start():
+    pricing_service.start()
+
+
+def run(function, curve_data: dict, *args):
+    return pricing_service.run(function, curve_data, *args)
+
+
+def map_chunks(function, curve_data: dict, chunks: list) -> list:
+    return pricing_service.map(function, curve_data, chunks)
+
+
+def map_completed(function, curve_data: dict, chunks: list, workers: int):
+    return pricing_service.map_completed(function, curve_data, chunks, workers)
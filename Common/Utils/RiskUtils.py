@@ -0,0 +1,246 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import QuantLib as ql
+
+from Common.Utils import ConvertUtils, CurveCache, CurveUtils, LiveCurve, PricingService, VectorCurveUtils
+from Common.Utils.Constants import PricingConstants
+
+BASIS_POINT = 0.0001
+
+
+def quote_label(row: dict) -> str:
+    return f"{row['instrument_type']} {row['ticker']}"
+
+
+def rate_bump(row: dict, value: float, today: ql.Date) -> float:
+    """Change of a pricer quote equivalent to a +1bp move in the rate it stands for"""
+    instrument_type = row['instrument_type']
+
+    if instrument_type == 'Deposit' or instrument_type == 'Swap':
+        return BASIS_POINT
+
+    if instrument_type == 'Future':
+        # Futures are quoted as 100 - rate
+        return -BASIS_POINT * PricingConstants.RATE_FACTOR
+
+    if instrument_type == 'Bond':
+        # Clean price change for a +1bp move in the bond's own yield
+        quote_details = row['curve_component']
+        bond = CurveUtils.helper_bond(ql.Period(*row['tenor']), quote_details, today)
+
+        day_counter = ConvertUtils.day_counter_from_string(quote_details["FixedRateBond"]["DayCounter"])
+        frequency = ConvertUtils.enum_from_string(quote_details["Schedule"]["Frequency"])
+
+        bond_yield = ql.BondFunctions.bondYield(bond, ql.BondPrice(value, ql.BondPrice.Clean), day_counter, ql.Compounded, frequency)
+        return ql.BondFunctions.cleanPrice(bond, bond_yield + BASIS_POINT, day_counter, ql.Compounded, frequency) - value
+
+    raise ValueError(f"Unknown instrument type: {instrument_type}")
+
+
+# -----------------------
+# Curve Jacobian
+# -----------------------
+
+def _log_discounts(curve, dates) -> np.ndarray:
+    return np.log([curve.discount(node_date) for node_date in dates])
+
+
+def log_discount_bumps(curve_data: dict, quote_indices) -> np.ndarray:
+    """
+    Node log discount factor sensitivities to a 1bp move of each quote in quote_indices,
+    central differences of +/-1bp bumps.
+
+    One helper graph is bootstrapped and every bump goes through its SimpleQuotes,
+    so each column costs two re-bootstraps rather than rebuilding the rate helpers.
+    """
+    market_data = curve_data["MarketData"]
+    today = ql.Settings.instance().evaluationDate
+
+    live_curve = LiveCurve.LiveCurve(market_data)
+    dates = live_curve.curve.dates()
+
+    columns = []
+    for quote_index in quote_indices:
+        row = market_data[quote_index]
+        pricer_quote = live_curve.pricer_quote(row['instrument_type'], row['ticker'])
+        value = pricer_quote.value()
+        bump = rate_bump(row, value, today)
+
+        pricer_quote.setValue(value + bump)
+        bumped_up = _log_discounts(live_curve.curve, dates)
+        pricer_quote.setValue(value - bump)
+        bumped_down = _log_discounts(live_curve.curve, dates)
+        pricer_quote.setValue(value)
+
+        columns.append((bumped_up - bumped_down) / 2.0)
+
+    return np.array(columns).reshape(len(columns), len(dates)).T
+
+
+class CurveJacobian(object):
+    """
+    Sensitivities of the curve's node zero rates (continuous, curve day counter)
+    to a 1bp move in each of its market quotes: matrix[node, quote], the reference
+    node excluded.
+    """
+
+    def __init__(self, key: str, labels: list, nodes: dict, matrix: np.ndarray):
+        self.key = key
+        self.labels = labels
+        self.vector_curve = VectorCurveUtils.VectorCurve.from_nodes(nodes)
+        self.matrix = matrix
+
+    @classmethod
+    def build(cls, curve_data: dict, chunks: int = None):
+        market_data = curve_data["MarketData"]
+        nodes = CurveCache.get_nodes(curve_data)
+
+        # Quote bumps are independent: split them across the pricing workers
+        chunks = chunks or max(PricingService.pricing_service.workers, 1)
+        quote_chunks = [chunk.tolist() for chunk in np.array_split(np.arange(len(market_data)), chunks) if len(chunk)]
+        log_discount_changes = np.hstack(PricingService.map_chunks(log_discount_bumps, curve_data, quote_chunks))
+
+        node_times = VectorCurveUtils.VectorCurve.from_nodes(nodes).node_times
+        matrix = -log_discount_changes[1:] / node_times[1:, np.newaxis]
+
+        return cls(nodes["Key"], [quote_label(row) for row in market_data], nodes, matrix)
+
+    def zero_rate_gradients(self, cashflow_ids, cashflow_serials, cashflow_amounts, count: int) -> np.ndarray:
+        """
+        dPV/dz for every instrument over the curve nodes, from the log-linear interpolation weights:
+        ln DF(t) = (1 - w) ln DF(T_i) + w ln DF(T_i+1) and ln DF(T_i) = -z_i T_i
+        """
+        node_times = self.vector_curve.node_times
+
+        times = self.vector_curve.times(cashflow_serials)
+        present_values = np.asarray(cashflow_amounts, dtype=float) * self.vector_curve.discount_at_times(times)
+
+        # Segment of each cashflow, the first and last segments extend for extrapolation
+        segments = np.clip(np.searchsorted(node_times, times, side="right") - 1, 0, len(node_times) - 2)
+        weights = (times - node_times[segments]) / (node_times[segments + 1] - node_times[segments])
+
+        gradients = np.zeros((count, len(node_times)))
+        np.add.at(gradients, (cashflow_ids, segments), -present_values * (1.0 - weights) * node_times[segments])
+        np.add.at(gradients, (cashflow_ids, segments + 1), -present_values * weights * node_times[segments + 1])
+
+        return gradients[:, 1:]
+
+    def bucketed_dv01(self, cashflow_ids, cashflow_serials, cashflow_amounts, count: int) -> np.ndarray:
+        """PV sensitivity of every instrument to a 1bp move in each quote: one (instruments x quotes) matrix multiply"""
+        return self.zero_rate_gradients(cashflow_ids, cashflow_serials, cashflow_amounts, count) @ self.matrix
+
+
+class JacobianCache(object):
+    """LRU of curve Jacobians keyed by the curve cache key of the market state"""
+
+    def __init__(self, max_size: int = 16):
+        self.max_size = max_size
+        self._jacobians = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_jacobian(self, curve_data: dict) -> CurveJacobian:
+        key = CurveCache.curve_cache.key(curve_data["Curve"]["Name"], curve_data["MarketData"])
+
+        with self._lock:
+            jacobian = self._jacobians.get(key)
+            if jacobian is not None:
+                self._jacobians.move_to_end(key)
+                return jacobian
+
+        jacobian = CurveJacobian.build(curve_data)
+
+        with self._lock:
+            self._jacobians[key] = jacobian
+            while len(self._jacobians) > self.max_size:
+                self._jacobians.popitem(last=False)
+
+        return jacobian
+
+    def clear(self):
+        with self._lock:
+            self._jacobians.clear()
+
+
+jacobian_cache = JacobianCache(int(os.getenv("DASHQL_JACOBIAN_CACHE_SIZE", "16")))
+
+
+# -----------------------
+# Instruments
+# -----------------------
+
+def bond_cashflows(bonds: list, reference_date: ql.Date):
+    """Flat (bond id, payment serial, amount) arrays of the cashflows still to be paid"""
+    cashflow_ids = []
+    cashflow_serials = []
+    cashflow_amounts = []
+
+    for bond_id, bond in enumerate(bonds):
+        for cashflow in bond.cashflows():
+            if cashflow.date() > reference_date:
+                cashflow_ids.append(bond_id)
+                cashflow_serials.append(cashflow.date().serialNumber())
+                cashflow_amounts.append(cashflow.amount())
+
+    return np.array(cashflow_ids, dtype=np.int64), np.array(cashflow_serials, dtype=np.int64), np.array(cashflow_amounts)
+
+
+def bucketed_dv01(curve_data: dict, bonds: list):
+    """
+    Key-rate DV01 of bonds discounted on the curve against each of its market quotes.
+    Cashflow amounts are held fixed, so only fixed cashflows (fixed rate, zero coupon) are exact.
+
+    Returns (quote labels, bonds x quotes matrix)
+    """
+    jacobian = jacobian_cache.get_jacobian(curve_data)
+
+    cashflows = bond_cashflows(bonds, jacobian.vector_curve.reference_date)
+    return jacobian.labels, jacobian.bucketed_dv01(*cashflows, len(bonds))
+
+
+def full_revaluation_dv01(curve_data: dict, bonds: list) -> np.ndarray:
+    """Reference implementation: reprice every bond off the +/-1bp bumped helper graph, one quote at a time"""
+    market_data = curve_data["MarketData"]
+    today = ql.Settings.instance().evaluationDate
+
+    live_curve = LiveCurve.LiveCurve(market_data)
+    engine = ql.DiscountingBondEngine(live_curve.handle)
+    for bond in bonds:
+        bond.setPricingEngine(engine)
+
+    dv01 = np.empty((len(bonds), len(market_data)))
+    for quote_index, row in enumerate(market_data):
+        pricer_quote = live_curve.pricer_quote(row['instrument_type'], row['ticker'])
+        value = pricer_quote.value()
+        bump = rate_bump(row, value, today)
+
+        pricer_quote.setValue(value + bump)
+        bumped_up = np.array([bond.NPV() for bond in bonds])
+        pricer_quote.setValue(value - bump)
+        bumped_down = np.array([bond.NPV() for bond in bonds])
+        pricer_quote.setValue(value)
+
+        dv01[:, quote_index] = (bumped_up - bumped_down) / 2.0
+
+    return dv01
+
+
+def validate_bucketed_dv01(curve_data: dict, bonds: list, tolerance: float = 1e-4):
+    """Cross-check the Jacobian against full revaluation, raises ValueError beyond tolerance (relative to the largest bucket)"""
+    labels, dv01 = bucketed_dv01(curve_data, bonds)
+    full_dv01 = full_revaluation_dv01(curve_data, bonds)
+
+    errors = np.abs(dv01 - full_dv01)
+    scale = max(np.abs(full_dv01).max(), BASIS_POINT)
+    if errors.max() > tolerance * scale:
+        bond_index, quote_index = np.unravel_index(errors.argmax(), errors.shape)
+        raise ValueError(
+            f"Bucketed DV01 mismatch for bond {bond_index} vs {labels[quote_index]}: "
+            f"{dv01[bond_index, quote_index]} vs full revaluation {full_dv01[bond_index, quote_index]}"
+        )
+
+    return labels, dv01
@@ -0,0 +1,177 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from Common.Utils import PortalSnapshot
+
+SESSION_DB = os.path.join(tempfile.gettempdir(), "dashql_sessions.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_accessed ON sessions (accessed);
+CREATE TABLE IF NOT EXISTS session_curves (
+    session_id TEXT NOT NULL,
+    curve_name TEXT NOT NULL,
+    market_data TEXT NOT NULL,
+    PRIMARY KEY (session_id, curve_name)
+);
+"""
+
+
+def session_ref(session_id: str, version: int) -> dict:
+    """What the browser holds in the user market data store instead of the curves themselves"""
+    return {"SessionId": session_id, "Version": version}
+
+
+class SessionStore(object):
+    """
+    Server-side store of the market data each session has edited.
+
+    Sessions live in SQLite so every gunicorn worker sees the same edits, and only
+    the curves a session edited are kept: the rest are the portal snapshot's. Sessions
+    idle for ttl seconds, or beyond the max_size most recently used, are evicted.
+    Decoded sessions are memoized per worker by (session, version).
+    """
+
+    def __init__(self, db_file: str = SESSION_DB, max_size: int = 256, ttl: float = 3600.0, cache_size: int = 64):
+        self.db_file = db_file
+        self.max_size = max_size
+        self.ttl = ttl
+        self.cache_size = cache_size
+
+        self._local = threading.local()
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        # One connection per thread, and per process: connections do not survive a fork
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.db_file, timeout=10.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+
+        return connection
+
+    def _evict(self, connection: sqlite3.Connection, now: float):
+        connection.execute("DELETE FROM sessions WHERE accessed < ?", (now - self.ttl,))
+        connection.execute(
+            "DELETE FROM sessions WHERE session_id NOT IN "
+            "(SELECT session_id FROM sessions ORDER BY accessed DESC LIMIT ?)", (self.max_size,)
+        )
+        connection.execute("DELETE FROM session_curves WHERE session_id NOT IN (SELECT session_id FROM sessions)")
+
+    def edited_curves(self, session_id: str, version: int) -> dict:
+        """{curve name: {"MarketData": ..., "Nodes": ...}} of the curves the session edited"""
+        with self._lock:
+            cached = self._cache.get(session_id)
+            if cached is not None and cached[0] == version:
+                self._cache.move_to_end(session_id)
+                return cached[1]
+
+        connection = self._connection()
+        now = time.time()
+
+        row = connection.execute("SELECT version, accessed FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None:
+            return {}
+
+        stored_version, accessed = row
+        if now - accessed > self.ttl / 10:
+            connection.execute("UPDATE sessions SET accessed = ? WHERE session_id = ?", (now, session_id))
+
+        edited = {curve_name: json.loads(market_data) for curve_name, market_data in connection.execute(
+            "SELECT curve_name, market_data FROM session_curves WHERE session_id = ?", (session_id,)
+        )}
+
+        with self._lock:
+            self._cache[session_id] = (stored_version, edited)
+            self._cache.move_to_end(session_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return edited
+
+    def put_curve(self, session_id: str, curve_name: str, market_data: list, nodes: dict = None) -> int:
+        """Store the session's edited curve, returns the session's new version"""
+        connection = self._connection()
+        now = time.time()
+
+        payload = json.dumps({"MarketData": market_data, "Nodes": nodes})
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO session_curves (session_id, curve_name, market_data) VALUES (?, ?, ?)",
+                (session_id, curve_name, payload)
+            )
+            connection.execute(
+                "INSERT INTO sessions (session_id, version, accessed) VALUES (?, 1, ?) "
+                "ON CONFLICT (session_id) DO UPDATE SET version = version + 1, accessed = excluded.accessed",
+                (session_id, now)
+            )
+            version = connection.execute("SELECT version FROM sessions WHERE session_id = ?", (session_id,)).fetchone()[0]
+            self._evict(connection, now)
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+
+        with self._lock:
+            self._cache.pop(session_id, None)
+
+        return version
+
+    def curves(self, user_market_data: dict) -> dict:
+        """Portal curves with the session's edits applied, user_market_data as held by the browser"""
+        portal_curves = PortalSnapshot.get_snapshot().curves
+        if not user_market_data or not user_market_data.get("SessionId"):
+            return portal_curves
+
+        edited = self.edited_curves(user_market_data["SessionId"], user_market_data["Version"])
+        if not edited:
+            return portal_curves
+
+        curves = dict(portal_curves)
+        for curve_name, curve_edit in edited.items():
+            if curve_name in curves:
+                curves[curve_name] = dict(curves[curve_name], **curve_edit)
+                if curve_edit.get("Nodes") is None:
+                    curves[curve_name].pop("Nodes", None)
+
+        return curves
+
+    def clear(self):
+        connection = self._connection()
+        connection.execute("DELETE FROM sessions")
+        connection.execute("DELETE FROM session_curves")
+
+        with self._lock:
+            self._cache.clear()
+
+
+session_store = SessionStore(
+    os.getenv("DASHQL_SESSION_DB", SESSION_DB),
+    max_size=int(os.getenv("DASHQL_SESSION_STORE_SIZE", "256")),
+    ttl=float(os.getenv("DASHQL_SESSION_TTL_SECONDS", "3600")),
+)
+
+
+def session_curves(user_market_data: dict) -> dict:
+    return session_store.curves(user_market_data)
+
+
+def put_curve(session_id: str, curve_name: str, market_data: list, nodes: dict = None) -> dict:
+    return session_ref(session_id, session_store.put_curve(session_id, curve_name, market_data, nodes))
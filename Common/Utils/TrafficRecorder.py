@@ -0,0 +1,82 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+import dash
+import flask
+
+UPDATE_COMPONENT_PATH = "/_dash-update-component"
+
+
+def client_session(request: flask.Request) -> str:
+    """Dash requests carry no session, a browser is told apart by its address and user agent"""
+    client = request.headers.get("X-Forwarded-For", request.remote_addr or "")
+    agent = request.headers.get("User-Agent", "")
+    return hashlib.sha256(f"{client}|{agent}".encode("utf-8")).hexdigest()[:16]
+
+
+class TrafficRecorder(object):
+    """
+    Appends every callback request, with its response status, size and latency, to a JSONL log.
+
+    Each line is written with a single append, so gunicorn workers can share the log.
+    The logged request bodies are what Benchmarks.ReplayLoadTest sends back to a server.
+    """
+
+    def __init__(self, log_file: str):
+        self.log_file = log_file
+        self._fd = None
+        self._lock = threading.Lock()
+
+    def _descriptor(self) -> int:
+        with self._lock:
+            if self._fd is None:
+                self._fd = os.open(self.log_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            return self._fd
+
+    def record(self, entry: dict):
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        os.write(self._descriptor(), line.encode("utf-8"))
+
+    def attach(self, server: flask.Flask):
+        server.before_request(self._before_request)
+        server.after_request(self._after_request)
+
+    @staticmethod
+    def _before_request():
+        if flask.request.path.endswith(UPDATE_COMPONENT_PATH):
+            flask.g.traffic_start = time.perf_counter()
+
+    def _after_request(self, response: flask.Response):
+        start = flask.g.pop("traffic_start", None)
+        if start is None:
+            return response
+
+        body = flask.request.get_json(silent=True) or {}
+        self.record({
+            "time": time.time(),
+            "session": client_session(flask.request),
+            "output": body.get("output"),
+            "status": response.status_code,
+            "response_bytes": response.calculate_content_length(),
+            "latency_ms": round((time.perf_counter() - start) * 1e3, 3),
+            # Callback inputs and state as sent, replayed verbatim
+            "request": body,
+        })
+
+        return response
+
+
+def mount(app: dash.Dash):
+    """Record the app's callback traffic to DASHQL_TRAFFIC_LOG, off unless it is set"""
+    log_file = os.getenv("DASHQL_TRAFFIC_LOG")
+    if not log_file:
+        return None
+
+    recorder = TrafficRecorder(log_file)
+    recorder.attach(app.server)
+    return recorder
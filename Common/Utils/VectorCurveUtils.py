@@ -0,0 +1,228 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+from datetime import date
+
+import numpy as np
+import QuantLib as ql
+
+from Common.Utils import ConvertUtils
+
+# QuantLib date serial numbers count days from 1899-12-30
+_SERIAL_EPOCH = np.datetime64("1899-12-30", "D")
+
+# Day counters whose year fractions are a plain day count ratio
+_DAY_COUNT_BASIS = {
+    "Actual/360": 360.0,
+    "Actual/365 (Fixed)": 365.0,
+}
+
+# Time used by QuantLib for zero rates at the reference date
+_ZERO_TIME = 0.0001
+
+
+# -----------------------
+# Conversions
+# -----------------------
+
+def to_serials(dates) -> np.ndarray:
+    """Convert QuantLib dates, python dates, ISO strings or serial numbers into an array of serial numbers"""
+    if isinstance(dates, np.ndarray) and np.issubdtype(dates.dtype, np.integer):
+        return dates.astype(np.int64)
+
+    dates = list(dates)
+    if not dates:
+        return np.empty(0, dtype=np.int64)
+
+    first = dates[0]
+    if isinstance(first, ql.Date):
+        return np.fromiter((d.serialNumber() for d in dates), dtype=np.int64, count=len(dates))
+    if isinstance(first, (str, date)):
+        return (np.array(dates, dtype="datetime64[D]") - _SERIAL_EPOCH).astype(np.int64)
+
+    return np.asarray(dates, dtype=np.int64)
+
+
+def to_ql_dates(serials) -> list:
+    return [ql.Date(int(serial)) for serial in serials]
+
+
+def to_day_counter(day_counter):
+    if isinstance(day_counter, str):
+        return ConvertUtils.day_counter_from_string(day_counter)
+    return day_counter
+
+
+def to_enum(value):
+    if isinstance(value, str):
+        return ConvertUtils.enum_from_string(value)
+    return value
+
+
+def year_fractions(day_counter, start_serials, end_serials) -> np.ndarray:
+    """Vectorized year fractions, falls back to QuantLib for calendar-dependent day counters"""
+    day_counter = to_day_counter(day_counter)
+    start_serials, end_serials = np.broadcast_arrays(np.asarray(start_serials), np.asarray(end_serials))
+
+    basis = _DAY_COUNT_BASIS.get(day_counter.name())
+    if basis is not None:
+        return (end_serials - start_serials) / basis
+
+    return np.fromiter(
+        (day_counter.yearFraction(ql.Date(int(start)), ql.Date(int(end)))
+         for start, end in zip(start_serials.ravel(), end_serials.ravel())),
+        dtype=float, count=start_serials.size,
+    ).reshape(start_serials.shape)
+
+
+# -----------------------
+# Interest rate conventions
+# -----------------------
+
+def implied_rates(compound, times, compounding, frequency) -> np.ndarray:
+    """Vectorized QuantLib InterestRate::impliedRate"""
+    compound = np.asarray(compound, dtype=float)
+    times = np.asarray(times, dtype=float)
+    compounding = to_enum(compounding)
+    frequency = float(to_enum(frequency))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        simple = (compound - 1.0) / times
+        continuous = np.log(compound) / times
+        compounded = (np.power(compound, 1.0 / (frequency * times)) - 1.0) * frequency if frequency > 0 else continuous
+
+    if compounding == ql.Simple:
+        return simple
+    if compounding == ql.Continuous:
+        return continuous
+    if compounding == ql.Compounded:
+        return compounded
+    if compounding == ql.SimpleThenCompounded:
+        return np.where(times <= 1.0 / frequency, simple, compounded)
+    if compounding == ql.CompoundedThenSimple:
+        return np.where(times <= 1.0 / frequency, compounded, simple)
+
+    raise ValueError(f"Unknown compounding: {compounding}")
+
+
+def discount_factors_from_rates(rates, times, compounding, frequency) -> np.ndarray:
+    """Vectorized QuantLib InterestRate::discountFactor"""
+    rates = np.asarray(rates, dtype=float)
+    times = np.asarray(times, dtype=float)
+    compounding = to_enum(compounding)
+    frequency = float(to_enum(frequency))
+
+    simple = 1.0 / (1.0 + rates * times)
+    continuous = np.exp(-rates * times)
+    compounded = np.power(1.0 + rates / frequency, -frequency * times) if frequency > 0 else continuous
+
+    if compounding == ql.Simple:
+        return simple
+    if compounding == ql.Continuous:
+        return continuous
+    if compounding == ql.Compounded:
+        return compounded
+    if compounding == ql.SimpleThenCompounded:
+        return np.where(times <= 1.0 / frequency, simple, compounded)
+    if compounding == ql.CompoundedThenSimple:
+        return np.where(times <= 1.0 / frequency, compounded, simple)
+
+    raise ValueError(f"Unknown compounding: {compounding}")
+
+
+# -----------------------
+# Curve
+# -----------------------
+
+class VectorCurve(object):
+    """
+    NumPy evaluator of a bootstrapped discount curve.
+
+    Works off the node dates and discount factors (log-linear interpolation, same as
+    PiecewiseLogLinearDiscount), so discount factors, zero and forward rates for thousands
+    of dates come out of a single NumPy pass instead of one SWIG call per date.
+    """
+
+    def __init__(self, node_serials, discounts, day_counter=None):
+        self.node_serials = to_serials(node_serials)
+        self.discounts = np.asarray(discounts, dtype=float)
+        self.day_counter = to_day_counter(day_counter or "Actual360")
+
+        self.reference_serial = int(self.node_serials[0])
+        self.node_times = year_fractions(self.day_counter, self.reference_serial, self.node_serials)
+        self.log_discounts = np.log(self.discounts)
+
+        # Log-linear extrapolation continues the first and last segments
+        self._first_slope = (self.log_discounts[1] - self.log_discounts[0]) / (self.node_times[1] - self.node_times[0])
+        self._last_slope = (self.log_discounts[-1] - self.log_discounts[-2]) / (self.node_times[-1] - self.node_times[-2])
+
+    @classmethod
+    def from_nodes(cls, nodes: dict):
+        return cls(nodes["Dates"], nodes["Discounts"], nodes["DayCounter"])
+
+    @classmethod
+    def from_curve(cls, curve):
+        dates = curve.dates()
+        return cls(dates, [curve.discount(node_date) for node_date in dates], curve.dayCounter())
+
+    @property
+    def reference_date(self) -> ql.Date:
+        return ql.Date(self.reference_serial)
+
+    def times(self, dates) -> np.ndarray:
+        return year_fractions(self.day_counter, self.reference_serial, to_serials(dates))
+
+    def discount_at_times(self, times) -> np.ndarray:
+        times = np.asarray(times, dtype=float)
+
+        log_discounts = np.interp(times, self.node_times, self.log_discounts)
+        log_discounts = np.where(
+            times > self.node_times[-1],
+            self.log_discounts[-1] + self._last_slope * (times - self.node_times[-1]),
+            log_discounts,
+        )
+        log_discounts = np.where(
+            times < self.node_times[0],
+            self.log_discounts[0] + self._first_slope * (times - self.node_times[0]),
+            log_discounts,
+        )
+
+        return np.exp(log_discounts)
+
+    def discount(self, dates) -> np.ndarray:
+        return self.discount_at_times(self.times(dates))
+
+    def zero_rates(self, dates, day_counter, compounding, frequency) -> np.ndarray:
+        """Vectorized YieldTermStructure::zeroRate(date, dayCounter, compounding, frequency)"""
+        serials = to_serials(dates)
+
+        discounts = self.discount(serials)
+        times = year_fractions(day_counter, self.reference_serial, serials)
+
+        # At the reference date QuantLib takes the rate over a very short period
+        at_reference = serials == self.reference_serial
+        if at_reference.any():
+            discounts = np.where(at_reference, self.discount_at_times(np.full(serials.shape, _ZERO_TIME)), discounts)
+            times = np.where(at_reference, _ZERO_TIME, times)
+
+        return implied_rates(1.0 / discounts, times, compounding, frequency)
+
+    def forward_rates(self, start_dates, end_dates, day_counter, compounding, frequency) -> np.ndarray:
+        """Vectorized YieldTermStructure::forwardRate(start, end, dayCounter, compounding, frequency)"""
+        start_serials = to_serials(start_dates)
+        end_serials = to_serials(end_dates)
+
+        compound = self.discount(start_serials) / self.discount(end_serials)
+        times = year_fractions(day_counter, start_serials, end_serials)
+
+        return implied_rates(compound, times, compounding, frequency)
+
+
+def tenor_dates(reference_date: ql.Date, calendar, tenors) -> np.ndarray:
+    """Serial numbers of the calendar-adjusted dates reached by advancing the reference date by each tenor"""
+    return to_serials([calendar.advance(reference_date, ql.Period(tenor)) for tenor in tenors])
+
+
+def daily_dates(reference_date: ql.Date, years: int = 50) -> np.ndarray:
+    """Serial numbers of every calendar day from the reference date out to the given number of years"""
+    end_date = reference_date + ql.Period(years, ql.Years)
+    return np.arange(reference_date.serialNumber(), end_date.serialNumber() + 1, dtype=np.int64)
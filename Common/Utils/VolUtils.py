@@ -2,6 +2,10 @@
 
 import QuantLib as ql
 
+from Common.Utils import Metrics
+
+
+@Metrics.timed("vol", "european_option")
 def price_european_option(
     spot,
     strike,
@@ -0,0 +1,261 @@
+# Copyright (c) Mike Kipnis - DashQL
+
+import traceback
+
+import dash
+import dash_ag_grid as dag
+from dash import Input, Output, State, html, dcc, ClientsideFunction
+
+from Common.Utils import BlotterUtils, ComponentUtils, CurveCache, CurveGraph, JobManager, PricingContext, PricingService
+
+
+class BlotterPanel(object):
+    """
+    Bond positions uploaded in bulk (CSV or JSON) and valued on any portal curve.
+
+    The valuation is a background job pricing chunks of positions across a process pool,
+    the totals and the grid follow each chunk as it completes. The grid uses the infinite
+    row model: the browser only ever holds the rows on screen, pulled from BlotterUtils.
+    """
+
+    def __init__(self, app: dash.Dash, prefix: str, user_market_data_id: str = ""):
+        self.app = app
+        self.prefix = f"{prefix}-blotter"
+        self.user_market_data_id = user_market_data_id
+
+        self.error_prefix_id = f"{self.prefix}-error"
+
+        self.upload_id = f"{self.prefix}-upload"
+        self.blotter_id = f"{self.prefix}-positions"
+        self.curve_id = f"{self.prefix}-curve"
+        self.curve_data_id = f"{self.prefix}-curve-data"
+        self.progress_id = f"{self.prefix}-progress"
+        self.partial_totals_id = f"{self.prefix}-partial-totals"
+        self.totals_id = f"{self.prefix}-totals"
+        self.summary_id = f"{self.prefix}-summary"
+        self.grid_id = f"{self.prefix}-grid"
+        self.grid_refresh_id = f"{self.prefix}-grid-refresh"
+
+        number_column = {"type": "rightAligned", "filter": False}
+
+        self.grid = dag.AgGrid(
+            id=self.grid_id,
+            rowModelType="infinite",
+            columnDefs=[
+                {"headerName": "Id", "field": "Id", "pinned": "left", "width": 110},
+                {"headerName": "Coupon", "field": "Coupon", **number_column},
+                {"headerName": "Maturity", "field": "Maturity"},
+                {"headerName": "Notional", "field": "Notional", **number_column},
+                {"headerName": "Price", "field": "Price", **number_column},
+                *[{"headerName": field, "field": field, **number_column} for field in BlotterUtils.RESULT_FIELDS],
+            ],
+            defaultColDef={"flex": 1, "minWidth": 80, "resizable": False, "sortable": True},
+            dashGridOptions={
+                "theme": "legacy",
+                # Blocks of rows fetched as they scroll into view
+                "cacheBlockSize": 100,
+                "maxBlocksInCache": 20,
+                "rowBuffer": 0,
+            },
+            style={"height": "450px", "width": "100%"},
+            className="ag-theme-balham-dark",
+        )
+
+        self._register_callbacks()
+
+    def layout(self):
+        curve_dropdown = dcc.Dropdown(
+            id=self.curve_id,
+            clearable=False,
+            searchable=False,
+            className="dark-dropdown",
+            style={"width": "100%"},
+        )
+
+        upload = dcc.Upload(
+            id=self.upload_id,
+            children=html.Div(["Drop or ", html.A("select"), " a CSV/JSON blotter"]),
+            accept=".csv,.json",
+            style={
+                "padding": "6px 12px",
+                "border": "1px dashed #2a2f42",
+                "borderRadius": "4px",
+                "textAlign": "center",
+                "cursor": "pointer",
+            },
+        )
+
+        return html.Div(
+            [
+                html.Div(
+                    [
+                        html.Div(ComponentUtils.panel_label("Bond Blotter"), style={"flex": "1 1 auto"}),
+                        html.Div(upload, style={"flex": "0 1 auto"}),
+                        html.Div(
+                            ComponentUtils.horizontal_labeled_dropdown("Disc. Curve", curve_dropdown),
+                            style={"flex": "0 1 auto"},
+                        ),
+                    ],
+                    style={
+                        "display": "flex",
+                        "alignItems": "center",
+                        "width": "100%",
+                        "gap": "12px",
+                    },
+                ),
+
+                html.Hr(className="divider"),
+
+                ComponentUtils.job_progress(self.progress_id),
+
+                html.Div(id=self.summary_id, style={"fontSize": "14px", "color": "#cccccc"}),
+
+                self.grid,
+
+                dcc.Store(id=self.blotter_id),
+                dcc.Store(id=self.curve_data_id),
+                dcc.Store(id=self.partial_totals_id),
+                dcc.Store(id=self.totals_id),
+                dcc.Store(id=self.grid_refresh_id),
+            ],
+            style={
+                "display": "flex",
+                "flexDirection": "column",
+                "gap": "6px",
+                "minHeight": 0,
+            },
+        )
+
+    def _register_callbacks(self):
+        @self.app.callback(
+            Output(self.curve_id, "options"),
+            Output(self.curve_id, "value"),
+            Input("portal-curves", "data"),
+        )
+        def on_curve_data_change(user_market_data):
+            if not user_market_data:
+                return [], None
+
+            options = [{"label": k, "value": k} for k in user_market_data.keys()]
+            return options, options[0]["value"]
+
+        @self.app.callback(
+            Output(self.curve_data_id, "data"),
+            Input(self.curve_id, "value"),
+            Input(self.user_market_data_id, "data"),
+            State(self.curve_data_id, "data"),
+        )
+        @PricingContext.pricing_job
+        def update_curve_data(curve_name, curves, current):
+            return CurveGraph.select_curve(curves, curve_name, current)
+
+        @self.app.callback(
+            Output(self.blotter_id, "data"),
+            Output(self.error_prefix_id, "data"),
+            Input(self.upload_id, "contents"),
+            State(self.upload_id, "filename"),
+            prevent_initial_call=True,
+        )
+        def on_upload(contents, filename):
+            if not contents:
+                return dash.no_update, dash.no_update
+
+            try:
+                positions = BlotterUtils.parse_upload(contents, filename)
+                blotter_id = BlotterUtils.put_positions(positions)
+            except Exception as e:
+                return dash.no_update, {
+                    "message": str(e),
+                    "traceback": traceback.format_exc(),
+                }
+
+            return {"BlotterId": blotter_id, "FileName": filename, "Positions": len(positions)}, None
+
+        @self.app.callback(
+            Output(self.totals_id, "data"),
+            Output(self.error_prefix_id, "data", allow_duplicate=True),
+            Input(self.blotter_id, "data"),
+            Input(self.curve_data_id, "data"),
+            # Totals so far follow every chunk, a new upload or curve stops the job valuing the previous one
+            **JobManager.background_job(self.progress_id, progress=[Output(self.partial_totals_id, "data")]),
+            prevent_initial_call=True,
+        )
+        @PricingContext.pricing_job
+        def value_blotter(set_progress, blotter, curve_data):
+            if not blotter or not curve_data:
+                return dash.no_update, dash.no_update
+
+            try:
+                positions = BlotterUtils.positions(blotter["BlotterId"])
+
+                # Bootstrapped before the pool forks, so every pricing process starts with the curve
+                CurveCache.get_nodes(curve_data)
+
+                chunk_size = BlotterUtils.BLOTTER_CHUNK
+                chunks = [positions[i:i + chunk_size] for i in range(0, len(positions), chunk_size)]
+
+                totals = {
+                    "BlotterId": blotter["BlotterId"],
+                    "ValuationId": BlotterUtils.valuation_id(blotter["BlotterId"], curve_data),
+                    "Curve": curve_data["Curve"]["Name"],
+                    "Chunks": len(chunks),
+                    "ChunkSize": chunk_size,
+                    "Positions": len(positions),
+                    "Valued": 0,
+                    "PV": 0.0,
+                    "DV01": 0.0,
+                }
+
+                for done, (chunk_index, results) in enumerate(PricingService.map_completed(
+                        BlotterUtils.value_positions, curve_data, chunks, BlotterUtils.BLOTTER_WORKERS), 1):
+                    BlotterUtils.put_results(totals["ValuationId"], chunk_index, results)
+                    totals = BlotterUtils.add_totals(totals, results)
+                    set_progress((done, len(chunks), totals))
+
+                return totals, None
+            except Exception as e:
+                return dash.no_update, {
+                    "message": str(e),
+                    "traceback": traceback.format_exc(),
+                }
+
+        # No pricing involved, formatted and refreshed in the browser (assets/clientside.js)
+        self.app.clientside_callback(
+            ClientsideFunction(namespace="dashql", function_name="blotter_summary"),
+            Output(self.summary_id, "children"),
+            Input(self.partial_totals_id, "data"),
+            Input(self.totals_id, "data"),
+            Input(self.blotter_id, "data"),
+        )
+
+        self.app.clientside_callback(
+            ClientsideFunction(namespace="dashql", function_name="refresh_infinite_grid"),
+            Output(self.grid_refresh_id, "data"),
+            Input(self.partial_totals_id, "data"),
+            Input(self.totals_id, "data"),
+            Input(self.blotter_id, "data"),
+            State(self.grid_id, "id"),
+        )
+
+        @self.app.callback(
+            Output(self.grid_id, "getRowsResponse"),
+            Input(self.grid_id, "getRowsRequest"),
+            State(self.blotter_id, "data"),
+            State(self.partial_totals_id, "data"),
+            State(self.totals_id, "data"),
+        )
+        def get_rows(request, blotter, partial_totals, totals):
+            if not request or not blotter:
+                return {"rowData": [], "rowCount": 0}
+
+            # Totals of a running valuation first, then those of the last finished one
+            valuation = next((candidate for candidate in (partial_totals, totals)
+                              if candidate and candidate["BlotterId"] == blotter["BlotterId"]), None)
+
+            try:
+                rows, count = BlotterUtils.blotter_rows(blotter["BlotterId"], valuation, request["startRow"],
+                                                        request["endRow"], request.get("sortModel"))
+            except KeyError:
+                return {"rowData": [], "rowCount": 0}
+
+            return {"rowData": rows, "rowCount": count}
@@ -3,12 +3,13 @@
 import traceback
 
 import dash
+import QuantLib as ql
 
 from dash import Input, Output, html, dcc, State, ctx
 
 from Common.Components import CurveChartPanel
 from Common.Components import CurveMarketDataPanel
-from Common.Utils import CurveUtils
+from Common.Utils import ComponentUtils, CurveGraph, CurveHistory, CurveUtils, PricingContext, PricingService
 
 
 class CurvePanel:
@@ -23,6 +24,8 @@ class CurvePanel:
         self.curve_market_data_panel = curve_market_data_panel
         self.curve_chart_panel = CurveChartPanel.CurveChartPanel(app, prefix=self.prefix)
         self.error_prefix_id = f"{self.prefix}-error"
+        self.curve_data_id = f"{self.prefix}-curve-chart-curve-data"
+        self.overlay_date_id = f"{self.prefix}-overlay-date"
 
         if self.prefix not in self._callbacks_registered:
             self._register_callbacks()
@@ -30,45 +33,59 @@ class CurvePanel:
 
     def layout(self):
         return html.Div([
-            self.curve_chart_panel.layout()
+            self.curve_chart_panel.layout(),
+            ComponentUtils.horizontal_labeled_date_picker("Overlay As Of", self.overlay_date_id),
+            dcc.Store(id=self.curve_data_id),
             ])
 
     def _register_callbacks(self):
         @self.app.callback(
-            Output(self.curve_chart_panel.curve_chart_data_id, "data"),
-            Output(self.error_prefix_id, "data"),
+            Output(self.curve_data_id, "data"),
             Input(self.curve_market_data_panel.index_dropdown_id, "value"),
             Input(self.curve_market_data_panel.user_market_data_id, "data"),
+            State(self.curve_data_id, "data"),
         )
-        def _select_curve(name, curves):
-
-            try:
-                discount_curve_data = curves[name]
-                market_data = discount_curve_data["MarketData"]
-                rate_helpers = CurveUtils.create_rate_helpers(market_data)
-                curve, discount_curve = CurveUtils.bootstrap(rate_helpers)
-                day_counter = discount_curve_data["Curve"]["DayCounter"]
-
-                curve_tenors = ["1M", "3M", "6M"]
+        @PricingContext.pricing_job
+        def _update_curve_data(name, curves, current):
+            return CurveGraph.select_curve(curves, name, current)
 
-                for curve_tenor in range(1, 31):  # 1 to 30 inclusive
-                    swap_curve_tenor = f"{curve_tenor}Y"
-                    curve_tenors.append(swap_curve_tenor)
+        @self.app.callback(
+            Output(self.curve_chart_panel.curve_chart_data_id, "data"),
+            Output(self.error_prefix_id, "data"),
+            Input(self.curve_data_id, "data"),
+        )
+        @PricingContext.pricing_job
+        def _select_curve(discount_curve_data):
 
-                if 'Index' in discount_curve_data['Curve']:
-                    index = discount_curve_data['Curve']['Index']
-                    index_obj, tenors, rates = CurveUtils.price_ois_curve(index,discount_curve, curve_tenors)
+            try:
+                name = discount_curve_data["Curve"]["Name"]
 
-                    return {'name': name,'tenors': tenors, 'rates': rates},  None
+                curve_tenors = list(CurveUtils.CURVE_TENORS)
 
-                else:
-                    default_bond_setup = discount_curve_data['Curve']['DefaultBondSetup']
-                    tenors, rates = CurveUtils.price_yield_curve(default_bond_setup,discount_curve, curve_tenors)
+                rates = PricingService.run(PricingService.price_curve, discount_curve_data, curve_tenors)
 
-                    return {'name': name, 'tenors': tenors, 'rates': rates}, None
+                return {'name': name, 'tenors': curve_tenors, 'rates': rates.tolist()}, None
 
             except Exception as e:
                 return dash.no_update, {
                     "message": str(e),
                     "traceback": traceback.format_exc(),
-                }
\ No newline at end of file
+                }
+
+        @self.app.callback(
+            Output(self.curve_chart_panel.curve_chart_overlay_data_id, "data"),
+            Input(self.overlay_date_id, "date"),
+            Input(self.curve_market_data_panel.index_dropdown_id, "value"),
+        )
+        def _select_overlay(overlay_date, name):
+
+            if not overlay_date or not name:
+                return None
+
+            # Served from the memory-mapped history store, no bootstrap
+            history = CurveHistory.rates_as_of(name, ql.DateParser.parseISO(overlay_date[:10]))
+            if history is None:
+                return None
+
+            as_of, tenors, rates = history
+            return {'name': f"As of {as_of.ISO()}", 'tenors': tenors, 'rates': rates}
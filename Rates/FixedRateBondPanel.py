@@ -3,15 +3,19 @@
 import traceback
 
 import dash
-from dash import Input, Output, html, dcc, State, ctx
+from dash import Input, Output, html, dcc, State, ctx, ClientsideFunction
 import QuantLib as ql
 
 from Common.Utils.Constants import PricingConstants, RoundingConstants
 from Common.Utils import (
     ComponentUtils,
-    CurveUtils,
+    CurveCache,
+    CurveGraph,
     ConvertUtils,
-    BondUtils
+    BondUtils,
+    InstrumentCache,
+    PricingContext,
+    RiskUtils
 )
 from Common.Components import (
     SchedulePanel,
@@ -63,6 +67,15 @@ class FixedRateBondPanel:
             ],
         )
 
+        self.key_rate_dv01_data_grid_panel = DataGridPanel.DataGridPanel(
+            app,
+            prefix=f"{self.bond_prefix}-key-rate-dv01-panel",
+            column_defs=[
+                {"headerName": "Quote", "field": "quote", "flex": 2},
+                {"headerName": "DV01", "field": "dv01"},
+            ],
+        )
+
         self.pricing_results_data_grid_panel = DataGridPanel.DataGridPanel(
             app,
             prefix=f"{self.bond_prefix}-pricing-results-panel",
@@ -181,11 +194,29 @@ class FixedRateBondPanel:
                             },
                         ),
 
-                        # ---- Cashflows (fill remaining space) ----
+                        # ---- Cashflows / Key Rate DV01 (fill remaining space) ----
                         html.Div(
                             ComponentUtils.panel_section(
                                 "",
-                                [self.cashflow_data_grid_panel.layout()],
+                                [
+                                    dcc.Tabs(
+                                        className="custom-tabs",
+                                        children=[
+                                            dcc.Tab(
+                                                label="Cashflows",
+                                                className="custom-tab",
+                                                selected_className="custom-tab--selected",
+                                                children=self.cashflow_data_grid_panel.layout(),
+                                            ),
+                                            dcc.Tab(
+                                                label="Key Rate DV01",
+                                                className="custom-tab",
+                                                selected_className="custom-tab--selected",
+                                                children=self.key_rate_dv01_data_grid_panel.layout(),
+                                            ),
+                                        ],
+                                    )
+                                ],
                             ),
                             style={
                                 "flex": "1 1 auto",
@@ -208,9 +239,7 @@ class FixedRateBondPanel:
     # =========================
     @staticmethod
     def _build_curve(curve_market_data):
-        market_data = curve_market_data["MarketData"]
-        helpers = CurveUtils.create_rate_helpers(market_data)
-        return CurveUtils.bootstrap(helpers)
+        return CurveCache.get_curve(curve_market_data)
 
     @staticmethod
     def _bond_yield(bond, price, day_counter, comp, freq):
@@ -245,6 +274,7 @@ class FixedRateBondPanel:
             Input(self.tenor_panel.tenor_id, "value"),
             State(self.coupon_id, "value"),
         )
+        @PricingContext.pricing_job
         def _update_coupon(curve_data, schedule_data, tenor, coupon):
             if not curve_data or not schedule_data:
                 return dash.no_update
@@ -293,6 +323,7 @@ class FixedRateBondPanel:
             Input(self.bond_prefix, "data"),
             Input(self.tenor_panel.tenor_id, "value"),
         )
+        @PricingContext.pricing_job
         def _reprice(curve_data, price, yield_in, schedule, bond_data, _):
             """
             Reprice the fixed rate bond, update price, yield, cashflows, and pricing results.
@@ -307,73 +338,101 @@ class FixedRateBondPanel:
                 return (dash.no_update,) * 5
 
             try:
-                # --- Build bond and curves ---
-                bond = BondUtils.get_fixed_rate_bond(schedule, bond_data)
+                # --- Curves, and the bond built once per schedule and terms ---
                 curve, discount = self._build_curve(curve_data)
+                with InstrumentCache.fixed_rate_bond(schedule, bond_data, curve_data) as bond:
+                    comp = schedule["Compounding"]
+                    freq = schedule["Frequency"]
+                    dc = bond_data["DayCounter"]
+
+                    trigger = ctx.triggered_id
+
+                    # --- Determine price and yield ---
+                    if trigger is None:
+                        # Initial load: set price to 100 and calculate yield
+                        price = PricingConstants.PAR
+                        yield_out = round(
+                            self._bond_yield(bond, price, dc, comp, freq) * PricingConstants.RATE_FACTOR, PricingConstants.ROUND_RATE
+                        )
+                    elif trigger == self.price_id:
+                        # User updated price: recalc yield
+                        price = price or PricingConstants.PAR
+                        yield_out = round(
+                            self._bond_yield(bond, price, dc, comp, freq) * PricingConstants.RATE_FACTOR, RoundingConstants.ROUND_RATE
+                        )
+                    elif trigger == self.yield_id:
+                        # User updated yield: recalc price
+                        clean_price = bond.cleanPrice(
+                            yield_in / PricingConstants.RATE_FACTOR,
+                            ConvertUtils.day_counter_from_string(dc),
+                            ConvertUtils.enum_from_string(comp),
+                            ConvertUtils.enum_from_string(freq),
+                        )
+                        price = ComponentUtils.round_to_rational_fraction(PricingConstants.PRICE_TICK_SIZE, clean_price)
+                        yield_out = dash.no_update
+                    else:
+                        # Any other trigger (schedule change, bond setup, tenor): keep price, recalc yield
+                        price = price or PricingConstants.PAR
+                        yield_out = round(
+                            self._bond_yield(bond, price, dc, comp, freq) * PricingConstants.RATE_FACTOR, RoundingConstants.ROUND_RATE
+                        )
+
+                    # --- Compute pricing results and cashflows ---
+                    pricing = BondUtils.get_pricing_results(
+                        curve, discount, bond, price, dc, comp, freq, attach_engine=False
+                    )
+                    cashflows = BondUtils.get_cashflows(bond)
 
-                comp = schedule["Compounding"]
-                freq = schedule["Frequency"]
-                dc = bond_data["DayCounter"]
+                    return price, yield_out, cashflows, pricing, None
 
-                trigger = ctx.triggered_id
+            except Exception as e:
+                return (dash.no_update,) * 4, {
+                    "message": str(e),
+                    "traceback": traceback.format_exc(),
+                }
 
-                # --- Determine price and yield ---
-                if trigger is None:
-                    # Initial load: set price to 100 and calculate yield
-                    price = PricingConstants.PAR
-                    yield_out = round(
-                        self._bond_yield(bond, price, dc, comp, freq) * PricingConstants.RATE_FACTOR, PricingConstants.ROUND_RATE
-                    )
-                elif trigger == self.price_id:
-                    # User updated price: recalc yield
-                    price = price or PricingConstants.PAR
-                    yield_out = round(
-                        self._bond_yield(bond, price, dc, comp, freq) * PricingConstants.RATE_FACTOR, RoundingConstants.ROUND_RATE
-                    )
-                elif trigger == self.yield_id:
-                    # User updated yield: recalc price
-                    clean_price = bond.cleanPrice(
-                        yield_in / PricingConstants.RATE_FACTOR,
-                        ConvertUtils.day_counter_from_string(dc),
-                        ConvertUtils.enum_from_string(comp),
-                        ConvertUtils.enum_from_string(freq),
-                    )
-                    price = ComponentUtils.round_to_rational_fraction(PricingConstants.PRICE_TICK_SIZE, clean_price)
-                    yield_out = dash.no_update
-                else:
-                    # Any other trigger (schedule change, bond setup, tenor): keep price, recalc yield
-                    price = price or PricingConstants.PAR
-                    yield_out = round(
-                        self._bond_yield(bond, price, dc, comp, freq) * PricingConstants.RATE_FACTOR, RoundingConstants.ROUND_RATE
-                    )
+        @self.app.callback(
+            Output(self.key_rate_dv01_data_grid_panel.row_data_id, "data"),
+            Output(self.error_prefix_id, "data", allow_duplicate=True),
+            Input(self.discount_curve_data_id, "data"),
+            Input(self.schedule_panel.output_id, "data"),
+            Input(self.bond_prefix, "data"),
+            prevent_initial_call=True,
+        )
+        @PricingContext.pricing_job
+        def _key_rate_dv01(curve_data, schedule, bond_data):
+            """Bond DV01 bucketed against each market quote of the discount curve"""
+            if not curve_data or not schedule or not bond_data:
+                return dash.no_update, dash.no_update
 
-                # --- Compute pricing results and cashflows ---
-                pricing = BondUtils.get_pricing_results(
-                    curve, discount, bond, price, dc, comp, freq
-                )
-                cashflows = BondUtils.get_cashflows(bond)
+            try:
+                bond = BondUtils.get_fixed_rate_bond(schedule, bond_data)
+                labels, dv01 = RiskUtils.bucketed_dv01(curve_data, [bond])
 
-                return price, yield_out, cashflows, pricing, None
+                rows = [{"quote": label, "dv01": round(float(value), RoundingConstants.ROUND_MONEY)}
+                        for label, value in zip(labels, dv01[0])]
+                rows.append({"quote": "Total", "dv01": round(float(dv01[0].sum()), RoundingConstants.ROUND_MONEY)})
 
+                return rows, dash.no_update
             except Exception as e:
-                return (dash.no_update,) * 4, {
+                return dash.no_update, {
                     "message": str(e),
                     "traceback": traceback.format_exc(),
                 }
 
-        @self.app.callback(
+        # No pricing involved, formatted in the browser (assets/clientside.js)
+        self.app.clientside_callback(
+            ClientsideFunction(namespace="dashql", function_name="pricing_results_rows"),
             Output(self.pricing_results_data_grid_panel.row_data_id, "data"),
             Input(self.pricing_results_id, "data"),
         )
-        def _format_pricing_results(results):
-            if not results:
-                return []
-            return [{"key": k, "result": v} for k, v in results.items()]
 
         @self.app.callback(
             Output(self.discount_curve_data_id, "data"),
             Input(self.discount_curve_id, "value"),
             Input(self.user_market_data_id, "data"),
+            State(self.discount_curve_data_id, "data"),
         )
-        def _select_curve(name, curves):
-            return curves.get(name) if name and curves else dash.no_update
+        @PricingContext.pricing_job
+        def _select_curve(name, curves, current):
+            return CurveGraph.select_curve(curves, name, current)
@@ -4,12 +4,12 @@ import traceback
 
 import dash
 import dash_ag_grid as dag
-from dash import Input, Output, html, dcc, State, ctx
+from dash import Input, Output, html, dcc, State, ctx, ClientsideFunction
 import dash_bootstrap_components as dbc
 import QuantLib as ql
 
 from Common.Components import DataGridPanel, SchedulePanel, TenorPanel
-from Common.Utils import ComponentUtils, CurveUtils, ConvertUtils, BondUtils
+from Common.Utils import ComponentUtils, CurveCache, CurveGraph, ConvertUtils, BondUtils, PricingContext
 from Common.Utils.Constants import PricingConstants, RoundingConstants
 
 
@@ -205,6 +205,7 @@ class FloatingRateBondPanel:
             Input(self.schedule_panel.output_id, "data"),
             Input(self.tenor_panel.tenor_id, "value"),
         )
+        @PricingContext.pricing_job
         def on_term_structure_market_data(curve_data, schedule_data, _):
             if curve_data is None or schedule_data is None:
                 return dash.no_update
@@ -242,6 +243,7 @@ class FloatingRateBondPanel:
             Input(self.bond_prefix, "data"),
             Input(self.tenor_panel.tenor_id, "value"),
         )
+        @PricingContext.pricing_job
         def on_reprice(forecast_curve_data, discount_curve_data, index_fixings, price, yield_in, spread, schedule, bond_data, _):
             if not (forecast_curve_data and discount_curve_data and schedule and bond_data):
                 return (dash.no_update,) * 5
@@ -258,7 +260,7 @@ class FloatingRateBondPanel:
                 bond = BondUtils.get_floating_rate_bond(forecast_curve_data, index_fixings, schedule, overnight_leg, floating_rate_bond)
                 day_counter = forecast_curve_data["Curve"]["DayCounter"]
 
-                curve, discount = CurveUtils.bootstrap(CurveUtils.create_rate_helpers(discount_curve_data["MarketData"]))
+                curve, discount = CurveCache.get_curve(discount_curve_data)
 
                 if trigger in [self.schedule_panel.output_id, self.tenor_panel.tenor_id,
                            "index-fixings",self.forecast_curve_data_id,
@@ -308,32 +310,30 @@ class FloatingRateBondPanel:
                 }
 
         # --- Pricing results grid ---
-        @self.app.callback(
+        # No pricing involved, formatted in the browser (assets/clientside.js)
+        self.app.clientside_callback(
+            ClientsideFunction(namespace="dashql", function_name="pricing_results_rows"),
             Output(self.pricing_results_data_grid_panel.row_data_id, "data"),
             Input(self.pricing_results_id, "data"),
         )
-        def on_pricing_results(results):
-            if not results:
-                return []
-            return [{"key": k, "result": v} for k, v in results.items()]
 
         # --- Curve data stores ---
         @self.app.callback(
             Output(self.discount_curve_data_id, "data"),
             Input(self.discount_curve_id, "value"),
             Input(self.user_market_data, "data"),
+            State(self.discount_curve_data_id, "data"),
         )
-        def update_discount_curve(value, curves):
-            if value and curves:
-                return curves[value]
-            return dash.no_update
+        @PricingContext.pricing_job
+        def update_discount_curve(value, curves, current):
+            return CurveGraph.select_curve(curves, value, current)
 
         @self.app.callback(
             Output(self.forecast_curve_data_id, "data"),
             Input(self.forecast_curve_id, "value"),
             Input(self.user_market_data, "data"),
+            State(self.forecast_curve_data_id, "data"),
         )
-        def update_forecast_curve(value, curves):
-            if value and curves:
-                return curves[value]
-            return dash.no_update
+        @PricingContext.pricing_job
+        def update_forecast_curve(value, curves, current):
+            return CurveGraph.select_curve(curves, value, current)
@@ -3,12 +3,16 @@
 import traceback
 
 import dash
+import numpy as np
 import dash_ag_grid as dag
-from dash import Input, Output, html, dcc
+from dash import Input, Output, State, html, dcc
 import plotly.graph_objs as go
 
 
-from Common.Utils import ComponentUtils, CurveUtils
+from Common.Utils import ComponentUtils, CurveGraph, CurveUtils, JobManager, PricingContext, PricingService
+
+# Swap tenors priced per progress step of the surface job
+SWAP_TENOR_CHUNK = 4
 
 
 class OISMidCurvePanel(object):
@@ -19,6 +23,7 @@ class OISMidCurvePanel(object):
         self.user_market_data_id = user_market_data_id
         self.forecast_curve_id = f"{self.prefix}-forecast-curve"
         self.forecast_curve_data_id = f"{self.prefix}-forecast-curve-data"
+        self.progress_id = f"{self.prefix}-progress"
 
         self.error_prefix_id = f"{self.prefix}-error"
 
@@ -54,7 +59,8 @@ class OISMidCurvePanel(object):
                     ]
                 }
             ],
-            rowData=[],
+            rowData=[{"Tenor": swap_tenor} for swap_tenor in self.swap_tenors],
+            getRowId="params.data.Tenor",
             dashGridOptions={
                 "theme": "legacy"
             },
@@ -63,10 +69,92 @@ class OISMidCurvePanel(object):
             className="ag-theme-balham-dark",
         )
 
-        self.mid_curve_surface = dcc.Graph(id="mid_curve_surface")
+        self.mid_curve_surface = dcc.Graph(id="mid_curve_surface", figure=self._surface_figure())
 
         self._register_callbacks()
 
+    def _surface_title(self, curve_name):
+        return f"Forward Rate Surface ({curve_name})" if curve_name else "Forward Rate Surface"
+
+    def _surface_figure(self, curve_name=None, surface=None):
+        # Rendered once with the layout, callbacks only patch the z values and the title
+        return go.Figure(
+            data=[
+                go.Surface(
+                    x=self.forward_start_tenors,
+                    y=self.swap_tenors,
+                    z=surface,
+                    hovertemplate="Forward Start:%{x}<br>Tenor:%{y}<br>Fair Rate: %{z:.2f}<extra></extra>",
+                    type="surface",
+                    colorscale="Viridis",
+                    #opacity=0.90,
+                    contours=dict(
+                        z=dict(
+                            show=True,
+                            usecolormap=True,
+                            highlightcolor="#42f462",
+                            project=dict(z=True)
+                        )
+                    ),
+                    showscale=True,
+                    colorbar=dict(
+                        title=dict(
+                            text="Fair Rate",
+                            font=dict(color="#f5f5f5")
+                        ),
+                        tickcolor="#f5f5f5",
+                        tickfont=dict(color="#f5f5f5"),
+                        bgcolor="rgba(0,0,0,0)",
+                        outlinecolor="rgba(255,255,255,0.1)",
+                    ),
+                )
+            ],
+            layout=go.Layout(
+                title=dict(
+                    text=self._surface_title(curve_name),
+                    x=0.01,
+                    xanchor="left",
+                    yanchor="top",
+                    font=dict(color="#f5f5f5", size=18),
+                    pad=dict(t=25, b=10)
+                ),
+                scene=dict(
+                    xaxis=dict(
+                        title="Forward Start",
+                        color="white",  # axis label color
+                        tickfont=dict(color="white"),  # tick labels color
+                        gridcolor="rgba(140,143,144,0.05)",
+                        gridwidth=1,
+                        showbackground=False,
+                    ),
+                    yaxis=dict(
+                        title="Swap Tenor",
+                        color="white",
+                        tickfont=dict(color="white"),
+                        gridcolor="rgba(140,143,144,0.05)",
+                        gridwidth=1,
+                        showbackground=False,
+                    ),
+                    zaxis=dict(
+                        title="Fair Rate",
+                        color="white",
+                        tickfont=dict(color="white"),
+                        gridcolor="rgba(140,143,144,0.05)",
+                        gridwidth=1,
+                        showbackground=False,
+                    ),
+                    bgcolor="rgba(0,0,0,0)"
+                ),
+                plot_bgcolor="#171b26",
+                paper_bgcolor="#171b26",
+                font=dict(color="#f5f5f5"),
+                margin=dict(l=0, r=0, b=50, t=20),
+                # Keep the camera when the surface is patched
+                uirevision="mid-curve-surface",
+            )
+
+        )
+
     def layout(self):
         forecast_dropdown = dcc.Dropdown(
             id=self.forecast_curve_id,
@@ -113,6 +201,8 @@ class OISMidCurvePanel(object):
 
                         html.Hr(className="divider"),
 
+                        ComponentUtils.job_progress(self.progress_id),
+
                         # ---- Row 2: Grid + Graph ----
                         html.Div(
                             [
@@ -167,108 +257,57 @@ class OISMidCurvePanel(object):
 
 
         @self.app.callback(
-            Output("mid-curve-grid", "rowData"),
-            Output("mid_curve_surface", "figure"),
-            Output(self.error_prefix_id, "data"),
+            Output(self.forecast_curve_data_id, "data"),
             Input(self.forecast_curve_id, "value"),
             Input(self.user_market_data_id, "data"),
+            State(self.forecast_curve_data_id, "data"),
+        )
+        @PricingContext.pricing_job
+        def update_forecast_curve_data(curve_name, curves, current):
+            return CurveGraph.select_curve(curves, curve_name, current)
+
+        @self.app.callback(
+            Output("mid-curve-grid", "rowTransaction"),
+            Output("mid_curve_surface", "figure"),
+            Output(self.error_prefix_id, "data"),
+            Input(self.forecast_curve_data_id, "data"),
+            # Priced in a background job: an edit stops the job still pricing the previous curve
+            **JobManager.background_job(self.progress_id, cancel=[Input(self.user_market_data_id, "data")]),
         )
-        def update_forecast_curve(curve_name, curves):
+        @PricingContext.pricing_job
+        def update_forecast_curve(set_progress, discount_curve_data):
+
+            if discount_curve_data:
 
-            if curve_name and curves:
+                curve_name = discount_curve_data["Curve"]["Name"]
 
                 try:
-                    discount_curve_data = curves[curve_name]
-                    market_data = discount_curve_data["MarketData"]
-                    rate_helpers = CurveUtils.create_rate_helpers(market_data)
-                    curve, discount_curve = CurveUtils.bootstrap(rate_helpers)
+                    chunks = [self.swap_tenors[i:i + SWAP_TENOR_CHUNK]
+                              for i in range(0, len(self.swap_tenors), SWAP_TENOR_CHUNK)]
 
-                    swap_index = curves[curve_name]['Curve']['Index']
+                    # The first chunk also bootstraps the curve, unless it is cached
+                    rates = []
+                    for done, chunk in enumerate(chunks, 1):
+                        rates.append(PricingService.run(PricingService.price_mid_curve, discount_curve_data,
+                                                        chunk, self.forward_start_tenors))
+                        set_progress((done, len(chunks)))
 
-                    ois_midcurves, ois_midcurves_results, ois_midcurve_surface_results = (
-                        CurveUtils.price_mid_curve(swap_index, discount_curve, self.swap_tenors, self.forward_start_tenors))
+                    rates = np.vstack(rates)
+
+                    ois_midcurves_results, ois_midcurve_surface_results = (
+                        CurveUtils.mid_curve_results(self.swap_tenors, self.forward_start_tenors, rates))
                 except Exception as e:
-                    return (dash.no_update,) * 2, {
+                    return dash.no_update, dash.no_update, {
                         "message": str(e),
                         "traceback": traceback.format_exc(),
                     }
 
-                fig = go.Figure(
-                    data=[
-                        go.Surface(
-                            x=self.forward_start_tenors,
-                            y=self.swap_tenors,
-                            z=ois_midcurve_surface_results,
-                            hovertemplate="Forward Start:%{x}<br>Tenor:%{y}<br>Fair Rate: %{z:.2f}<extra></extra>",
-                            type="surface",
-                            colorscale="Viridis",
-                            #opacity=0.90,
-                            contours=dict(
-                                z=dict(
-                                    show=True,
-                                    usecolormap=True,
-                                    highlightcolor="#42f462",
-                                    project=dict(z=True)
-                                )
-                            ),
-                            showscale=True,
-                            colorbar=dict(
-                                title=dict(
-                                    text="Fair Rate",
-                                    font=dict(color="#f5f5f5")
-                                ),
-                                tickcolor="#f5f5f5",
-                                tickfont=dict(color="#f5f5f5"),
-                                bgcolor="rgba(0,0,0,0)",
-                                outlinecolor="rgba(255,255,255,0.1)",
-                            ),
-                        )
-                    ],
-                    layout=go.Layout(
-                        title=dict(
-                            text=f"Forward Rate Surface ({curve_name})",
-                            x=0.01,
-                            xanchor="left",
-                            yanchor="top",
-                            font=dict(color="#f5f5f5", size=18),
-                            pad=dict(t=25, b=10)
-                        ),
-                        scene=dict(
-                            xaxis=dict(
-                                title="Forward Start",
-                                color="white",  # axis label color
-                                tickfont=dict(color="white"),  # tick labels color
-                                gridcolor="rgba(140,143,144,0.05)",
-                                gridwidth=1,
-                                showbackground=False,
-                            ),
-                            yaxis=dict(
-                                title="Swap Tenor",
-                                color="white",
-                                tickfont=dict(color="white"),
-                                gridcolor="rgba(140,143,144,0.05)",
-                                gridwidth=1,
-                                showbackground=False,
-                            ),
-                            zaxis=dict(
-                                title="Fair Rate",
-                                color="white",
-                                tickfont=dict(color="white"),
-                                gridcolor="rgba(140,143,144,0.05)",
-                                gridwidth=1,
-                                showbackground=False,
-                            ),
-                            bgcolor="rgba(0,0,0,0)"
-                        ),
-                        plot_bgcolor="#171b26",
-                        paper_bgcolor="#171b26",
-                        font=dict(color="#f5f5f5"),
-                        margin=dict(l=0, r=0, b=50, t=20),
-                    )
-
-                )
-
+                # Only the z values and the title change, the rest of the figure stays on the client
+                fig = dash.Patch()
+                fig["data"][0]["z"] = ois_midcurve_surface_results
+                fig["layout"]["title"]["text"] = self._surface_title(curve_name)
 
-                return ois_midcurves_results, fig, None
+                # Rows keyed by tenor: updated in place rather than re-rendering the grid
+                return {"update": ois_midcurves_results}, fig, None
 
             return (dash.no_update,) *3
@@ -2,11 +2,10 @@
 
 import traceback
 
-import QuantLib as ql
 import dash
-from dash import Input, Output, html, dcc
+from dash import Input, Output, State, html, dcc
 
-from Common.Utils import ComponentUtils, CurveUtils, ConvertUtils, BondUtils
+from Common.Utils import ComponentUtils, CurveCache, CurveGraph, ConvertUtils, BondBatchUtils, PricingContext, VectorCurveUtils
 from Common.Components import SchedulePanel, TenorPanel, DataGridPanel
 
 
@@ -225,30 +224,21 @@ class ZeroCouponBondPanel:
             Input(self.bond_prefix, "data"),
             Input(self.tenor_panel.tenor_id, "value"),
         )
+        @PricingContext.pricing_job
         def reprice_zero_coupon(discount_curve_data, schedule_data, bond_data, _):
             if discount_curve_data is None or schedule_data is None or bond_data is None:
                 return [], None
 
             try:
-                market_data = discount_curve_data["MarketData"]
-                rate_helpers = CurveUtils.create_rate_helpers(market_data)
-                curve, discount_curve = CurveUtils.bootstrap(rate_helpers)
                 day_counter = discount_curve_data["Curve"]["DayCounter"]
 
-                zeros = BondUtils.get_zeros(schedule_data, bond_data)
-                data_out = []
-                for bond in zeros:
-                    engine = ql.DiscountingBondEngine(discount_curve)
-                    bond.setPricingEngine(engine)
-                    if bond.isExpired() or bond.settlementDate() > bond.maturityDate():
-                        continue
-                    pricing_results = BondUtils.get_pricing_results(
-                        curve, discount_curve, bond, bond.cleanPrice(),
-                        day_counter, schedule_data["Compounding"], schedule_data["Frequency"]
-                    )
-                    data_out.append(pricing_results)
-
-                return data_out, None
+                # Every zero in closed form off one pass over the curve, no engine or solver per maturity
+                zero_ladder = BondBatchUtils.ZeroLadder.from_schedule(
+                    schedule_data, bond_data, day_counter, schedule_data["Compounding"], schedule_data["Frequency"]
+                )
+                vector_curve = VectorCurveUtils.VectorCurve.from_nodes(CurveCache.get_nodes(discount_curve_data))
+
+                return zero_ladder.pricing_rows(vector_curve), None
             except Exception as e:
                 return dash.no_update, {
                     "message": str(e),
@@ -259,8 +249,8 @@ class ZeroCouponBondPanel:
             Output(self.discount_curve_data_id, "data"),
             Input(self.discount_curve_id, "value"),
             Input(self.user_market_data, "data"),
+            State(self.discount_curve_data_id, "data"),
         )
-        def update_discount_curve_data(selected_curve, market_data):
-            if selected_curve and market_data:
-                return market_data[selected_curve]
-            return dash.no_update
+        @PricingContext.pricing_job
+        def update_discount_curve_data(selected_curve, market_data, current):
+            return CurveGraph.select_curve(market_data, selected_curve, current)
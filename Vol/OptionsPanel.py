@@ -6,6 +6,7 @@ import dash
 import dash_ag_grid as dag
 from dash import Input, Output, html, dcc
 
+from Common.Utils import PricingContext
 from Common.Utils.ConvertUtils import to_ql_date
 from Common.Utils.VolUtils import price_european_option
 
@@ -178,6 +179,7 @@ class OptionsPanel:
             Input("risk-free-rates", "data"),
             prevent_initial_call=True,
         )
+        @PricingContext.pricing_job
         def price_options(symbol, row_data, eval_date, risk_free_rates):
             try:
                 if not row_data:
@@ -8,7 +8,7 @@ from dash import Input, Output, html, dcc
 import plotly.graph_objs as go
 
 
-from Common.Utils import ComponentUtils, CurveUtils
+from Common.Utils import ComponentUtils, CurveUtils, JobManager
 
 
 class SurfacePanel(object):
@@ -19,17 +19,99 @@ class SurfacePanel(object):
         self.user_vol_market_data_id = user_vol_market_data_id
 
         self.error_prefix_id = f"{self.prefix}-error"
+        self.progress_id = f"{self.prefix}-progress"
 
 
-        self.calls_panel_graph = dcc.Graph(id="calls-panel-graph")
-        self.puts_panel_graph = dcc.Graph(id="puts-panel-graph")
+        self.calls_panel_graph = dcc.Graph(id="calls-panel-graph", figure=self._surface_figure("Calls"))
+        self.puts_panel_graph = dcc.Graph(id="puts-panel-graph", figure=self._surface_figure("Puts"))
 
         self._register_callbacks()
 
+    def _surface_figure(self, title, strikes=None, expiration_dates=None, vols=None):
+        # Rendered once with the layout, callbacks only patch the surface itself
+        return go.Figure(
+            data=[
+                go.Surface(
+                    x=strikes,
+                    y=expiration_dates,
+                    z=vols,
+                    hovertemplate="Strike:%{x}<br>Exp.Date:%{y}<br>Vol: %{z:.2f}<extra></extra>",
+                    type="surface",
+                    colorscale="Viridis",
+                    # opacity=0.90,
+                    contours=dict(
+                        z=dict(
+                            show=True,
+                            usecolormap=True,
+                            highlightcolor="#42f462",
+                            project=dict(z=True)
+                        )
+                    ),
+                    showscale=True,
+                    colorbar=dict(
+                        title=dict(
+                            text="Fair Rate",
+                            font=dict(color="#f5f5f5")
+                        ),
+                        tickcolor="#f5f5f5",
+                        tickfont=dict(color="#f5f5f5"),
+                        bgcolor="rgba(0,0,0,0)",
+                        outlinecolor="rgba(255,255,255,0.1)",
+                    ),
+                )
+            ],
+            layout=go.Layout(
+                title=dict(
+                    text=title,
+                    x=0.01,
+                    xanchor="left",
+                    yanchor="top",
+                    font=dict(color="#f5f5f5", size=18),
+                    pad=dict(t=25, b=10)
+                ),
+                scene=dict(
+                    xaxis=dict(
+                        title="Strike",
+                        color="white",  # axis label color
+                        tickfont=dict(color="white"),  # tick labels color
+                        gridcolor="rgba(140,143,144,0.05)",
+                        gridwidth=1,
+                        showbackground=False,
+                    ),
+                    yaxis=dict(
+                        title="Exp.Date",
+                        color="white",
+                        tickfont=dict(color="white"),
+                        gridcolor="rgba(140,143,144,0.05)",
+                        gridwidth=1,
+                        showbackground=False,
+                    ),
+                    zaxis=dict(
+                        title="Vol",
+                        color="white",
+                        tickfont=dict(color="white"),
+                        gridcolor="rgba(140,143,144,0.05)",
+                        gridwidth=1,
+                        showbackground=False,
+                    ),
+                    bgcolor="rgba(0,0,0,0)"
+                ),
+                plot_bgcolor="#171b26",
+                paper_bgcolor="#171b26",
+                font=dict(color="#f5f5f5"),
+                margin=dict(l=0, r=0, b=50, t=20),
+                # Keep the camera when the surface is patched
+                uirevision=title,
+            )
+
+        )
+
     def layout(self):
 
         return html.Div(
     [
+        ComponentUtils.job_progress(self.progress_id),
+
         # ---- Row 2: Two Graphs side by side ----
         html.Div(
             [
@@ -64,9 +146,9 @@ class SurfacePanel(object):
     ],
     style={
         "display": "flex",
-        "flexDirection": "row",
+        "flexDirection": "column",  # progress bar above the graphs
         "flexWrap": "nowrap",
-        "gap": "10px",
+        "gap": "4px",
         "alignItems": "stretch",
     },
 )
@@ -81,176 +163,31 @@ class SurfacePanel(object):
             Output(self.error_prefix_id, "data"),
             Input("expiration-dates", "data"),
             Input(self.user_vol_market_data_id, "data"),
+            # Built in a background job: a new underlying stops the job still building the previous one
+            **JobManager.background_job(self.progress_id, cancel=[Input("selected-underlying-symbol", "data")]),
         )
-        def update_forecast_curve(expiration_dates, vols):
+        def update_forecast_curve(set_progress, expiration_dates, vols):
 
             if not expiration_dates or not vols:
                 return dash.no_update, dash.no_update, dash.no_update
 
-            strikes = []
+            # Only the surface data is sent, the layout and the camera stay on the client
+            strikes = [vol['strike'] for vol in vols]
             calls = []
             puts = []
-            for expiration_date in expiration_dates:
-                call_column = expiration_date + '_call'
-                put_column = expiration_date + '_put'
-                strike_calls = []
-                strike_puts = []
-                for vol in vols:
-                    strikes.append(vol['strike'])
-                    strike_calls.append(vol[call_column])
-                    strike_puts.append(vol[put_column])
-                calls.append(strike_calls)
-                puts.append(strike_puts)
-
-            fig_calls = go.Figure(
-                data=[
-                    go.Surface(
-                        x=strikes,
-                        y=expiration_dates,
-                        z=calls,
-                        hovertemplate="Strike:%{x}<br>Exp.Date:%{y}<br>Vol: %{z:.2f}<extra></extra>",
-                        type="surface",
-                        colorscale="Viridis",
-                        # opacity=0.90,
-                        contours=dict(
-                            z=dict(
-                                show=True,
-                                usecolormap=True,
-                                highlightcolor="#42f462",
-                                project=dict(z=True)
-                            )
-                        ),
-                        showscale=True,
-                        colorbar=dict(
-                            title=dict(
-                                text="Fair Rate",
-                                font=dict(color="#f5f5f5")
-                            ),
-                            tickcolor="#f5f5f5",
-                            tickfont=dict(color="#f5f5f5"),
-                            bgcolor="rgba(0,0,0,0)",
-                            outlinecolor="rgba(255,255,255,0.1)",
-                        ),
-                    )
-                ],
-                layout=go.Layout(
-                    title=dict(
-                        text=f"Calls",
-                        x=0.01,
-                        xanchor="left",
-                        yanchor="top",
-                        font=dict(color="#f5f5f5", size=18),
-                        pad=dict(t=25, b=10)
-                    ),
-                    scene=dict(
-                        xaxis=dict(
-                            title="Strike",
-                            color="white",  # axis label color
-                            tickfont=dict(color="white"),  # tick labels color
-                            gridcolor="rgba(140,143,144,0.05)",
-                            gridwidth=1,
-                            showbackground=False,
-                        ),
-                        yaxis=dict(
-                            title="Exp.Date",
-                            color="white",
-                            tickfont=dict(color="white"),
-                            gridcolor="rgba(140,143,144,0.05)",
-                            gridwidth=1,
-                            showbackground=False,
-                        ),
-                        zaxis=dict(
-                            title="Vol",
-                            color="white",
-                            tickfont=dict(color="white"),
-                            gridcolor="rgba(140,143,144,0.05)",
-                            gridwidth=1,
-                            showbackground=False,
-                        ),
-                        bgcolor="rgba(0,0,0,0)"
-                    ),
-                    plot_bgcolor="#171b26",
-                    paper_bgcolor="#171b26",
-                    font=dict(color="#f5f5f5"),
-                    margin=dict(l=0, r=0, b=50, t=20),
-                )
-
-            )
-
-            fig_puts = go.Figure(
-                data=[
-                    go.Surface(
-                        x=strikes,
-                        y=expiration_dates,
-                        z=puts,
-                        hovertemplate="Strike:%{x}<br>Exp.Date:%{y}<br>Vol: %{z:.2f}<extra></extra>",
-                        type="surface",
-                        colorscale="Viridis",
-                        # opacity=0.90,
-                        contours=dict(
-                            z=dict(
-                                show=True,
-                                usecolormap=True,
-                                highlightcolor="#42f462",
-                                project=dict(z=True)
-                            )
-                        ),
-                        showscale=True,
-                        colorbar=dict(
-                            title=dict(
-                                text="Fair Rate",
-                                font=dict(color="#f5f5f5")
-                            ),
-                            tickcolor="#f5f5f5",
-                            tickfont=dict(color="#f5f5f5"),
-                            bgcolor="rgba(0,0,0,0)",
-                            outlinecolor="rgba(255,255,255,0.1)",
-                        ),
-                    )
-                ],
-                layout=go.Layout(
-                    title=dict(
-                        text=f"Puts",
-                        x=0.01,
-                        xanchor="left",
-                        yanchor="top",
-                        font=dict(color="#f5f5f5", size=18),
-                        pad=dict(t=25, b=10)
-                    ),
-                    scene=dict(
-                        xaxis=dict(
-                            title="Strike",
-                            color="white",  # axis label color
-                            tickfont=dict(color="white"),  # tick labels color
-                            gridcolor="rgba(140,143,144,0.05)",
-                            gridwidth=1,
-                            showbackground=False,
-                        ),
-                        yaxis=dict(
-                            title="Exp.Date",
-                            color="white",
-                            tickfont=dict(color="white"),
-                            gridcolor="rgba(140,143,144,0.05)",
-                            gridwidth=1,
-                            showbackground=False,
-                        ),
-                        zaxis=dict(
-                            title="Vol",
-                            color="white",
-                            tickfont=dict(color="white"),
-                            gridcolor="rgba(140,143,144,0.05)",
-                            gridwidth=1,
-                            showbackground=False,
-                        ),
-                        bgcolor="rgba(0,0,0,0)"
-                    ),
-                    plot_bgcolor="#171b26",
-                    paper_bgcolor="#171b26",
-                    font=dict(color="#f5f5f5"),
-                    margin=dict(l=0, r=0, b=50, t=20),
-                )
-
-            )
-
+            for done, expiration_date in enumerate(expiration_dates, 1):
+                calls.append([vol[expiration_date + '_call'] for vol in vols])
+                puts.append([vol[expiration_date + '_put'] for vol in vols])
+                set_progress((done, len(expiration_dates)))
+
+            fig_calls = dash.Patch()
+            fig_calls["data"][0]["x"] = strikes
+            fig_calls["data"][0]["y"] = expiration_dates
+            fig_calls["data"][0]["z"] = calls
+
+            fig_puts = dash.Patch()
+            fig_puts["data"][0]["x"] = strikes
+            fig_puts["data"][0]["y"] = expiration_dates
+            fig_puts["data"][0]["z"] = puts
 
             return fig_calls, fig_puts, dash.no_update
@@ -1,11 +1,10 @@
 # Copyright (c) Mike Kipnis - DashQL
 
-import copy
 import traceback
 
 import dash
 import dash_ag_grid as dag
-from dash import Input, Output, html, dcc, State
+from dash import Input, Output, html, dcc, State, ClientsideFunction
 import plotly.graph_objs as go
 
 from Common.Utils import ComponentUtils, CurveUtils
@@ -42,10 +41,88 @@ class VolPanel(object):
             },
         )
 
-        self.vol_panel_graph = dcc.Graph(id="vol-panel-graph")
+        self.vol_panel_graph = dcc.Graph(id="vol-panel-graph", figure=self._smile_figure())
 
         self._register_callbacks()
 
+    def _smile_figure(self):
+        # Rendered once with the layout, update_graph only patches the smiles and the expiration label
+        fig = go.Figure()
+
+        # Calls
+        fig.add_trace(go.Scatter(
+            x=[],
+            y=[],
+            mode='lines+markers',
+            name='Calls',
+            line=dict(color='rgba(75,192,192,1)', width=1.5, shape='spline'),
+            fill='tozeroy',
+            fillcolor='rgba(75,192,192,0.2)',
+            marker=dict(size=4)
+        ))
+
+        # Puts
+        fig.add_trace(go.Scatter(
+            x=[],
+            y=[],
+            mode='lines+markers',
+            name='Puts',
+            line=dict(color='rgba(255,99,132,1)', width=1.5, shape='spline'),
+            fill='tozeroy',
+            fillcolor='rgba(255,99,132,0.2)',
+            marker=dict(size=4)
+        ))
+
+        # Layout with labels horizontally aligned
+        fig.update_layout(
+            paper_bgcolor='#192231',
+            plot_bgcolor='#192231',
+            font=dict(color='#ffeed9'),
+
+            xaxis=dict(title='Strike', showgrid=True, gridcolor='#424242', color='#ffeed9'),
+            yaxis=dict(title='Volatility', showgrid=True, gridcolor='#424242', color='#ffeed9'),
+            margin=dict(l=50, r=50, t=50, b=50),
+
+            showlegend=False,  # hide default legend
+            uirevision="vol-panel-graph",
+
+            annotations=[
+                # Calls label (left)
+                dict(
+                    x=0.45,  # normalized x-position
+                    y=1.05,
+                    xref='paper',
+                    yref='paper',
+                    text='Calls',
+                    showarrow=False,
+                    font=dict(color='rgba(75,192,192,1)', size=14)
+                ),
+                # Puts label (right, next to Calls)
+                dict(
+                    x=0.55,
+                    y=1.05,
+                    xref='paper',
+                    yref='paper',
+                    text='Puts',
+                    showarrow=False,
+                    font=dict(color='rgba(255,99,132,1)', size=14)
+                ),
+                # Expiration date (right top)
+                dict(
+                    x=1.0,
+                    y=1.05,
+                    xref='paper',
+                    yref='paper',
+                    xanchor='right',
+                    text="",
+                    showarrow=False,
+                    font=dict(color='#FFA500', size=16)
+                )
+            ]
+        )
+
+        return fig
+
     def layout(self):
         return html.Div(
             [
@@ -203,30 +280,25 @@ class VolPanel(object):
             return expiration_dates, column_defs, row_data
 
         # ---------------------------------------------------------
-        # Update AG Grid context
+        # Update AG Grid context (clientside, assets/clientside.js)
         # ---------------------------------------------------------
-        @self.app.callback(
+        self.app.clientside_callback(
+            ClientsideFunction(namespace="dashql", function_name="selected_expiration_context"),
             Output(self.vol_panel_grid_id, "dashGridOptions"),
             Input("selected-expiration-date", "data"),
             prevent_initial_call=True,
         )
-        def update_grid_context(selected_exp):
-            return {
-                "context": {"selectedExpiration": selected_exp},
-                "suppressCellFocus": True,
-            }
 
         # ---------------------------------------------------------
-        # Force column refresh (style update)
+        # Force column refresh (style update, clientside)
         # ---------------------------------------------------------
-        @self.app.callback(
+        self.app.clientside_callback(
+            ClientsideFunction(namespace="dashql", function_name="refresh_column_defs"),
             Output(self.vol_panel_grid_id, "columnDefs", allow_duplicate=True),
             Input("selected-expiration-date", "data"),
             State(self.vol_panel_grid_id, "columnDefs"),
             prevent_initial_call=True,
         )
-        def refresh_column_defs(_, column_defs):
-            return copy.deepcopy(column_defs)
 
         # ---------------------------------------------------------
         # Store edited market data
@@ -292,78 +364,12 @@ class VolPanel(object):
                 call_vols[strike] = float(row.get(f"{expiration_date}_call"))
                 put_vols[strike] = float(row.get(f"{expiration_date}_put"))
 
-            fig = go.Figure()
-
-            # Calls
-            fig.add_trace(go.Scatter(
-                x=strikes,
-                y=list(call_vols.values()),
-                mode='lines+markers',
-                name='Calls',
-                line=dict(color='rgba(75,192,192,1)', width=1.5, shape='spline'),
-                fill='tozeroy',
-                fillcolor='rgba(75,192,192,0.2)',
-                marker=dict(size=4)
-            ))
-
-            # Puts
-            fig.add_trace(go.Scatter(
-                x=strikes,
-                y=list(put_vols.values()),
-                mode='lines+markers',
-                name='Puts',
-                line=dict(color='rgba(255,99,132,1)', width=1.5, shape='spline'),
-                fill='tozeroy',
-                fillcolor='rgba(255,99,132,0.2)',
-                marker=dict(size=4)
-            ))
-
-            # Layout with labels horizontally aligned
-            fig.update_layout(
-                paper_bgcolor='#192231',
-                plot_bgcolor='#192231',
-                font=dict(color='#ffeed9'),
-
-                xaxis=dict(title='Strike', showgrid=True, gridcolor='#424242', color='#ffeed9'),
-                yaxis=dict(title='Volatility', showgrid=True, gridcolor='#424242', color='#ffeed9'),
-                margin=dict(l=50, r=50, t=50, b=50),
-
-                showlegend=False,  # hide default legend
-
-                annotations=[
-                    # Calls label (left)
-                    dict(
-                        x=0.45,  # normalized x-position
-                        y=1.05,
-                        xref='paper',
-                        yref='paper',
-                        text='Calls',
-                        showarrow=False,
-                        font=dict(color='rgba(75,192,192,1)', size=14)
-                    ),
-                    # Puts label (right, next to Calls)
-                    dict(
-                        x=0.55,
-                        y=1.05,
-                        xref='paper',
-                        yref='paper',
-                        text='Puts',
-                        showarrow=False,
-                        font=dict(color='rgba(255,99,132,1)', size=14)
-                    ),
-                    # Expiration date (right top)
-                    dict(
-                        x=1.0,
-                        y=1.05,
-                        xref='paper',
-                        yref='paper',
-                        xanchor='right',
-                        text=expiration_date,
-                        showarrow=False,
-                        font=dict(color='#FFA500', size=16)
-                    )
-                ]
-            )
+            fig = dash.Patch()
+            fig["data"][0]["x"] = strikes
+            fig["data"][0]["y"] = list(call_vols.values())
+            fig["data"][1]["x"] = strikes
+            fig["data"][1]["y"] = list(put_vols.values())
+            fig["layout"]["annotations"][2]["text"] = expiration_date
 
             return {
                 "expiration_date": expiration_date,
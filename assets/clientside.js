@@ -0,0 +1,77 @@
+// Copyright (c) Mike Kipnis - DashQL
+//
+// Clientside callbacks: pure UI transformations that need no QuantLib, so they run in
+// the browser instead of costing a round trip and a server worker.
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    dashql: {
+
+        // Pricing results dict -> key/result rows of the pricing results grid
+        pricing_results_rows: function (results) {
+            if (!results) {
+                return [];
+            }
+            return Object.keys(results).map(function (key) {
+                return {key: key, result: results[key]};
+            });
+        },
+
+        // Highlight the selected expiration through the grid context
+        selected_expiration_context: function (selected_expiration) {
+            return {
+                context: {selectedExpiration: selected_expiration},
+                suppressCellFocus: true,
+                theme: "legacy",
+            };
+        },
+
+        // New column def objects so the grid re-evaluates cellClassRules against the context
+        refresh_column_defs: function (_, column_defs) {
+            if (!column_defs) {
+                return window.dash_clientside.no_update;
+            }
+            return column_defs.map(function refresh(column_def) {
+                var refreshed = Object.assign({}, column_def);
+                if (column_def.children) {
+                    refreshed.children = column_def.children.map(refresh);
+                }
+                return refreshed;
+            });
+        },
+
+        underlying_symbol_description: function (underlying_symbol) {
+            if (!underlying_symbol) {
+                return window.dash_clientside.no_update;
+            }
+            return underlying_symbol.name;
+        },
+
+        // One line of blotter totals: those of the running valuation, else of the last finished one
+        blotter_summary: function (partial_totals, totals, blotter) {
+            if (!blotter) {
+                return "Upload positions: Id, Coupon (%), Maturity, Notional, Price, optional IssueDate and conventions";
+            }
+
+            var current = [partial_totals, totals].find(function (candidate) {
+                return candidate && candidate.BlotterId === blotter.BlotterId;
+            });
+            if (!current) {
+                return blotter.FileName + ": " + blotter.Positions + " positions";
+            }
+
+            var money = function (value) {
+                return value.toLocaleString(undefined, {minimumFractionDigits: 2, maximumFractionDigits: 2});
+            };
+            return blotter.FileName + ": " + current.Valued + " of " + current.Positions + " valued on " +
+                current.Curve + " | PV " + money(current.PV) + " | DV01 " + money(current.DV01);
+        },
+
+        // Infinite row model grids pull their rows, tell the grid to pull them again
+        refresh_infinite_grid: function (partial_totals, totals, blotter, grid_id) {
+            dash_ag_grid.getApiAsync(grid_id).then(function (api) {
+                api.refreshInfiniteCache();
+            });
+            return window.dash_clientside.no_update;
+        },
+    },
+});
@@ -7,10 +7,11 @@ from datetime import datetime, date, timedelta
 import QuantLib as ql
 import dash
 import dash_bootstrap_components as dbc
-from dash import html, dcc, Input, Output
+from dash import html, dcc, Input, Output, ClientsideFunction
 import dash_ag_grid as dag
 
 from Common.Components import UnderlyingSymbolMarketDataPanel
+from Common.Utils import AsgiUtils, Metrics, PricingContext, TrafficRecorder
 from Vol import VolPanel, OptionsPanel
 from Vol import SurfacePanel
 
@@ -233,6 +234,7 @@ app = dash.Dash(
 )
 
 server = app.server  # Gunicorn expects this
+asgi = AsgiUtils.asgi_app(app)  # ASGI entry point, pricing callbacks on their own executor
 
 # Path to assets folder
 ASSETS_FOLDER = "assets"
@@ -266,16 +268,15 @@ app.layout = html.Div(
     Output("risk-free-rates", "data"),
     Input("startup", "n_intervals"),
 )
+@PricingContext.pricing_job
 def setup_options_monitor(_):
     debug_messages = []
     underlying_symbol_data = []
     risk_free_rates = []
 
     try:
-        calendar = ql.TARGET()
         today = ql.Date.todaysDate()
-        business_date = calendar.adjust(today, ql.ModifiedFollowing)
-        ql.Settings.instance().evaluationDate = business_date
+        business_date = PricingContext.current_business_date()
 
         debug_messages.append(f"Today: {today}, Business Date: {business_date}")
 
@@ -334,12 +335,18 @@ def set_global_error(*errors):
             return html.Span(err["message"], style={"color": "#f75464"}), {"display": "block"}
     return None, {}
 
-@app.callback(
+app.clientside_callback(
+    ClientsideFunction(namespace="dashql", function_name="underlying_symbol_description"),
     Output("underlying-symbol-description", "children"),
     Input("selected-underlying-symbol", "data"),
 )
-def set_description(underlying_symbol):
-    return underlying_symbol['name']
+
+
+# Time every server-side callback and serve /metrics, once all callbacks are registered
+Metrics.mount(app)
+
+# Callback traffic log for Benchmarks.ReplayLoadTest, only when DASHQL_TRAFFIC_LOG is set
+TrafficRecorder.mount(app)
 
 
 # =============================
@@ -1,6 +1,5 @@
 # Copyright (c) Mike Kipnis - DashQL
 
-import json
 import os
 from datetime import datetime
 
@@ -13,8 +12,10 @@ from dash_bootstrap_templates import load_figure_template
 from dash import html, dcc, Input, Output
 
 from Common.Components import CurveMarketDataPanel
-from Common.Utils import CurveUtils
-from Rates import FixedRateBondPanel, FloatingRateBondPanel, ZeroCouponBondPanel, CurvePanel, OISMidCurvePanel
+from Common.Utils import AsgiUtils, Metrics, PortalSnapshot, PricingService, TrafficRecorder
+from Rates import (
+    BlotterPanel, FixedRateBondPanel, FloatingRateBondPanel, ZeroCouponBondPanel, CurvePanel, OISMidCurvePanel
+)
 
 
 # =============================
@@ -50,6 +51,10 @@ class RatesAnalytics:
             self.app, prefix=self.prefix, user_market_data_id=self.curve_market_data_panel.user_market_data_id
         )
 
+        self.blotter_panel = BlotterPanel.BlotterPanel(
+            self.app, prefix=self.prefix, user_market_data_id=self.curve_market_data_panel.user_market_data_id
+        )
+
     def layout(self):
         # Accordion with curve chart and bond panels
         accordion = dbc.Accordion(
@@ -99,7 +104,16 @@ class RatesAnalytics:
                                         self.zero_coupon_bond_panel.layout(),
                                         className="ag-theme-balham-dark",
                                     ),
-                                )
+                                ),
+                                dcc.Tab(
+                                    label="Blotter",
+                                    className="custom-tab",
+                                    selected_className="custom-tab--selected",
+                                    children=html.Div(
+                                        self.blotter_panel.layout(),
+                                        className="ag-theme-balham-dark",
+                                    ),
+                                ),
                             ],
                         )
                     ],
@@ -139,6 +153,7 @@ class RatesAnalytics:
                 dcc.Store(id=self.floating_rate_bond_panel.error_prefix_id),
                 dcc.Store(id=self.zero_coupon_bond_panel.error_prefix_id),
                 dcc.Store(id=self.ois_mid_curve_panel.error_prefix_id),
+                dcc.Store(id=self.blotter_panel.error_prefix_id),
 
                 # Error banner
                 html.Div(id="error-banner"),
@@ -250,6 +265,7 @@ app = dash.Dash(
 load_figure_template("sandstone_dark")
 
 server = app.server  # Gunicorn expects this
+asgi = AsgiUtils.asgi_app(app)  # ASGI entry point, pricing callbacks on their own executor
 
 # Path to assets folder
 ASSETS_FOLDER = "assets"
@@ -262,6 +278,9 @@ css_files = [
 # Instantiate your analytics layout
 rates_analytics = RatesAnalytics(app)
 
+# Pre-fork the pricing workers (DASHQL_PRICING_WORKERS) before the server starts its threads
+PricingService.start()
+
 # Wrap layout to include all CSS assets explicitly
 app.layout = html.Div(
     [
@@ -284,28 +303,11 @@ app.layout = html.Div(
     Input("eval-date", "id"),  # dummy input to trigger on load
 )
 def set_quantlib_business_date(_):
-    calendar = ql.TARGET()
-    today = ql.Date.todaysDate()
-    business_date = calendar.adjust(today, ql.ModifiedFollowing)
-    business_date = calendar.advance(business_date, 0, ql.Days)
-    ql.Settings.instance().evaluationDate = business_date
-    business_date_py = business_date.to_date()
-
-    with open("data/curve_setup.json", "r") as f:
-        curve_data = json.load(f)
-
-    with open("data/index_fixings.json", "r") as f:
-        index_fixings_data = json.load(f)
+    # Built once per business date and served by reference, see PortalSnapshot
+    # Pricing callbacks pin the evaluation date themselves, see PricingContext
+    snapshot = PortalSnapshot.get_snapshot()
 
-    index_fixings = CurveUtils.transform_index_fixings(index_fixings_data)
-
-    bond_portal_curve_dict = {}
-    for curve in curve_data:
-        curve_name = curve["Name"]
-        transformed_curve = CurveUtils.transform_curve_components(curve)
-        bond_portal_curve_dict[curve_name] = {"Curve": curve, "MarketData": transformed_curve}
-
-    return f"Evaluation Date: {business_date_py}", bond_portal_curve_dict, index_fixings
+    return f"Evaluation Date: {snapshot.business_date.to_date()}", snapshot.curves, snapshot.index_fixings
 
 
 @app.callback(
@@ -316,6 +318,7 @@ def set_quantlib_business_date(_):
     Input(rates_analytics.floating_rate_bond_panel.error_prefix_id, "data"),
     Input(rates_analytics.zero_coupon_bond_panel.error_prefix_id, "data"),
     Input(rates_analytics.ois_mid_curve_panel.error_prefix_id, "data"),
+    Input(rates_analytics.blotter_panel.error_prefix_id, "data"),
 )
 def set_global_error(*errors):
     for err in errors:
@@ -324,6 +327,13 @@ def set_global_error(*errors):
     return None, {}
 
 
+# Time every server-side callback and serve /metrics, once all callbacks are registered
+Metrics.mount(app)
+
+# Callback traffic log for Benchmarks.ReplayLoadTest, only when DASHQL_TRAFFIC_LOG is set
+TrafficRecorder.mount(app)
+
+
 # =============================
 # Local Development
 # =============================